@@ -0,0 +1,478 @@
+# Copyright (c) 2009-2010 Six Apart Ltd.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of Six Apart Ltd. nor the names of its contributors may
+#   be used to endorse or promote products derived from this software without
+#   specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+`AsyncHttpObject` and `AsyncPromiseObject` are asyncio counterparts of
+`HttpObject` and `PromiseObject`, whose HTTP methods are coroutines.
+
+Requests are made through an asynchronous user agent: any object with a
+`request()` method taking the same keyword arguments as
+`httplib2.Http.request()` but returning an awaitable of the same
+``(response, content)`` pair. `AiohttpUserAgent` makes requests with the
+`aiohttp` library, if it's installed; `ExecutorUserAgent` runs a regular
+`httplib2.Http`-compatible user agent on an executor instead. Close an
+`AiohttpUserAgent`, including the default one (with `close_user_agent()`),
+before the event loop it's used from ends.
+
+Requests are built and responses decoded by the same `get_request()`,
+`raise_for_response()` and `update_from_response()` methods as in
+synchronous use, so the coroutine functions in this module also work with
+regular `HttpObject` classes:
+
+>>> tweet = await remoteobjects.asynchttp.get(Tweet, url)
+
+This module requires Python 3.5 or later.
+
+"""
+
+import asyncio
+import weakref
+
+import httplib2
+from six.moves import http_client  # python3: http.client
+
+import remoteobjects.http
+from remoteobjects.http import HttpObject
+from remoteobjects.promise import (PromiseError, PromiseObject,
+                                   unique_by_identity)
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class ExecutorUserAgent(object):
+
+    """An asynchronous user agent that makes requests with a blocking
+    `httplib2.Http`-compatible user agent on an executor.
+
+    """
+
+    def __init__(self, http=None, executor=None):
+        """Sets the blocking user agent and the executor to run it on.
+
+        If `http` is not given, the user agent from
+        `remoteobjects.http.get_threadsafe_user_agent()` is used, as the
+        executor may run several requests at once. If `executor` is not
+        given, the event loop's default executor is used.
+
+        """
+        self.http = http
+        self.executor = executor
+
+    def request(self, **kwargs):
+        http = self.http
+        if http is None:
+            http = remoteobjects.http.get_threadsafe_user_agent()
+        loop = asyncio.get_event_loop()
+        return loop.run_in_executor(self.executor,
+            lambda: http.request(**kwargs))
+
+
+class AiohttpUserAgent(object):
+
+    """An asynchronous user agent that makes requests with an
+    `aiohttp.ClientSession`.
+
+    As an `aiohttp.ClientSession` can only be used from the event loop it
+    was made in, a user agent that isn't given a session makes one for each
+    event loop it's used from. Close those sessions when you're done with
+    the user agent, before their event loop ends, with `close()`, or by
+    using the user agent as an asynchronous context manager:
+
+    >>> async with AiohttpUserAgent() as http:
+    ...     tweet = await remoteobjects.asynchttp.get(Tweet, url, http=http)
+
+    """
+
+    def __init__(self, session=None):
+        """Sets the `aiohttp.ClientSession` to make requests with.
+
+        If `session` is not given, a session is created for each event loop
+        the user agent makes requests from, when the first request is made.
+        A given session is only ever closed by its owner.
+
+        """
+        if aiohttp is None:
+            raise ImportError('AiohttpUserAgent requires aiohttp')
+        self.session = session
+        self.sessions = weakref.WeakKeyDictionary()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def get_session(self):
+        """Returns the session to make requests with from the running event
+        loop."""
+        if self.session is not None:
+            return self.session
+        loop = asyncio.get_event_loop()
+        session = self.sessions.get(loop)
+        if session is None or session.closed:
+            session = self.sessions[loop] = aiohttp.ClientSession()
+        return session
+
+    async def close(self):
+        """Closes the session the user agent made for the running event loop,
+        if it made one.
+
+        The user agent can still be used afterward; it makes a new session
+        when it's next used.
+
+        """
+        session = self.sessions.pop(asyncio.get_event_loop(), None)
+        if session is not None:
+            await session.close()
+
+    async def request(self, uri, method='GET', body=None, headers=None,
+                      **kwargs):
+        async with self.get_session().request(method, uri, data=body,
+                                              headers=headers) as resp:
+            content = await resp.read()
+
+        info = dict((k.lower(), v) for k, v in resp.headers.items())
+        info['status'] = resp.status
+        response = httplib2.Response(info)
+        response.reason = resp.reason
+        return response, content
+
+
+class CoalescingUserAgent(object):
+
+    """An asynchronous user agent that makes only one request at a time for
+    any resource, sharing its response between all coroutines asking for it
+    meanwhile.
+
+    This is the asynchronous counterpart of
+    `remoteobjects.http.CoalescingUserAgent`, and coalesces the same requests.
+    A `CoalescingUserAgent` should only be used from one event loop.
+
+    """
+
+    def __init__(self, http=None, methods=('GET', 'HEAD'), key_headers=None):
+        """Sets the asynchronous user agent to make requests with and which
+        requests to coalesce.
+
+        If `http` is not given, the one from `get_user_agent()` at the time
+        of the request is used.
+
+        """
+        self.http = http
+        self.methods = methods
+        self.key_headers = key_headers
+        self.calls = {}
+
+    def request(self, uri, **kwargs):
+        http = get_user_agent(self.http)
+        key = remoteobjects.http.coalescing_key(uri, kwargs.get('method', 'GET'),
+            kwargs.get('body'), kwargs.get('headers'),
+            methods=self.methods, key_headers=self.key_headers)
+        if key is None:
+            return http.request(uri=uri, **kwargs)
+
+        call = self.calls.get(key)
+        if call is None:
+            call = self.calls[key] = asyncio.ensure_future(
+                http.request(uri=uri, **kwargs))
+            call.add_done_callback(lambda _: self.calls.pop(key, None))
+        # Don't let one caller being cancelled cancel the request for all.
+        return asyncio.shield(call)
+
+
+userAgent = None
+
+
+def get_user_agent(http=None):
+    """Returns the asynchronous user agent to use for a request.
+
+    Returns `http` if given, otherwise the module's `userAgent`. If no
+    `userAgent` has been set, one is made: an `AiohttpUserAgent` if `aiohttp`
+    is installed, otherwise an `ExecutorUserAgent`. Call `close_user_agent()`
+    before an event loop using the default user agent ends.
+
+    """
+    global userAgent
+    if http is not None:
+        return http
+    if userAgent is None:
+        if aiohttp is not None:
+            userAgent = AiohttpUserAgent()
+        else:
+            userAgent = ExecutorUserAgent()
+    return userAgent
+
+
+async def close_user_agent():
+    """Closes the resources the module's `userAgent` holds for the running
+    event loop, such as the `aiohttp.ClientSession` an `AiohttpUserAgent`
+    made for it.
+
+    Call this before an event loop that made requests with the default user
+    agent ends, as in:
+
+    >>> async def main():
+    ...     try:
+    ...         tweet = await remoteobjects.asynchttp.get(Tweet, url)
+    ...     finally:
+    ...         await remoteobjects.asynchttp.close_user_agent()
+    >>> asyncio.run(main())
+
+    """
+    close = getattr(userAgent, 'close', None)
+    if close is not None:
+        await close()
+
+
+async def get(cls, url, http=None, **kwargs):
+    """Fetches a new instance of `HttpObject` class `cls` from a URL.
+
+    Optional parameter `http` is the asynchronous user agent to use. Other
+    keyword parameters are passed to `cls.get_request()`.
+
+    """
+    self = cls()
+    if not kwargs and self.update_from_cache(url):
+        return self
+    request = self.get_request(url=url, **kwargs)
+    response, content = await get_user_agent(http).request(**request)
+    self.update_from_response(url, response, content)
+    if not kwargs:
+        self.store_in_cache(url, response)
+    return self
+
+
+async def refresh(self, http=None):
+    """Updates `HttpObject` instance `self` with the current state of its
+    remote resource, if it has changed, as in `HttpObject.refresh()`.
+
+    Returns whether the instance was updated with new content.
+
+    """
+    if isinstance(self, PromiseObject) and not self._delivered:
+        await deliver(self, http=http)
+        return True
+    if http is None and isinstance(self, AsyncPromiseObject):
+        http = self._http
+
+    request = self.refresh_request()
+    response, content = await get_user_agent(http).request(**request)
+    self.update_from_response(self._location, response, content)
+    self.store_in_cache(self._location, response)
+    return response.status != http_client.NOT_MODIFIED
+
+
+async def post(self, obj, http=None):
+    """Adds `HttpObject` instance `obj` to the remote resource of
+    `HttpObject` instance `self` through an HTTP ``POST`` request."""
+    request = self.post_request(obj)
+    response, content = await get_user_agent(http).request(**request)
+    self.invalidate_cache()
+    obj.update_from_response(self._location, response, content)
+
+
+async def put(self, http=None):
+    """Saves `HttpObject` instance `self` back to its remote resource through
+    an HTTP ``PUT`` request."""
+    request = self.put_request()
+    response, content = await get_user_agent(http).request(**request)
+    self.invalidate_cache()
+    self.update_from_response(self._location, response, content)
+
+
+async def patch(self, http=None):
+    """Saves the changed fields of `HttpObject` instance `self` back to its
+    remote resource through an HTTP ``PATCH`` request."""
+    changes = self.to_patch_dict()
+    request = self.patch_request(changes)
+    response, content = await get_user_agent(http).request(**request)
+    self.invalidate_cache()
+    self.update_from_patch_response(changes, response, content)
+
+
+async def delete(self, http=None):
+    """Deletes the remote resource of `HttpObject` instance `self` through an
+    HTTP ``DELETE`` request."""
+    request = self.delete_request()
+    response, content = await get_user_agent(http).request(**request)
+    self.update_from_delete_response(response, content)
+
+
+async def head(self, http=None):
+    """Returns the response to an HTTP ``HEAD`` request for `HttpObject`
+    instance `self`."""
+    if getattr(self, '_location', None) is None:
+        raise ValueError('Cannot issue HEAD for %r with no URL' % self)
+    response, content = await get_user_agent(http).request(
+        uri=self._location, method='HEAD')
+    return response
+
+
+async def options(self, http=None):
+    """Returns the response to an HTTP ``OPTIONS`` request for `HttpObject`
+    instance `self`."""
+    if getattr(self, '_location', None) is None:
+        raise ValueError('Cannot issue OPTIONS for %r with no URL' % self)
+    response, content = await get_user_agent(http).request(
+        uri=self._location, method='OPTIONS')
+    return response
+
+
+async def deliver(self, http=None):
+    """Delivers undelivered `PromiseObject` instance `self`.
+
+    Optional parameter `http` is the asynchronous user agent to use. As
+    `PromiseObject` instances remember a synchronous user agent, the one the
+    instance was promised with is used only for `AsyncPromiseObject`
+    instances.
+
+    """
+    if self._delivered:
+        raise PromiseError('%s instance %r has already been delivered' % (type(self).__name__, self))
+    if self._location is None:
+        raise PromiseError('Instance %r has no URL from which to deliver' % (self,))
+
+    if not self._get_kwargs and self.update_from_cache(self._location):
+        return
+
+    if http is None and isinstance(self, AsyncPromiseObject):
+        http = self._http
+
+    request = self.get_request(**self._get_kwargs)
+    response, content = await get_user_agent(http).request(**request)
+    self.update_from_response(request['uri'], response, content)
+    if not self._get_kwargs:
+        self.store_in_cache(request['uri'], response)
+
+
+async def deliver_all(promises, http=None):
+    """Delivers many undelivered `PromiseObject` instances concurrently.
+
+    As with `remoteobjects.promise.deliver_all()`, delivering one promise
+    failing doesn't stop the others from being delivered, and a promise
+    given more than once is delivered once. Returns a list with, for each
+    of `promises` in order, either the delivered promise or the exception
+    raised delivering it.
+
+    """
+    promises, positions = unique_by_identity(promises)
+
+    async def deliver_one(promise):
+        if not promise._delivered:
+            await deliver(promise, http=http)
+        return promise
+
+    results = await asyncio.gather(*[deliver_one(promise) for promise in promises],
+                                   return_exceptions=True)
+    return [results[i] for i in positions]
+
+
+class AsyncHttpObject(HttpObject):
+
+    """An `HttpObject` whose HTTP methods are coroutines.
+
+    The `http` parameters of these methods are asynchronous user agents,
+    rather than `httplib2.Http`-compatible ones.
+
+    """
+
+    @classmethod
+    async def get(cls, url, http=None, **kwargs):
+        """Fetches a new `AsyncHttpObject` instance from a URL."""
+        return await get(cls, url, http=http, **kwargs)
+
+    async def refresh(self, http=None):
+        """Updates the instance with the current state of its remote
+        resource, if it has changed."""
+        return await refresh(self, http=http)
+
+    async def post(self, obj, http=None):
+        """Adds another `HttpObject` to this remote resource through an HTTP
+        ``POST`` request."""
+        await post(self, obj, http=http)
+
+    async def put(self, http=None):
+        """Saves the instance back to its remote resource through an HTTP
+        ``PUT`` request."""
+        await put(self, http=http)
+
+    async def patch(self, http=None):
+        """Saves the instance's changed fields back to its remote resource
+        through an HTTP ``PATCH`` request."""
+        await patch(self, http=http)
+
+    async def delete(self, http=None):
+        """Deletes the instance's remote resource through an HTTP ``DELETE``
+        request."""
+        await delete(self, http=http)
+
+    async def head(self, http=None):
+        """Issues an HTTP ``HEAD`` request for the instance and returns the
+        response."""
+        return await head(self, http=http)
+
+    async def options(self, http=None):
+        """Issues an HTTP ``OPTIONS`` request for the instance and returns the
+        response."""
+        return await options(self, http=http)
+
+
+class AsyncPromiseObject(AsyncHttpObject, PromiseObject):
+
+    """A `PromiseObject` that is delivered by awaiting its `deliver()`
+    coroutine.
+
+    As delivery can't happen implicitly from synchronous code, using the
+    data of an undelivered `AsyncPromiseObject` raises a `PromiseError`.
+
+    """
+
+    @classmethod
+    def get(cls, url, http=None, **kwargs):
+        """Creates a new undelivered `AsyncPromiseObject` instance that, when
+        delivered, will contain the data at the given URL.
+
+        Optional parameter `http` is the asynchronous user agent to deliver
+        the instance with.
+
+        """
+        return super(AsyncHttpObject, cls).get(url, http=http, **kwargs)
+
+    async def deliver(self, http=None):
+        """Fills the instance with the data it represents."""
+        await deliver(self, http=http)
+
+    def deliver_on_demand(self):
+        raise PromiseError('%s instance %r must be delivered with '
+            '"await deliver()" before its data is used'
+            % (type(self).__name__, self))
@@ -0,0 +1,190 @@
+# Copyright (c) 2009-2010 Six Apart Ltd.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of Six Apart Ltd. nor the names of its contributors may
+#   be used to endorse or promote products derived from this software without
+#   specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+
+An `ObjectCache` keeps recently fetched `HttpObject` instances in memory, so
+getting the same resource again need not request and decode it again.
+
+A cache is used by setting it as the `cache` attribute of `HttpObject`
+classes:
+
+>>> RemoteObject.cache = ObjectCache(maxsize=500, ttl=60)
+
+after which `HttpObject.get()` and `PromiseObject.deliver()` return copies of
+cached instances while they're fresh, and saving or deleting an instance
+through `put()`, `post()` or `delete()` evicts its URL from the cache.
+
+"""
+
+from collections import OrderedDict
+import threading
+import time
+
+import httplib2
+from six.moves import http_client  # python3: http.client
+
+
+def canonical_url(url):
+    """Returns the normalized form of URL `url` used to identify a resource
+    in the cache.
+
+    As by `httplib2.urlnorm()`, the scheme and host are lowercased, the
+    fragment is dropped, and an empty path becomes ``/``. Relative URLs are
+    returned unchanged.
+
+    """
+    try:
+        return httplib2.urlnorm(url)[-1]
+    except httplib2.RelativeURIError:
+        return url
+
+
+def max_age(response):
+    """Returns how many seconds the `Cache-Control` header of `response` says
+    it may be cached for, `0` if it may not be cached, or `None` if it
+    doesn't say."""
+    directives = {}
+    for directive in response.get('cache-control', '').split(','):
+        name, _, value = directive.strip().partition('=')
+        directives[name.lower()] = value.strip().strip('"')
+
+    if 'no-store' in directives or 'no-cache' in directives:
+        return 0
+    try:
+        return max(int(directives['max-age']), 0)
+    except (KeyError, ValueError):
+        return None
+
+
+class ObjectCache(object):
+
+    """A cache of `HttpObject` instances by URL, with least recently used and
+    time-based eviction.
+
+    Cached instances are never handed out themselves. Instead, instances are
+    updated from them with `HttpObject.update_from_instance()`, which copies
+    their data deeply, so changing an instance got from the cache, even in
+    its nested values, doesn't change the cached one.
+
+    """
+
+    def __init__(self, maxsize=1000, ttl=300, clock=time.time):
+        """Sets the size and time limits of the cache.
+
+        Parameter `maxsize` is the number of instances to keep; once full, the
+        least recently used instances are evicted first. Parameter `ttl` is
+        the number of seconds an instance is kept, though a shorter
+        ``max-age`` in a response's ``Cache-Control`` header takes precedence.
+        If `ttl` is `None`, responses without a ``max-age`` are kept until
+        evicted for space.
+
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, url):
+        """Returns the fresh cached instance for URL `url`, or `None` if
+        there isn't one."""
+        key = canonical_url(url)
+        with self.lock:
+            try:
+                obj, expires = self.entries.pop(key)
+            except KeyError:
+                return None
+            if expires is not None and expires <= self.clock():
+                return None
+            # Reinsert to mark the entry most recently used.
+            self.entries[key] = obj, expires
+        return obj
+
+    def expiry(self, response):
+        """Returns when an instance fetched with `response` expires from the
+        cache, `None` if it never does, or `0` if it may not be cached."""
+        ttl = self.ttl
+        age = max_age(response)
+        if age is not None:
+            ttl = age if ttl is None else min(age, ttl)
+        if ttl is None:
+            return None
+        if ttl <= 0:
+            return 0
+        return self.clock() + ttl
+
+    def store(self, url, obj, response):
+        """Caches instance `obj` as the resource at URL `url`, if the
+        `response` from which it was decoded permits."""
+        if response.status not in (http_client.OK, http_client.NOT_MODIFIED):
+            return
+        expires = self.expiry(response)
+        if expires == 0:
+            self.invalidate(url)
+            return
+
+        key = canonical_url(url)
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = obj, expires
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def touch(self, url, response):
+        """Renews the cached instance for URL `url` after `response` reported
+        the resource is not modified.
+
+        Returns whether there was a cached instance to renew. The instance
+        itself is kept, so only the cache's copy of the resource is ever
+        stored, not the state of whichever instance was refreshed.
+
+        """
+        expires = self.expiry(response)
+        key = canonical_url(url)
+        with self.lock:
+            if key not in self.entries:
+                return False
+            obj, _ = self.entries.pop(key)
+            if expires != 0:
+                self.entries[key] = obj, expires
+        return True
+
+    def invalidate(self, url):
+        """Evicts any cached instance for URL `url`."""
+        with self.lock:
+            self.entries.pop(canonical_url(url), None)
+
+    def clear(self):
+        """Evicts all cached instances."""
+        with self.lock:
+            self.entries.clear()
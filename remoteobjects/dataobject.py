@@ -41,13 +41,19 @@ declared on `DataObject` subclasses. `Field` classes reside in the
 
 
 from copy import deepcopy
-from six import with_metaclass
+import datetime
+import hashlib
+import weakref
+import six
+from six import get_unbound_function, with_metaclass
 
 import remoteobjects.fields
+import remoteobjects.json
 
 
 classes_by_name = {}
 classes_by_constant_field = {}
+references_by_name = {}
 
 
 def find_by_name(name):
@@ -60,6 +66,227 @@ def find_by_name(name):
     return classes_by_name[name]
 
 
+def add_name_reference(name, field):
+    """Records that `field` has cached the class with the given name, so the
+    cache can be discarded when another class is declared with that name."""
+    try:
+        refs = references_by_name[name]
+    except KeyError:
+        refs = references_by_name[name] = weakref.WeakSet()
+    refs.add(field)
+
+
+def register_class(name, cls):
+    """Registers `cls` as the class with the given name for `find_by_name()`
+    and forward references, replacing any class previously registered with
+    that name."""
+    classes_by_name[name] = cls
+    for field in list(references_by_name.pop(name, ())):
+        field.forget_cls()
+
+
+def constant_key(value):
+    """Returns the key under which `Constant` field value `value` is
+    registered, making lists hashable."""
+    if isinstance(value, list):
+        return tuple(value)
+    return value
+
+
+ATOMIC_TYPES = (type(None), bool, float, bytes) + six.integer_types + six.string_types
+
+IMMUTABLE_TYPES = ATOMIC_TYPES + (datetime.date, datetime.time,
+                                  datetime.timedelta)
+
+_missing = object()
+
+
+def copy_value(value):
+    """Returns a deep copy of the dictionary value `value`."""
+    if isinstance(value, ATOMIC_TYPES):
+        return value
+    return deepcopy(value)
+
+
+def plain_field(field):
+    """Returns whether `field` stores its decoded values as a plain `Field`
+    does, rather than customizing `__get__()`."""
+    return (get_unbound_function(type(field).__get__)
+            is get_unbound_function(remoteobjects.fields.Field.__get__))
+
+
+def release_values(value):
+    """Releases the API data of the `DataObject` instances in field value
+    `value`, as for ``DataObject.decode_all(release=True)``."""
+    if isinstance(value, DataObject):
+        value.decode_all(release=True)
+    elif isinstance(value, (list, tuple, remoteobjects.fields.LazyList)):
+        for item in value:
+            release_values(item)
+    elif isinstance(value, (dict, remoteobjects.fields.LazyDict)):
+        for item in value.values():
+            release_values(item)
+
+
+def make_merge_patch(original, value):
+    """Returns the JSON merge patch (RFC 7396) that changes dictionary value
+    `original` into `value`.
+
+    Members of dictionaries that were removed or are now None are included
+    with None values, so the patch removes them, and members of nested
+    dictionaries are patched the same way.
+
+    """
+    if not isinstance(original, dict) or not isinstance(value, dict):
+        return value
+    patch = dict((k, None) for k, v in original.items()
+                 if v is not None and value.get(k) is None)
+    for k, v in value.items():
+        if v is None or original.get(k) == v:
+            continue
+        patch[k] = make_merge_patch(original.get(k), v)
+    return patch
+
+
+def apply_merge_patch(target, patch):
+    """Returns the dictionary value `target` changed by the JSON merge patch
+    (RFC 7396) `patch`, without changing `target` itself."""
+    if not isinstance(patch, dict):
+        return patch
+    target = dict(target) if isinstance(target, dict) else {}
+    for k, v in patch.items():
+        if v is None:
+            target.pop(k, None)
+        else:
+            target[k] = apply_merge_patch(target.get(k), v)
+    return target
+
+
+def forget_api_value(obj, api_name):
+    """Removes the value for `api_name` from the API data of `obj`.
+
+    The API data is copied rather than changed in place, as it may be shared
+    with the API data of an instance containing `obj`, which needs its
+    original data to tell what changed.
+
+    """
+    api_data = obj.api_data
+    if api_name in api_data:
+        api_data = dict(api_data)
+        del api_data[api_name]
+        obj.__dict__['api_data'] = api_data
+
+
+class FieldSlot(object):
+
+    """A descriptor that stores the values of a field of a compact
+    `DataObject` class in a slot instead of the instance's `__dict__`.
+
+    `DataObjectMetaclass` installs a `FieldSlot` in place of each plain field
+    of a compact class. It decodes values as the `Field` itself would.
+
+    """
+
+    def __init__(self, field, member):
+        self.field = field
+        self.member = member
+
+    def __get__(self, obj, cls):
+        if obj is None:
+            # Yield the real field instance when gotten through the class.
+            return self.field
+
+        try:
+            return self.member.__get__(obj, cls)
+        except AttributeError:
+            pass
+
+        field = self.field
+        try:
+            value = obj.api_data[field.api_name]
+        except KeyError:
+            if callable(field.default):
+                value = field.default(obj)
+            else:
+                value = field.default
+        else:
+            value = field.decode(value)
+        # Store the value so we need decode it only once.
+        self.member.__set__(obj, value)
+        return value
+
+    def __set__(self, obj, value):
+        self.member.__set__(obj, value)
+        obj.mark_changed(self.field.attrname)
+
+    def __delete__(self, obj):
+        try:
+            self.member.__delete__(obj)
+        except AttributeError:
+            pass
+
+        forget_api_value(obj, self.field.api_name)
+        obj.mark_changed(self.field.attrname)
+
+
+class FieldReader(object):
+
+    """A descriptor that decodes the value of a plain field on first access,
+    then gets out of the way.
+
+    As a `FieldReader` defines no `__set__()`, once the field's decoded value
+    is stored in the instance's `__dict__`, Python finds it there without
+    calling the descriptor at all, so later reads are as fast as reads of
+    plain attributes. `DataObjectMetaclass` installs a `FieldReader` in place
+    of each plain field of a class declared with ``fast_reads = True`` that
+    isn't kept in a slot, along with `__setattr__()` and `__delattr__()`
+    methods that send assignments and deletions to the field itself, unless
+    the class has such methods already (see `has_attr_hooks()`).
+
+    """
+
+    def __init__(self, field):
+        self.field = field
+
+    def __get__(self, obj, cls):
+        # Yields the real field instance when gotten through the class.
+        return self.field.__get__(obj, cls)
+
+
+def field_attr_hooks(cls):
+    """Returns `__setattr__()` and `__delattr__()` methods for `cls` that
+    send assignments and deletions of its `FieldReader` fields to the fields
+    themselves, and others on to the methods `cls` inherits."""
+
+    def __setattr__(self, name, value):
+        field = self._read_fields.get(name)
+        if field is None:
+            super(cls, self).__setattr__(name, value)
+        else:
+            field.__set__(self, value)
+
+    def __delattr__(self, name):
+        field = self._read_fields.get(name)
+        if field is None:
+            super(cls, self).__delattr__(name)
+        else:
+            field.__delete__(self)
+
+    __setattr__.field_hook = __delattr__.field_hook = True
+    return __setattr__, __delattr__
+
+
+def has_attr_hooks(cls):
+    """Returns whether `cls` has `__setattr__()` or `__delattr__()` methods
+    other than those of `object` and `field_attr_hooks()`."""
+    for base in cls.__mro__[:-1]:
+        for name in ('__setattr__', '__delattr__'):
+            method = base.__dict__.get(name)
+            if method is not None and not getattr(method, 'field_hook', False):
+                return True
+    return False
+
+
 class DataObjectMetaclass(type):
     """Metaclass for `DataObject` classes.
 
@@ -68,7 +295,14 @@ class DataObjectMetaclass(type):
     instances.
 
     This metaclass also makes the new class findable through the
-    `dataobject.find_by_name()` function.
+    `dataobject.find_by_name()` function, and compiles the plans its
+    instances use to decode and encode their fields.
+
+    If the new class (or one of its parents) is declared with ``compact =
+    True``, its plain fields' values are stored in ``__slots__`` instead of
+    the instance's ``__dict__``, through `FieldSlot` descriptors. If it's
+    declared with ``fast_reads = True``, its other plain fields are read
+    through `FieldReader` descriptors.
 
     """
 
@@ -97,21 +331,110 @@ class DataObjectMetaclass(type):
 
         fields.update(new_fields)
         attrs['fields'] = fields
+
+        # Find which fields' values compact instances keep in slots.
+        inherited_slots = {}
+        for base in reversed(bases):
+            inherited_slots.update(getattr(base, '_field_slots', {}))
+        field_slots = dict((attrname, member)
+                           for attrname, member in inherited_slots.items()
+                           if attrname in fields and attrname not in new_fields)
+        compact = attrs.get('compact')
+        if not isinstance(compact, bool):
+            compact = any(getattr(base, 'compact', False) is True
+                          for base in bases)
+        slotted = []
+        if compact:
+            slotted = sorted(attrname for attrname, field in new_fields.items()
+                             if plain_field(field))
+            attrs['__slots__'] = tuple(attrs.get('__slots__', ())) + tuple(
+                '_slot_' + attrname for attrname in slotted
+                if attrname not in inherited_slots)
+        attrs['_field_slots'] = field_slots
+        # Filled in by the Constant fields of the class and its subclasses.
+        attrs['_constant_dispatch'] = {}
+
         obj_cls = super(DataObjectMetaclass, cls).__new__(cls, name, bases, attrs)
 
         for field, value in new_properties.items():
             obj_cls.add_to_class(field, value)
 
+        for attrname in slotted:
+            member = inherited_slots.get(attrname)
+            if member is None:
+                member = obj_cls.__dict__['_slot_' + attrname]
+            field_slots[attrname] = member
+            setattr(obj_cls, attrname, FieldSlot(new_fields[attrname], member))
+
+        if obj_cls.fast_reads:
+            read_fields = dict(
+                (attrname, field) for attrname, field in fields.items()
+                if attrname not in field_slots and plain_field(field))
+            if has_attr_hooks(obj_cls):
+                # Assignments must pass through the class's own hooks before
+                # reaching the fields, so read through the fields as usual.
+                for attrname, field in read_fields.items():
+                    setattr(obj_cls, attrname, field)
+                read_fields = {}
+            else:
+                for attrname, field in read_fields.items():
+                    setattr(obj_cls, attrname, FieldReader(field))
+                # Only these classes pay for hooking every assignment. A
+                # hook inherited from another such class already finds this
+                # class's fields through _read_fields.
+                setattr_hook, delattr_hook = field_attr_hooks(obj_cls)
+                if not getattr(obj_cls.__setattr__, 'field_hook', False):
+                    obj_cls.__setattr__ = setattr_hook
+                if not getattr(obj_cls.__delattr__, 'field_hook', False):
+                    obj_cls.__delattr__ = delattr_hook
+            obj_cls._read_fields = read_fields
+
         # Register the new class so Object fields can have forward-referenced it.
-        classes_by_name[name] = obj_cls
+        register_class(name, obj_cls)
 
         # Tell this class's fields what this class is, so they can find their
         # forward references later.
         for field in new_properties.values():
             field.of_cls = obj_cls
 
+        obj_cls.compile_plans()
+
         return obj_cls
 
+    def compile_plans(cls):
+        """Builds the plans the class's instances use to decode and encode
+        their fields.
+
+        The plans are tuples of each field's attribute name, API name, and
+        bound `decode()` or `encode()` method, resolved once when the class
+        is created instead of on every call to `to_dict()` or
+        `decode_all()`. Fields that customize `__get__()` are marked as such,
+        so their values are always read through the field, as are fields
+        whose undecoded values `to_dict()` can copy without encoding.
+
+        If you change a class's fields after it's created, call this method
+        again.
+
+        """
+        decode_plan = []
+        encode_plan = []
+        deferred_plan = []
+        for attrname, field in sorted(cls.fields.items()):
+            plain = plain_field(field) and attrname not in cls._field_slots
+            default = field.default
+            decode_plan.append((attrname, field.api_name, field.decode,
+                                plain, default, callable(default)))
+            encode_plan.append((attrname, field.api_name, field.encode,
+                                plain, plain and field.is_passthrough()))
+            deferred_plan.append((attrname, field.api_name,
+                                  field.encode_deferred,
+                                  plain, plain and field.is_passthrough()))
+        cls._decode_plan = tuple(decode_plan)
+        cls._encode_plan = tuple(encode_plan)
+        cls._deferred_plan = tuple(deferred_plan)
+        cls._field_api_names = frozenset(field.api_name
+                                         for field in cls.fields.values())
+
     def add_to_class(cls, name, value):
         try:
             value.install(name, cls)
@@ -137,12 +460,29 @@ class DataObject(with_metaclass(DataObjectMetaclass)):
     A DataObject's fields then provide the coding between live DataObject
     instances and dictionaries.
 
+    Declare ``compact = True`` on a DataObject class to keep its instances'
+    decoded field values in slots instead of their ``__dict__``, which uses
+    considerably less memory when you keep many instances around. Subclasses
+    of compact classes are compact too.
+
+    Declare ``fast_reads = True`` on a DataObject class to read its
+    instances' decoded field values as fast as plain attributes, instead of
+    through their fields each time. In exchange, assigning any attribute of
+    those instances is slower, as every assignment must be checked for field
+    values. Subclasses of such classes read fields fast too, except those
+    with `__setattr__()` or `__delattr__()` methods of their own or from
+    other classes, which read fields as usual so those methods see every
+    assignment and deletion.
+
     """
 
+    compact = False
+    fast_reads = False
+
     def __init__(self, **kwargs):
         """Initializes a new `DataObject` with the given field values."""
         self.api_data = {}
-        self.__dict__.update(kwargs)
+        self._set_local_values(kwargs)
 
     def __eq__(self, other):
         """Returns whether two `DataObject` instances are equivalent.
@@ -153,10 +493,23 @@ class DataObject(with_metaclass(DataObjectMetaclass)):
         """
         if not isinstance(other, type(self)):
             return NotImplemented
-        for k, v in self.fields.items():
-            if isinstance(v, remoteobjects.fields.Field):
-                if getattr(self, k) != getattr(other, k):
-                    return False
+        api_data, other_api_data = self.api_data, other.api_data
+        modified = self._modified_fields()
+        other_modified = other._modified_fields()
+        if not modified and not other_modified and api_data == other_api_data:
+            return True
+
+        for plan in self._encode_plan:
+            attrname, api_name = plan[0], plan[1]
+            if attrname not in modified and attrname not in other_modified:
+                # Equal API data decodes to equal values, so only fields
+                # whose data differs need decoded to compare them.
+                value = api_data.get(api_name, _missing)
+                if (value is not _missing
+                        and value == other_api_data.get(api_name, _missing)):
+                    continue
+            if getattr(self, attrname) != getattr(other, attrname):
+                return False
         return True
 
     def __ne__(self, other):
@@ -170,11 +523,59 @@ class DataObject(with_metaclass(DataObjectMetaclass)):
 
     @classmethod
     def statefields(cls):
-        return list(cls.fields.keys()) + ['api_data']
+        return list(cls.fields.keys()) + ['api_data', '_changed', '_released']
 
     def __getstate__(self):
-        return dict((k, self.__dict__[k]) for k in self.statefields()
+        state = dict((k, self.__dict__[k]) for k in self.statefields()
             if k in self.__dict__)
+        if self._field_slots:
+            state.update(self._local_values())
+        return state
+
+    def __setstate__(self, state):
+        self._set_local_values(state)
+
+    def _local_values(self):
+        """Returns a dictionary of the instance's decoded or assigned field
+        values, by attribute name."""
+        instance_data = self.__dict__
+        values = dict((k, instance_data[k]) for k in self.fields
+                      if k in instance_data)
+        for attrname, member in self._field_slots.items():
+            try:
+                values[attrname] = member.__get__(self, type(self))
+            except AttributeError:
+                pass
+        return values
+
+    def _set_local_values(self, values):
+        """Sets attributes of the instance from a dictionary, without
+        encoding or otherwise processing them."""
+        field_slots = self._field_slots
+        if not field_slots:
+            self.__dict__.update(values)
+            return
+        instance_data = self.__dict__
+        for k, v in values.items():
+            if k in field_slots:
+                field_slots[k].__set__(self, v)
+            else:
+                instance_data[k] = v
+
+    def _clear_local_values(self):
+        """Forgets all the instance's decoded or assigned field values, and
+        which fields were changed."""
+        instance_data = self.__dict__
+        instance_data.pop('_changed', None)
+        instance_data.pop('_released', None)
+        instance_data.pop('_fingerprint', None)
+        for plan in self._encode_plan:
+            instance_data.pop(plan[0], None)
+        for member in self._field_slots.values():
+            try:
+                member.__delete__(self)
+            except AttributeError:
+                pass
 
     def get(self, attr, *args):
         return getattr(self, attr, *args)
@@ -185,25 +586,242 @@ class DataObject(with_metaclass(DataObjectMetaclass)):
 
     def to_dict(self):
         """Encodes the DataObject to a dictionary."""
-        # Start with the last set of data we got from the API
-        data = deepcopy(self.api_data)
+        return self._encode_with(self._encode_plan)
 
-        # Now replace the data with what's actually in our object
-        for field_name, field in self.fields.items():
-            value = getattr(self, field.attrname, None)
-            if value is not None:
-                data[field.api_name] = field.encode(value)
+    def to_json_data(self):
+        """Encodes the DataObject to a dictionary as for `to_dict()`, but
+        leaves the values of `Object` fields (and lists and dictionaries of
+        them) as `DataObject` instances.
+
+        Use this with an encoder that converts the nested instances only when
+        it reaches them, such as `remoteobjects.json.iterencode()`, to encode
+        a large tree of objects without first building it into dictionaries.
+
+        """
+        return self._encode_with(self._deferred_plan)
+
+    def _encode_with(self, plan, local_values=None):
+        # If we're given the instance's local values, fields without one are
+        # decoded from their API data just to encode them, and not kept.
+        # Start with the last set of data we got from the API, except for
+        # our fields' data, which we're about to add.
+        api_data = self.api_data
+        field_api_names = self._field_api_names
+        data = dict((k, copy_value(v)) for k, v in api_data.items()
+                    if v is not None and k not in field_api_names)
+
+        # Now add the data that's actually in our object, excluding any
+        # fields that are None.
+        instance_data = self.__dict__
+        for attrname, api_name, encode, plain, passthrough in plan:
+            if plain and attrname in instance_data:
+                value = instance_data[attrname]
+            elif passthrough and api_name in api_data:
+                # Encoding the decoded value would only give us the same
+                # data back, so copy it as is.
+                value = api_data[api_name]
+                if value is not None:
+                    data[api_name] = copy_value(value)
+                continue
+            elif (local_values is not None and attrname not in local_values
+                    and api_name in api_data
+                    and (plain or attrname in self._field_slots)):
+                value = self.fields[attrname].decode(api_data[api_name])
             else:
-                data[field.api_name] = None
+                value = getattr(self, attrname, None)
+            if value is not None:
+                value = encode(value)
+                if value is not None:
+                    data[api_name] = value
+
+        return data
+
+    def mark_changed(self, attrname):
+        """Records that the field with the given attribute name was assigned
+        or deleted.
+
+        Fields call this method when their values are set or deleted. The
+        record is cleared when the instance is updated from a dictionary.
+
+        """
+        try:
+            self.__dict__['_changed'].add(attrname)
+        except KeyError:
+            self.__dict__['_changed'] = set((attrname,))
+        self.__dict__.pop('_fingerprint', None)
+
+    def changed_fields(self):
+        """Returns the set of attribute names of the fields changed since the
+        instance was last updated from a dictionary.
+
+        Changed fields are those that were assigned or deleted, and those
+        whose decoded values no longer encode to their original dictionary
+        values. As values of plain `Field` fields are the original
+        dictionary values themselves, changing those in place isn't
+        detected; assign the field to mark it changed.
+
+        """
+        changed = set(self.__dict__.get('_changed', ()))
+        released = self.__dict__.get('_released', ())
+        api_data = self.api_data
+        local_values = self._local_values()
+        for attrname, api_name, encode, _, _ in self._encode_plan:
+            if (attrname in changed or attrname not in local_values
+                    or api_name in released):
+                continue
+            value = local_values[attrname]
+            if value is not None:
+                value = encode(value)
+            if value != api_data.get(api_name):
+                changed.add(attrname)
+        return changed
+
+    def _modified_fields(self):
+        """Returns the set of attribute names of the fields whose values may
+        no longer be the ones their API data decodes to.
+
+        These are the fields that were assigned or deleted, and those whose
+        decoded values could have been changed in place. Decoded values that
+        are still the API data itself, or that are immutable (such as
+        numbers and timestamps), aren't included.
 
-        # Now delete any fields that ended up being None
-        # since we should exclude them in the resulting dict.
-        for k in list(data.keys()):
-            if data[k] is None:
-                del data[k]
+        """
+        instance_data = self.__dict__
+        modified = set(instance_data.get('_changed', ()))
+        local_values = self._local_values()
+        if not local_values:
+            return modified
+        api_data = self.api_data
+        for attrname, api_name, _, _, _ in self._encode_plan:
+            if attrname not in local_values or attrname in modified:
+                continue
+            value = local_values[attrname]
+            api_value = api_data.get(api_name, _missing)
+            if api_value is _missing or not (
+                    value is api_value or isinstance(value, IMMUTABLE_TYPES)):
+                modified.add(attrname)
+        return modified
+
+    def fingerprint(self):
+        """Returns a fingerprint of the instance's content, as a string of
+        hex digits.
+
+        The fingerprint is a SHA-1 digest of the instance's `to_dict()`
+        dictionary encoded as canonical JSON, so instances that encode to
+        the same dictionary have the same fingerprint, regardless of their
+        class or how they were made.
+
+        The fingerprint is remembered until a field is assigned or deleted,
+        or the instance is updated from a dictionary. Changing a decoded
+        value in place, such as the list of a `List` field or a field of an
+        instance in an `Object` field, isn't detected; assign the field again
+        (or call `mark_changed()` for it) to have the fingerprint computed
+        afresh.
+
+        """
+        instance_data = self.__dict__
+        try:
+            return instance_data['_fingerprint']
+        except KeyError:
+            pass
+        # Don't keep the values decoded to encode them, so fields not used
+        # yet aren't decoded only to be fingerprinted.
+        data = self._encode_with(self._encode_plan, self._local_values())
+        data = remoteobjects.json.canonical_dumps(data)
+        fingerprint = instance_data['_fingerprint'] = \
+            hashlib.sha1(data).hexdigest()
+        return fingerprint
+
+    def to_patch_dict(self):
+        """Encodes the instance's changed fields to a dictionary, as a JSON
+        merge patch (RFC 7396) of its original dictionary.
+
+        Changed fields whose values are now None are included with None
+        values, marking them for removal. Changed dictionary values, such as
+        those of `Object` fields, are included as merge patches of their
+        original values, so members removed from them are included with
+        None values too.
 
+        """
+        changed = self.changed_fields()
+        api_data = self.api_data
+        data = {}
+        for attrname, api_name, encode, _, _ in self._encode_plan:
+            if attrname not in changed:
+                continue
+            value = getattr(self, attrname, None)
+            if value is not None:
+                value = make_merge_patch(api_data.get(api_name),
+                                         encode(value))
+            data[api_name] = value
         return data
 
+    def decode_all(self, release=False):
+        """Decodes all the instance's fields from its API data at once.
+
+        Fields are otherwise decoded as they're first used, as are the items
+        of lazy `List` and `Dict` fields, which this method also decodes. Use
+        this method when you know you'll use most of an object's fields, to
+        decode them in one pass, or before sharing an instance between
+        threads, so they're never decoded concurrently.
+
+        If optional parameter `release` is true, the instance then drops its
+        API data for the decoded fields, as do any `DataObject` instances in
+        their values, so long-lived instances don't keep both the decoded
+        and the original data. API data with no matching field is kept, so
+        `to_dict()` still includes it. As there are no original values to
+        compare with afterward, `changed_fields()` then reports only fields
+        that were assigned or deleted.
+
+        """
+        api_data = self.api_data
+        instance_data = self.__dict__
+        lazy_types = (remoteobjects.fields.LazyList,
+                      remoteobjects.fields.LazyDict)
+        for attrname, api_name, decode, plain, default, default_is_callable \
+                in self._decode_plan:
+            if not plain:
+                value = getattr(self, attrname)
+            elif attrname in instance_data:
+                value = instance_data[attrname]
+            else:
+                try:
+                    value = api_data[api_name]
+                except KeyError:
+                    if default_is_callable:
+                        value = default(self)
+                    else:
+                        value = default
+                else:
+                    value = decode(value)
+                instance_data[attrname] = value
+            if isinstance(value, lazy_types):
+                value.decode_all()
+
+        if release and '_released' not in instance_data:
+            self.release_api_data()
+
+    def release_api_data(self):
+        """Drops the instance's API data for its decoded fields, and that of
+        the `DataObject` instances in their values, as for
+        ``decode_all(release=True)``.
+
+        """
+        released = set()
+        local_values = self._local_values()
+        for attrname, api_name, _, plain, _ in self._encode_plan:
+            if attrname in local_values and (plain or attrname in self._field_slots):
+                released.add(api_name)
+        # Mark the instance first, in case its values refer back to it.
+        self.__dict__['_released'] = frozenset(released)
+        # Make a new dictionary, as the original may be shared with whatever
+        # the instance was decoded from.
+        self.__dict__['api_data'] = dict(
+            (k, v) for k, v in self.api_data.items() if k not in released)
+
+        for value in local_values.values():
+            release_values(value)
+
     @classmethod
     def from_dict(cls, data):
         """Decodes a dictionary into a new `DataObject` instance."""
@@ -227,11 +845,42 @@ class DataObject(with_metaclass(DataObjectMetaclass)):
         if not isinstance(data, dict):
             raise TypeError
         # Clear any local instance field data
-        for k in self.fields.keys():
-            if k in self.__dict__:
-                del self.__dict__[k]
+        self._clear_local_values()
         self.api_data = data
 
+    @classmethod
+    def register_constant_subclass(cls, field, subclass):
+        """Records that `subclass` has the `Constant` field `field`, so
+        `subclass_with_constant_field()` and `class_for_data()` on this class
+        will find it.
+
+        The first class registered for a value is kept, so the subclass
+        closest to this class wins.
+
+        """
+        dispatch = cls.__dict__['_constant_dispatch']
+        if field.attrname not in dispatch:
+            dispatch[field.attrname] = (field.api_name, {})
+        table = dispatch[field.attrname][1]
+        table.setdefault(constant_key(field.value), subclass)
+
+    @classmethod
+    def class_for_data(cls, data):
+        """Returns the class to decode the dictionary `data` into: the
+        closest subclass of this class with a `Constant` field matching the
+        corresponding value in `data`, or this class if there isn't one.
+
+        The subclass is found in a table built as the subclasses are
+        declared, so no names are looked up per dictionary.
+
+        """
+        for api_name, table in cls._constant_dispatch.values():
+            try:
+                return table[constant_key(data[api_name])]
+            except (KeyError, TypeError):
+                pass
+        return cls
+
     @classmethod
     def subclass_with_constant_field(cls, fieldname, value):
         """Returns the closest subclass of this class that has a `Constant`
@@ -256,12 +905,10 @@ class DataObject(with_metaclass(DataObjectMetaclass)):
 
         """
         try:
-            clsname = classes_by_constant_field[fieldname][tuple(value)]
-        except KeyError:
+            return cls._constant_dispatch[fieldname][1][constant_key(value)]
+        except (KeyError, TypeError):
             # No matching classes, then.
             pass
-        else:
-            return find_by_name(clsname)
 
         raise ValueError('No such subclass of %s with field %r equivalent to %r'
             % (cls.__name__, fieldname, value))
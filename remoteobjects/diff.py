@@ -0,0 +1,167 @@
+# Copyright (c) 2009-2010 Six Apart Ltd.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of Six Apart Ltd. nor the names of its contributors may
+#   be used to endorse or promote products derived from this software without
+#   specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Field-level differences between two `DataObject` instances.
+
+`diff()` compares two instances of the same `DataObject` class field by
+field, returning a `Diff` of the fields whose values differ. Fields are
+compared by their API data first, so fields whose data is the same in both
+instances are never decoded. Instances in `Object` fields that differ are
+compared the same way, so their changes are reported field by field too.
+
+Use `Diff.to_patch_dict()` to send only the changes elsewhere, as a JSON
+merge patch of the first instance's data.
+
+"""
+
+from remoteobjects.dataobject import DataObject, make_merge_patch
+
+
+_missing = object()
+
+
+class FieldChange(object):
+
+    """A change in the value of one field between two instances.
+
+    The `old` and `new` attributes are the field's decoded values in each
+    instance. When both are instances of the same `DataObject` class, the
+    `nested` attribute is the `Diff` between them; otherwise it's None.
+
+    """
+
+    def __init__(self, field, old, new, nested=None):
+        self.field = field
+        self.old = old
+        self.new = new
+        self.nested = nested
+
+    def __repr__(self):
+        return '<%s %s: %r -> %r>' % (type(self).__name__,
+                                      self.field.attrname, self.old, self.new)
+
+    def patch_value(self):
+        """Returns the change's value in a JSON merge patch: the nested
+        patch for changed instances, otherwise the encoded new value, as a
+        merge patch of the old one if both are dictionaries."""
+        if self.nested is not None:
+            return self.nested.to_patch_dict()
+        if self.new is None:
+            return None
+        value = self.field.encode(self.new)
+        if self.old is not None:
+            value = make_merge_patch(self.field.encode(self.old), value)
+        return value
+
+
+class Diff(dict):
+
+    """The differences between two instances of a `DataObject` class, as a
+    dictionary of `FieldChange` instances by the attribute names of the
+    changed fields.
+
+    An empty `Diff` means the instances are equivalent, as with ``==``.
+
+    """
+
+    def __init__(self, cls, changes=()):
+        super(Diff, self).__init__(changes)
+        self.cls = cls
+
+    def __repr__(self):
+        return '<%s %s %s>' % (type(self).__name__, self.cls.__name__,
+                               sorted(self.keys()))
+
+    def to_patch_dict(self):
+        """Encodes the changes to a dictionary, as a JSON merge patch (RFC
+        7396) that changes the first instance's data to the second's.
+
+        Fields whose new values are None are included with None values,
+        marking them for removal. API data with no matching field isn't
+        compared, so it isn't included.
+
+        """
+        return dict((change.field.api_name, change.patch_value())
+                    for change in self.values())
+
+
+def _delivered_class(obj):
+    """Returns the class of `obj`, delivering it first if it's an
+    undelivered promise."""
+    obj.api_data
+    return type(obj)
+
+
+def diff(old, new):
+    """Returns the `Diff` of the fields that differ between `DataObject`
+    instances `old` and `new`.
+
+    Fields are decoded only where their API data differs, or where either
+    instance has a value for them that may no longer match its API data,
+    such as an assigned value or a decoded `Object` that could have been
+    changed in place. Fields whose API data differs but whose decoded
+    values are equal, such as timestamps in different time zones, aren't
+    reported.
+
+    Raises `TypeError` if the instances aren't of the same class.
+
+    """
+    cls = _delivered_class(old)
+    if _delivered_class(new) is not cls:
+        raise TypeError('Cannot diff %s instance with %s instance'
+                        % (cls.__name__, type(new).__name__))
+
+    old_data, new_data = old.api_data, new.api_data
+    old_modified = old._modified_fields()
+    new_modified = new._modified_fields()
+
+    changes = Diff(cls)
+    fields = cls.fields
+    for plan in cls._encode_plan:
+        attrname, api_name = plan[0], plan[1]
+        if attrname not in old_modified and attrname not in new_modified:
+            value = old_data.get(api_name, _missing)
+            if (value is not _missing
+                    and value == new_data.get(api_name, _missing)):
+                continue
+
+        old_value, new_value = getattr(old, attrname), getattr(new, attrname)
+        if old_value == new_value:
+            continue
+        nested = None
+        if (isinstance(old_value, DataObject)
+                and isinstance(new_value, DataObject)):
+            try:
+                nested = diff(old_value, new_value)
+            except TypeError:
+                pass
+        changes[attrname] = FieldChange(fields[attrname], old_value,
+                                        new_value, nested)
+    return changes
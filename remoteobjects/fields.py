@@ -39,7 +39,11 @@ that offers links between `RemoteObject` instances, `Link`.
 """
 
 from datetime import datetime, tzinfo, timedelta
+import re
+
 import dateutil.parser
+from six import get_unbound_function, string_types
+from six.moves import collections_abc
 from six.moves.urllib.parse import urljoin
 
 import remoteobjects.dataobject
@@ -135,23 +139,27 @@ class Field(Property):
             # Yield the real field instance when gotten through the class.
             return self
 
-        if self.attrname not in obj.__dict__:
-            try:
-                value = obj.api_data[self.api_name]
-            except KeyError:
-                if callable(self.default):
-                    value = self.default(obj)
-                else:
-                    value = self.default
-            else:
-                value = self.decode(value)
-            # Store the value so we need decode it only once.
-            obj.__dict__[self.attrname] = value
+        try:
+            return obj.__dict__[self.attrname]
+        except KeyError:
+            pass
 
-        return obj.__dict__[self.attrname]
+        try:
+            value = obj.api_data[self.api_name]
+        except KeyError:
+            if callable(self.default):
+                value = self.default(obj)
+            else:
+                value = self.default
+        else:
+            value = self.decode(value)
+        # Store the value so we need decode it only once.
+        obj.__dict__[self.attrname] = value
+        return value
 
     def __set__(self, obj, value):
         obj.__dict__[self.attrname] = value
+        obj.mark_changed(self.attrname)
 
     def __delete__(self, obj):
         # Delete both the instance and API data, so we'll get a real
@@ -161,10 +169,8 @@ class Field(Property):
         except KeyError:
             pass
 
-        try:
-            del obj.api_data[self.api_name]
-        except KeyError:
-            pass
+        remoteobjects.dataobject.forget_api_value(obj, self.api_name)
+        obj.mark_changed(self.attrname)
 
     def decode(self, value):
         """Decodes a dictionary value into a `DataObject` attribute value.
@@ -188,6 +194,31 @@ class Field(Property):
         """
         return value
 
+    def encode_deferred(self, value):
+        """Encodes a `DataObject` attribute value as for `encode()`, but
+        leaves any nested `DataObject` instances unencoded.
+
+        This is for encoders that convert nested objects only when they reach
+        them, such as `remoteobjects.json.iterencode()`, so a whole tree of
+        objects need not be encoded into dictionaries at once. This
+        implementation returns `encode(value)`.
+
+        """
+        return self.encode(value)
+
+    def is_passthrough(self):
+        """Returns whether the field's `decode()` and `encode()` methods
+        return values unchanged, so undecoded dictionary values can be
+        encoded as they are."""
+        return self.inherits_codec(Field)
+
+    def inherits_codec(self, base):
+        """Returns whether the field uses the `decode()` and `encode()`
+        methods of the `Field` class `base`."""
+        cls = type(self)
+        return (get_unbound_function(cls.decode) is get_unbound_function(base.decode)
+                and get_unbound_function(cls.encode) is get_unbound_function(base.encode))
+
 
 class Constant(Field):
 
@@ -212,8 +243,9 @@ class Constant(Field):
         """Records the class that owns this field.
 
         This implementation also registers the owning class by this constant
-        field's value, so that `DataObject.subclass_with_constant_field()`
-        will find this field's class.
+        field's value with the class and each of its `DataObject` base
+        classes, so that `DataObject.subclass_with_constant_field()` and
+        polymorphic `Object` fields will find this field's class.
 
         """
         super(Constant, self).install(attrname, cls)
@@ -223,7 +255,11 @@ class Constant(Field):
         attrname, value = self.attrname, self.value
         if attrname not in cf:
             cf[attrname] = dict()
-        cf[attrname][value] = cls.__name__
+        cf[attrname][remoteobjects.dataobject.constant_key(value)] = cls.__name__
+
+        for base in cls.__mro__:
+            if '_constant_dispatch' in base.__dict__:
+                base.register_constant_subclass(self, cls)
 
     def __get__(self, obj, cls):
         if obj is None:
@@ -249,6 +285,218 @@ class Constant(Field):
         return self.value
 
 
+_undecoded = object()
+
+
+class LazyList(collections_abc.MutableSequence):
+
+    """A list whose items are decoded from their dictionary values only when
+    they're first used.
+
+    `List` fields declared with ``lazy=True`` decode into `LazyList`
+    instances. Reading an item by index decodes only that item; iterating
+    decodes the items as they're reached. Decoded items are kept, so each is
+    decoded at most once. Changing the list decodes all its items first.
+
+    A `LazyList` supports the same sequence operations as a list and
+    compares equal to a list with the same items, but is not a `list`
+    instance. Slicing one returns a regular list.
+
+    """
+
+    def __init__(self, values, decode):
+        """Makes a list of the dictionary values in list `values`, decoded
+        with the function `decode` when first used.
+
+        `values` is not copied, so it should not be changed while the
+        `LazyList` is in use.
+
+        """
+        self._raw = values
+        self._decode = decode
+        self._items = [_undecoded] * len(values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._items)))]
+        item = self._items[index]
+        if item is _undecoded:
+            item = self._items[index] = self._decode(self._raw[index])
+        return item
+
+    def __iter__(self):
+        if self._raw is None:
+            return iter(self._items)
+        return self._iter_decoding()
+
+    def _iter_decoding(self):
+        for i in range(len(self._items)):
+            yield self[i]
+
+    def __len__(self):
+        return len(self._items)
+
+    def decode_all(self):
+        """Decodes any items not decoded yet, after which the list no longer
+        refers to its dictionary values."""
+        raw = self._raw
+        if raw is None:
+            return
+        items = self._items
+        for i, item in enumerate(items):
+            if item is _undecoded:
+                items[i] = self._decode(raw[i])
+        self._raw = None
+
+    def __setitem__(self, index, value):
+        self.decode_all()
+        self._items[index] = value
+
+    def __delitem__(self, index):
+        self.decode_all()
+        del self._items[index]
+
+    def insert(self, index, value):
+        self.decode_all()
+        self._items.insert(index, value)
+
+    def sort(self, *args, **kwargs):
+        self.decode_all()
+        self._items.sort(*args, **kwargs)
+
+    def encode_items(self, encode):
+        """Returns a list of the items encoded with the function `encode`.
+
+        Items that were never decoded can't have changed, so copies of their
+        original dictionary values are used instead.
+
+        """
+        raw = self._raw
+        if raw is None:
+            return [encode(item) for item in self._items]
+        copy_value = remoteobjects.dataobject.copy_value
+        return [copy_value(raw[i]) if item is _undecoded else encode(item)
+                for i, item in enumerate(self._items)]
+
+    def __eq__(self, other):
+        if not isinstance(other, (list, LazyList)):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+    __hash__ = None
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def __reduce__(self):
+        # Pickle and copy as a regular list.
+        return (list, (list(self),))
+
+
+class LazyDict(collections_abc.MutableMapping):
+
+    """A dictionary whose values are decoded from their dictionary values
+    only when they're first used.
+
+    `Dict` fields declared with ``lazy=True`` decode into `LazyDict`
+    instances, which work as `LazyList` instances do.
+
+    """
+
+    def __init__(self, values, decode):
+        """Makes a dictionary of the dictionary values in dictionary
+        `values`, decoded with the function `decode` when first used.
+
+        `values` is not copied, so it should not be changed while the
+        `LazyDict` is in use.
+
+        """
+        self._raw = values
+        self._decode = decode
+        self._items = {}
+
+    def __getitem__(self, key):
+        try:
+            return self._items[key]
+        except KeyError:
+            if self._raw is None:
+                raise
+        value = self._items[key] = self._decode(self._raw[key])
+        return value
+
+    def __contains__(self, key):
+        return key in (self._items if self._raw is None else self._raw)
+
+    def __iter__(self):
+        return iter(self._items if self._raw is None else self._raw)
+
+    def __len__(self):
+        return len(self._items if self._raw is None else self._raw)
+
+    def decode_all(self):
+        """Decodes any values not decoded yet, after which the dictionary no
+        longer refers to its dictionary values."""
+        raw = self._raw
+        if raw is None:
+            return
+        items = self._items
+        for key, value in raw.items():
+            if key not in items:
+                items[key] = self._decode(value)
+        self._raw = None
+
+    def __setitem__(self, key, value):
+        self.decode_all()
+        self._items[key] = value
+
+    def __delitem__(self, key):
+        self.decode_all()
+        del self._items[key]
+
+    def encode_items(self, encode):
+        """Returns a dictionary of the values encoded with the function
+        `encode`, as for `LazyList.encode_items()`."""
+        raw = self._raw
+        if raw is None:
+            return dict((k, encode(v)) for k, v in self._items.items())
+        copy_value = remoteobjects.dataobject.copy_value
+        items = self._items
+        return dict((k, encode(items[k]) if k in items else copy_value(v))
+                    for k, v in raw.items())
+
+    def __eq__(self, other):
+        if not isinstance(other, (dict, LazyDict)):
+            return NotImplemented
+        return dict(self.items()) == dict(other.items())
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    def __reduce__(self):
+        # Pickle and copy as a regular dictionary.
+        return (dict, (dict(self.items()),))
+
+
 class List(Field):
 
     """A field representing a homogeneous list of data.
@@ -258,16 +506,22 @@ class List(Field):
 
     """
 
-    def __init__(self, fld, **kwargs):
+    def __init__(self, fld, lazy=False, **kwargs):
         """Sets the type of field representing the content of the list.
 
         Parameter `fld` is another field instance representing the list's
         content. For instance, if the field were to represent a list of
         timestamps, `fld` would be a `Datetime` instance.
 
+        If optional parameter `lazy` is true, the list is decoded into a
+        `LazyList` (or for a `Dict` field, a `LazyDict`), which decodes each
+        item only when it's first used. Use this for long lists of which only
+        some items are usually read.
+
         """
         super(List, self).__init__(**kwargs)
         self.fld = fld
+        self.lazy = lazy
 
     def install(self, attrname, cls):
         super(List, self).install(attrname, cls)
@@ -282,13 +536,27 @@ class List(Field):
             if callable(self.default):
                 return self.default()
             return self.default or None
+        if self.lazy:
+            return LazyList(value, self.fld.decode)
         return [self.fld.decode(v) for v in value]
 
     def encode(self, value):
         """Encodes a `DataObject` attribute (a list of `DataObject` attribute
         values) into a dictionary value (a list of dictionary values)."""
+        if isinstance(value, LazyList):
+            return value.encode_items(self.fld.encode)
         return [self.fld.encode(v) for v in value]
 
+    def encode_deferred(self, value):
+        if not self.inherits_codec(List):
+            return self.encode(value)
+        if isinstance(value, LazyList):
+            return value.encode_items(self.fld.encode_deferred)
+        return [self.fld.encode_deferred(v) for v in value]
+
+    def is_passthrough(self):
+        return self.inherits_codec(List) and self.fld.is_passthrough()
+
 
 class Dict(List):
 
@@ -307,14 +575,28 @@ class Dict(List):
             if callable(self.default):
                 return self.default()
             return self.default or None
+        if self.lazy:
+            return LazyDict(value, self.fld.decode)
         return dict((k, self.fld.decode(v)) for k, v in value.items())
 
     def encode(self, value):
         """Encodes a `DataObject` attribute (a dictionary with decoded
         `DataObject` attribute values for values) into a dictionary value (a
         dictionary with encoded dictionary values for values)."""
+        if isinstance(value, LazyDict):
+            return value.encode_items(self.fld.encode)
         return dict((k, self.fld.encode(v)) for k, v in value.items())
 
+    def encode_deferred(self, value):
+        if not self.inherits_codec(Dict):
+            return self.encode(value)
+        if isinstance(value, LazyDict):
+            return value.encode_items(self.fld.encode_deferred)
+        return dict((k, self.fld.encode_deferred(v)) for k, v in value.items())
+
+    def is_passthrough(self):
+        return self.inherits_codec(Dict) and self.fld.is_passthrough()
+
 
 class AcceptsStringCls(object):
     """Mixin for fields with a ``cls`` attribute that can either be a
@@ -322,13 +604,27 @@ class AcceptsStringCls(object):
     allow forward references)."""
 
     def get_cls(self):
+        try:
+            return self.__dict__['resolved_cls']
+        except KeyError:
+            pass
         cls = self.__dict__['cls']
         if not callable(cls):
             cls = remoteobjects.dataobject.find_by_name(cls)
+            # Cache the class until another is declared with that name.
+            remoteobjects.dataobject.add_name_reference(self.__dict__['cls'],
+                                                        self)
+        self.__dict__['resolved_cls'] = cls
         return cls
 
     def set_cls(self, cls):
         self.__dict__['cls'] = cls
+        self.forget_cls()
+
+    def forget_cls(self):
+        """Discards the cached class the field's ``cls`` name refers to, so
+        it's looked up again next time."""
+        self.__dict__.pop('resolved_cls', None)
 
     cls = property(get_cls, set_cls)
 
@@ -336,7 +632,7 @@ class Object(AcceptsStringCls, Field):
 
     """A field representing a nested `DataObject`."""
 
-    def __init__(self, cls, **kwargs):
+    def __init__(self, cls, polymorphic=False, **kwargs):
         """Sets the the `DataObject` class the field represents.
 
         Parameter `cls` is the `DataObject` class representing the nested
@@ -349,9 +645,17 @@ class Object(AcceptsStringCls, Field):
         another module will make all name-based `Object` fields reference the
         new subclass.
 
+        If optional parameter `polymorphic` is true, each value is decoded
+        into the subclass of `cls` whose `Constant` field matches the value's
+        data, as found by `DataObject.class_for_data()`, or into `cls` itself
+        if no subclass matches. For example, a list of mixed kinds of events
+        can be decoded into the ``Event`` subclass for each kind with
+        ``fields.List(fields.Object(Event, polymorphic=True))``.
+
         """
         super(Object, self).__init__(**kwargs)
         self.cls = cls
+        self.polymorphic = polymorphic
 
     def decode(self, value):
         """Decodes the dictionary value into an instance of the `DataObject`
@@ -360,13 +664,21 @@ class Object(AcceptsStringCls, Field):
             if callable(self.default):
                 return self.default()
             return self.default
-        return self.cls.from_dict(value)
+        cls = self.cls
+        if self.polymorphic:
+            cls = cls.class_for_data(value)
+        return cls.from_dict(value)
 
     def encode(self, value):
         """Encodes an instance of the field's DataObject class into its
         representative dictionary value."""
         return value.to_dict()
 
+    def encode_deferred(self, value):
+        if not self.inherits_codec(Object):
+            return self.encode(value)
+        return value
+
 
 class UTC(tzinfo):
     """UTC"""
@@ -382,6 +694,46 @@ class UTC(tzinfo):
         return UTC.ZERO
 
 
+# Only ASCII digits, as \d would match other Unicode digits too.
+ISO8601 = re.compile(r'([0-9]{4})-([0-9]{2})-([0-9]{2})'
+                     r'T([0-9]{2}):([0-9]{2}):([0-9]{2})'
+                     r'(?:\.([0-9]{1,6}))?'
+                     r'(?:(Z)|([-+])([01][0-9]|2[0-3]):?([0-5][0-9]))\Z')
+
+
+def parse_timestamp(value):
+    """Parses a common ISO-8601 timestamp string into a UTC `datetime`.
+
+    Only complete timestamps with an explicit time zone, such as
+    ``YYYY-MM-DDTHH:MM:SSZ`` or ``YYYY-MM-DDTHH:MM:SS.ffffff+HH:MM``, whose
+    offsets are less than 24 hours with minutes under 60, are parsed. For any
+    other value, returns None.
+
+    """
+    if not isinstance(value, string_types):
+        return None
+    match = ISO8601.match(value)
+    if match is None:
+        return None
+    (year, month, day, hour, minute, second, fraction, zulu,
+     sign, offset_hours, offset_minutes) = match.groups()
+    microsecond = int(fraction.ljust(6, '0')) if fraction else 0
+    try:
+        when = datetime(int(year), int(month), int(day), int(hour),
+                        int(minute), int(second), microsecond,
+                        tzinfo=Datetime.utc)
+        if not zulu:
+            offset = timedelta(hours=int(offset_hours),
+                               minutes=int(offset_minutes))
+            if sign == '+':
+                when -= offset
+            else:
+                when += offset
+    except (ValueError, OverflowError):
+        return None
+    return when
+
+
 class Datetime(Field):
 
     """A field representing a timestamp."""
@@ -399,11 +751,18 @@ class Datetime(Field):
         Timestamp strings should be of in valid ISO-8601 format, such as
         ``YYYY-MM-DDTHH:MM:SSZ``,  The resulting `datetime` will have UTC
         tzinfo.
+
+        Common timestamp formats are parsed directly; anything else is
+        parsed with `dateutil.parser`.
+
         """
         if value is None:
             if callable(self.default):
                 return self.default()
             return self.default
+        when = parse_timestamp(value)
+        if when is not None:
+            return when
         try:
             # Use dateutil to handle parsing and TZ conversion
             return dateutil.parser.parse(value).astimezone(Datetime.utc)
@@ -449,6 +808,10 @@ class Link(AcceptsStringCls, Property):
     >>> f._location
     'http://example.com/item/feed'
 
+    The linked object is made once per instance and remembered, so reading
+    the attribute again returns the same (possibly delivered) object, until
+    the owning instance's URL changes.
+
     Override the `__get__` method of a `Link` subclass to customize how the
     URLs to linked objects are constructed.
 
@@ -484,7 +847,23 @@ class Link(AcceptsStringCls, Property):
         building links for your target API.
 
         """
-        if instance._location is None:
+        if instance is None:
+            return self
+        location = instance._location
+        if location is None:
             raise AttributeError('Cannot find URL of %s relative to URL-less %s' % (self.cls.__name__, owner.__name__))
-        newurl = urljoin(instance._location, self.api_name)
-        return self.cls.get(newurl)
+
+        # Reuse the object we made last time, if the URL is the same.
+        links = instance.__dict__.setdefault('_links', {})
+        try:
+            link_location, obj = links[self.attrname]
+        except KeyError:
+            pass
+        else:
+            if link_location == location:
+                return obj
+
+        newurl = urljoin(location, self.api_name)
+        obj = self.cls.get(newurl)
+        links[self.attrname] = location, obj
+        return obj
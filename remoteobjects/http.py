@@ -27,21 +27,399 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
 
-import simplejson as json
-from remoteobjects.json import ForgivingDecoder
+import remoteobjects.json
 
 import httplib2
-from six import PY3, text_type
+from six import text_type
 from six.moves import http_client  # python3: http.client
+from six.moves import queue
+from six.moves.urllib.parse import urlsplit, urlunsplit
+from contextlib import contextmanager
+import copy
 import logging
+import os
+import threading
 
-from remoteobjects.dataobject import DataObject
-
-userAgent = httplib2.Http()
+from remoteobjects.dataobject import (DataObject, IMMUTABLE_TYPES,
+                                      apply_merge_patch, copy_value)
 
 log = logging.getLogger('remoteobjects.http')
 
 
+class UserAgentProvider(object):
+
+    """A source of `httplib2.Http`-compatible user agents that can be shared
+    between threads.
+
+    As `httplib2.Http` instances are not safe to use from several threads at
+    once, a `UserAgentProvider` makes a request with one of a set of user
+    agents it manages. A provider can itself be used as a user agent, so you
+    can make one the default for all requests by assigning it to
+    `remoteobjects.http.userAgent`, which is a `ThreadLocalUserAgent` unless
+    you do:
+
+    >>> remoteobjects.http.userAgent = PooledUserAgent(size=4)
+
+    Providers are also fork-aware: user agents made in a parent process are
+    never used in a child process, so open connections aren't shared between
+    processes.
+
+    """
+
+    def __init__(self, factory=httplib2.Http):
+        """Sets the callable that makes new user agents.
+
+        Parameter `factory` is called with no arguments whenever the provider
+        needs another user agent. Use a function that configures the new
+        `httplib2.Http` instance (adding credentials, for example) if you need
+        to.
+
+        """
+        self.factory = factory
+        self.pid = os.getpid()
+        self.reset()
+
+    def reset(self):
+        """Discards all the provider's user agents."""
+        raise NotImplementedError
+
+    def check_fork(self):
+        """Discards the provider's user agents if they were made in another
+        process."""
+        pid = os.getpid()
+        if pid != self.pid:
+            self.pid = pid
+            self.reset()
+
+    def request(self, *args, **kwargs):
+        """Makes a request with one of the provider's user agents, as with
+        `httplib2.Http.request()`."""
+        raise NotImplementedError
+
+
+class ThreadLocalUserAgent(UserAgentProvider):
+
+    """A `UserAgentProvider` that keeps one user agent per thread."""
+
+    def reset(self):
+        self.local = threading.local()
+
+    def get_user_agent(self):
+        """Returns the current thread's user agent."""
+        self.check_fork()
+        try:
+            return self.local.http
+        except AttributeError:
+            http = self.local.http = self.factory()
+            return http
+
+    def request(self, *args, **kwargs):
+        return self.get_user_agent().request(*args, **kwargs)
+
+
+class PooledUserAgent(UserAgentProvider):
+
+    """A `UserAgentProvider` that lends out user agents from a pool of at
+    most a certain number of them.
+
+    Requests made when all the pool's user agents are in use wait for one to
+    be returned.
+
+    """
+
+    def __init__(self, factory=httplib2.Http, size=10, timeout=None):
+        """Sets the user agent factory, the maximum size of the pool, and
+        how many seconds to wait for a user agent to be available before
+        raising `PooledUserAgent.Exhausted` (by default, forever)."""
+        self.size = size
+        self.timeout = timeout
+        super(PooledUserAgent, self).__init__(factory)
+
+    class Exhausted(Exception):
+        """An exception raised when no user agent became available in the
+        pool in time."""
+        pass
+
+    def reset(self):
+        # Fill the pool with placeholders for user agents not made yet.
+        self.pool = queue.LifoQueue(self.size)
+        for _ in range(self.size):
+            self.pool.put(None)
+
+    @contextmanager
+    def borrow(self):
+        """Returns a context manager that takes a user agent out of the pool,
+        waiting if necessary, and returns it when the context exits.
+
+        >>> with provider.borrow() as http:
+        ...     response, content = http.request(uri=url)
+
+        """
+        self.check_fork()
+        pool = self.pool
+        try:
+            http = pool.get(timeout=self.timeout)
+        except queue.Empty:
+            raise self.Exhausted('No user agent available in %r after %s seconds'
+                % (self, self.timeout))
+
+        try:
+            # If making a user agent fails, the placeholder goes back.
+            if http is None:
+                http = self.factory()
+            yield http
+        finally:
+            # Don't return user agents to a pool replaced after a fork.
+            if pool is self.pool:
+                pool.put(http)
+
+    def request(self, *args, **kwargs):
+        with self.borrow() as http:
+            return http.request(*args, **kwargs)
+
+
+def coalescing_key(uri, method='GET', body=None, headers=None,
+                   methods=('GET', 'HEAD'), key_headers=None):
+    """Returns the key identifying requests made with the given parameters
+    that can share one response, or `None` if the request should never share
+    a response with another.
+
+    Only requests with no body made with one of the given `methods` are
+    shareable. Requests are the same if their methods and URIs are, and so
+    are their headers. Optional parameter `key_headers` is a sequence of the
+    (lowercase) header names that can make a difference to the response; if
+    not given, all headers do.
+
+    """
+    if body is not None or method not in methods:
+        return None
+    headers = headers or {}
+    header_key = tuple(sorted((k.lower(), v) for k, v in headers.items()
+                              if key_headers is None or k.lower() in key_headers))
+    return method, uri, header_key
+
+
+class CoalescingUserAgent(object):
+
+    """A user agent that makes only one request at a time for any resource,
+    sharing its response between all callers asking for it meanwhile.
+
+    When several threads request the same resource at once, such as by
+    calling `HttpObject.get()` or delivering `PromiseObject` instances for the
+    same URL, the first request goes through to the wrapped user agent and
+    the others wait for and receive its response (or exception). Use a
+    `CoalescingUserAgent` as the `http` parameter for requests, or assign one
+    to `remoteobjects.http.userAgent` to coalesce all default requests.
+
+    Which requests count as the same is determined by `coalescing_key()`.
+
+    """
+
+    def __init__(self, http=None, methods=('GET', 'HEAD'), key_headers=None):
+        """Sets the user agent to make requests with and which requests to
+        coalesce.
+
+        If `http` is not given, the user agent from
+        `get_threadsafe_user_agent()` at the time of the request is used.
+        Parameters `methods` and `key_headers` are as for `coalescing_key()`.
+
+        """
+        self.http = http
+        self.methods = methods
+        self.key_headers = key_headers
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    class _Call(object):
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
+    def request(self, uri, **kwargs):
+        http = self.http
+        if http is None:
+            http = get_threadsafe_user_agent()
+
+        key = coalescing_key(uri, kwargs.get('method', 'GET'),
+            kwargs.get('body'), kwargs.get('headers'),
+            methods=self.methods, key_headers=self.key_headers)
+        if key is None:
+            return http.request(uri=uri, **kwargs)
+
+        with self.lock:
+            call = self.calls.get(key)
+            leading = call is None
+            if leading:
+                call = self.calls[key] = self._Call()
+
+        if not leading:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = http.request(uri=uri, **kwargs)
+        except Exception as exc:
+            call.error = exc
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result
+
+
+class StreamingUserAgent(object):
+
+    """A minimal user agent that returns response bodies as iterators of byte
+    string chunks, instead of reading them into memory whole.
+
+    A `StreamingUserAgent` makes one plain HTTP or HTTPS request per call to
+    `request()`, with no caching, redirect following, authentication, or
+    compression. Use it where a response is too large to hold in memory at
+    once, as with `remoteobjects.listobject.PageObject.stream()`. As it keeps
+    no state between requests, it is safe to share between threads.
+
+    """
+
+    def __init__(self, timeout=None, chunk_size=65536):
+        """Sets the socket `timeout` for requests in seconds, and the size of
+        the chunks response bodies are read in."""
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+
+    def connection(self, uri):
+        """Returns a new `http_client.HTTPConnection` for requesting `uri`."""
+        scheme, netloc = urlsplit(uri)[:2]
+        if scheme == 'https':
+            conn_cls = http_client.HTTPSConnection
+        elif scheme == 'http':
+            conn_cls = http_client.HTTPConnection
+        else:
+            raise ValueError('Cannot stream %r: unsupported scheme %r'
+                             % (uri, scheme))
+        return conn_cls(netloc, timeout=self.timeout)
+
+    def request(self, uri, method='GET', body=None, headers=None):
+        """Makes a request as with `httplib2.Http.request()`, returning the
+        response and an iterator over the chunks of its body.
+
+        If `body` is an iterable of byte strings instead of a string, it's
+        sent with chunked transfer encoding as the chunks are produced.
+
+        The connection is closed when the body has been read, or when the
+        iterator is discarded.
+
+        """
+        parts = urlsplit(uri)
+        path = urlunsplit(('', '', parts.path or '/', parts.query, ''))
+        conn = self.connection(uri)
+        try:
+            if body is None or isinstance(body, (bytes, text_type)):
+                conn.request(method, path, body, headers or {})
+            else:
+                self.send_chunked(conn, method, path, body, headers or {})
+            resp = conn.getresponse()
+        except Exception:
+            conn.close()
+            raise
+        return httplib2.Response(resp), self.iter_body(conn, resp)
+
+    def send_chunked(self, conn, method, path, body, headers):
+        """Sends a request on `conn` with the chunks of the iterable `body`
+        as a chunked transfer encoded body."""
+        conn.putrequest(method, path)
+        for name, value in headers.items():
+            conn.putheader(name, value)
+        conn.putheader('Transfer-Encoding', 'chunked')
+        conn.endheaders()
+        for chunk in body:
+            if isinstance(chunk, text_type):
+                chunk = chunk.encode('utf-8')
+            if chunk:
+                size = ('%x\r\n' % len(chunk)).encode('ascii')
+                conn.send(size + chunk + b'\r\n')
+        conn.send(b'0\r\n\r\n')
+
+    def iter_body(self, conn, resp):
+        try:
+            while True:
+                chunk = resp.read(self.chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+        finally:
+            conn.close()
+
+
+userAgent = ThreadLocalUserAgent()
+
+streamingUserAgent = StreamingUserAgent()
+
+# The last plain `userAgent` and its thread-safe replacement.
+_threadsafeUserAgent = (None, None)
+
+
+def get_threadsafe_user_agent():
+    """Returns a default user agent that is safe to use from several threads
+    at once.
+
+    This is `userAgent`, unless it has been replaced with a plain
+    `httplib2.Http` instance; then it's a `ThreadLocalUserAgent` making
+    clones of that instance, as from `threadsafe_user_agent()`.
+
+    """
+    global _threadsafeUserAgent
+    http = userAgent
+    if isinstance(http, (UserAgentProvider, CoalescingUserAgent)):
+        return http
+    plain, provider = _threadsafeUserAgent
+    if plain is not http:
+        provider = threadsafe_user_agent(http)
+        _threadsafeUserAgent = (http, provider)
+    return provider
+
+
+def clone_user_agent(http):
+    """Returns a new `httplib2.Http` instance configured like `http`.
+
+    The clone shares the original's settings, cache and credentials, but
+    has connections of its own, so the two can be used from different
+    threads at once.
+
+    """
+    clone = copy.copy(http)
+    clone.connections = {}
+    clone.authorizations = []
+    return clone
+
+
+def threadsafe_user_agent(http=None):
+    """Returns a user agent that makes requests like `http` and is safe to
+    use from several threads at once.
+
+    `UserAgentProvider` and `CoalescingUserAgent` instances are returned as
+    they are. For a plain `httplib2.Http` instance, a `ThreadLocalUserAgent`
+    making clones of it with `clone_user_agent()` is returned, so requests
+    are made with its credentials and other settings. If `http` is `None`,
+    the result of `get_threadsafe_user_agent()` is returned.
+
+    Raises `ValueError` for other user agents, which can't be known to be
+    thread-safe; wrap them in a `UserAgentProvider` to use them from several
+    threads.
+
+    """
+    if http is None:
+        return get_threadsafe_user_agent()
+    if isinstance(http, (UserAgentProvider, CoalescingUserAgent)):
+        return http
+    if isinstance(http, httplib2.Http):
+        return ThreadLocalUserAgent(factory=lambda: clone_user_agent(http))
+    raise ValueError('User agent %r is not known to be thread-safe' % (http,))
+
+
 def omit_nulls(data):
     """Strips `None` values from a dictionary or `RemoteObject` instance."""
     if not isinstance(data, dict):
@@ -54,6 +432,15 @@ def omit_nulls(data):
     return data
 
 
+def expand_objects(data):
+    """Converts a `DataObject` instance left in data from `to_json_data()`
+    into its own `to_json_data()` dictionary, or strips `None` values from
+    other objects as `omit_nulls()` does."""
+    if isinstance(data, DataObject):
+        return data.to_json_data()
+    return omit_nulls(data)
+
+
 class HttpObject(DataObject):
 
     """A `DataObject` that can be fetched and put over HTTP through a RESTful
@@ -66,7 +453,7 @@ class HttpObject(DataObject):
         http_client.NO_CONTENT:        False,
         http_client.MOVED_PERMANENTLY: True,
         http_client.FOUND:             True,
-        http_client.NOT_MODIFIED:      True,
+        http_client.NOT_MODIFIED:      False,
     }
 
     location_headers = {
@@ -84,6 +471,12 @@ class HttpObject(DataObject):
 
     content_types = ('application/json',)
 
+    cache = None
+
+    json_codec = None
+
+    patch_content_type = 'application/merge-patch+json'
+
     class NotFound(http_client.HTTPException):
         """An HTTPException thrown when the server reports that the requested
         resource was not found."""
@@ -150,7 +543,7 @@ class HttpObject(DataObject):
 
     @classmethod
     def statefields(cls):
-        return super(HttpObject, cls).statefields() + ['_location', '_etag']
+        return super(HttpObject, cls).statefields() + ['_location', '_etag', '_last_modified']
 
     def get_request(self, url=None, headers=None, **kwargs):
         """Returns the parameters for requesting this `RemoteObject` instance
@@ -174,6 +567,17 @@ class HttpObject(DataObject):
         request.update(kwargs)
         return request
 
+    @classmethod
+    def get_json_codec(cls):
+        """Returns the `remoteobjects.json.Codec` that instances of this
+        class use to decode and encode their JSON content.
+
+        This is the registered codec named by the class's `json_codec`
+        attribute, or the default codec if that is None.
+
+        """
+        return remoteobjects.json.get_codec(cls.json_codec)
+
     @classmethod
     def raise_for_response(cls, url, response, content):
         """Raises exceptions corresponding to invalid HTTP responses that
@@ -263,23 +667,7 @@ class HttpObject(DataObject):
         self.raise_for_response(url, response, content)
 
         if self.response_has_content.get(response.status):
-            if PY3:
-                # Both simplejson and the built-in json module decode the bytes
-                # before passing it to the JSONDecoder in python3,
-                # so we might as well do the same thing
-                # instead of passing bytes to a modified JSONDecoder
-                # https://github.com/simplejson/simplejson/blob/v3.17.5/simplejson/decoder.py#L368-L369
-                # https://github.com/python/cpython/blob/v3.9.7/Lib/json/__init__.py#L341
-                if not isinstance(content, text_type):
-                    # use a forgiving decode
-                    content = content.decode('utf-8', errors='replace')
-                data = json.loads(content)
-            else:
-                try:
-                    data = json.loads(content)
-                except UnicodeDecodeError:
-                    data = json.loads(content, cls=ForgivingDecoder)
-
+            data = self.get_json_codec().loads(content)
             self.update_from_dict(data)
 
         location_header = self.location_headers.get(response.status)
@@ -292,6 +680,90 @@ class HttpObject(DataObject):
 
         if 'etag' in response:
             self._etag = response['etag']
+        if 'last-modified' in response:
+            self._last_modified = response['last-modified']
+
+    def update_from_instance(self, other):
+        """Makes this instance a copy of `other`, another instance of the
+        same class.
+
+        The copy is deep, so changing either instance, including values
+        nested in their fields, doesn't change the other. Only decoded values
+        that can't change, such as numbers and timestamps, are shared.
+
+        """
+        self._clear_local_values()
+        api_data = other.__dict__['api_data']
+        self.__dict__['api_data'] = copy_value(api_data)
+        modified = other._modified_fields()
+        values = {}
+        for attrname, value in other._local_values().items():
+            if isinstance(value, IMMUTABLE_TYPES):
+                values[attrname] = value
+            elif attrname in modified:
+                values[attrname] = copy_value(value)
+            # Otherwise the value is its API data, which we already copied.
+        self._set_local_values(values)
+        if '_released' in other.__dict__:
+            self.__dict__['_released'] = other.__dict__['_released']
+
+        self._location = other._location
+        if getattr(other, '_etag', None) is not None:
+            self._etag = other._etag
+        if getattr(other, '_last_modified', None) is not None:
+            self._last_modified = other._last_modified
+
+    def update_from_cache(self, url):
+        """Fills this instance from the class's `cache` with the instance
+        cached for URL `url`, if there is one.
+
+        Returns whether the instance was filled.
+
+        """
+        cache = self.cache
+        if cache is None:
+            return False
+        other = cache.get(url)
+        # Undelivered PromiseObject instances have a subclass of their own.
+        cls = getattr(self, '_promised_cls', type(self))
+        if other is None or type(other) is not cls:
+            return False
+        self.update_from_instance(other)
+        return True
+
+    def store_in_cache(self, url, response):
+        """Saves a copy of this instance in the class's `cache` as the
+        resource at URL `url`, if the `response` it was fetched with
+        permits.
+
+        Instances with fields that were changed since they were fetched
+        aren't stored. For a ``304 Not Modified`` response, the instance
+        already cached for the URL is renewed instead.
+
+        """
+        cache = self.cache
+        if cache is None:
+            return
+        if response.status == http_client.NOT_MODIFIED:
+            # The instance wasn't updated, so it may have unsaved changes;
+            # renew the cached copy of the resource instead, if there is one.
+            if cache.touch(url, response):
+                return
+        if self._modified_fields():
+            return
+        # Cache a copy, so changes to this instance don't leak to others.
+        other = type(self)()
+        other.update_from_instance(self)
+        cache.store(url, other, response)
+
+    def invalidate_cache(self, url=None):
+        """Evicts the resource at URL `url` (by default, this instance's
+        URL) from the class's `cache`."""
+        cache = self.cache
+        if url is None:
+            url = self._location
+        if cache is not None and url is not None:
+            cache.invalidate(url)
 
     @classmethod
     def get(cls, url, http=None, **kwargs):
@@ -301,8 +773,14 @@ class HttpObject(DataObject):
         Optional parameter `http` is the user agent object to use for
         fetching. `http` should be compatible with `httplib2.Http` instances.
 
+        If the class has a `cache`, a fresh instance cached for the URL is
+        copied instead, unless other keyword parameters for the request are
+        given.
+
         """
         self = cls()
+        if not kwargs and self.update_from_cache(url):
+            return self
         request = self.get_request(url=url, **kwargs)
 
         if http is None:
@@ -310,9 +788,49 @@ class HttpObject(DataObject):
         response, content = http.request(**request)
 
         self.update_from_response(url, response, content)
+        if not kwargs:
+            self.store_in_cache(url, response)
         return self
 
-    def post(self, obj, http=None):
+    def refresh(self, http=None):
+        """Updates the instance with the current state of its remote
+        resource, if it has changed.
+
+        The resource is requested conditionally on its ``ETag`` and
+        ``Last-Modified`` headers from when the instance was last fetched.
+        If the server reports the resource is not modified, the instance is
+        left as it is, including any of its already decoded field values.
+
+        Optional parameter `http` is the user agent object to use. `http`
+        objects should be compatible with `httplib2.Http` objects.
+
+        Returns whether the instance was updated with new content.
+
+        """
+        request = self.refresh_request()
+        if http is None:
+            http = userAgent
+        response, content = http.request(**request)
+
+        self.update_from_response(self._location, response, content)
+        self.store_in_cache(self._location, response)
+        return response.status != http_client.NOT_MODIFIED
+
+    def refresh_request(self):
+        """Returns the parameters for conditionally requesting this
+        instance's resource again, as for `get_request()`."""
+        if getattr(self, '_location', None) is None:
+            raise ValueError('Cannot refresh %r with no URL' % self)
+
+        headers = {}
+        if getattr(self, '_etag', None) is not None:
+            headers['if-none-match'] = self._etag
+        if getattr(self, '_last_modified', None) is not None:
+            headers['if-modified-since'] = self._last_modified
+
+        return self.get_request(headers=headers)
+
+    def post(self, obj, http=None, stream=False):
         """Add another `RemoteObject` to this remote resource through an HTTP
         ``POST`` request.
 
@@ -323,48 +841,158 @@ class HttpObject(DataObject):
         Optional parameter `http` is the user agent object to use for posting.
         `http` should be compatible with `httplib2.Http` objects.
 
+        If optional parameter `stream` is true, the request body is encoded
+        as it's sent, as for `encode_body()`. The user agent must then accept
+        an iterable body, as `StreamingUserAgent` and, on Python 3,
+        `httplib2.Http` do.
+
         """
+        request = self.post_request(obj, stream=stream)
+        if http is None:
+            http = userAgent
+        response, content = http.request(**request)
+        content = self.join_content(content)
+
+        self.invalidate_cache()
+        obj.update_from_response(self._location, response, content)
+
+    def post_request(self, obj, stream=False):
+        """Returns the parameters for ``POST``ing `obj` to this instance's
+        resource, as for `get_request()`."""
         if getattr(self, '_location', None) is None:
             raise ValueError('Cannot add %r to %r with no URL to POST to'
                 % (obj, self))
 
-        body = json.dumps(obj.to_dict(), default=omit_nulls)
+        body = obj.encode_body(stream=stream)
 
         headers = {'content-type': self.content_types[0]}
 
-        request = obj.get_request(url=self._location, method='POST',
+        return obj.get_request(url=self._location, method='POST',
             body=body, headers=headers)
-        if http is None:
-            http = userAgent
-        response, content = http.request(**request)
-
-        obj.update_from_response(self._location, response, content)
 
-    def put(self, http=None):
+    def put(self, http=None, stream=False):
         """Save a previously requested `RemoteObject` back to its remote
         resource through an HTTP ``PUT`` request.
 
         Optional `http` parameter is the user agent object to use. `http`
         objects should be compatible with `httplib2.Http` objects.
 
+        If optional parameter `stream` is true, the request body is encoded
+        as it's sent, as for `post()`.
+
         """
+        request = self.put_request(stream=stream)
+        if http is None:
+            http = userAgent
+        response, content = http.request(**request)
+        content = self.join_content(content)
+
+        log.debug('Yay saved my obj, now turning %r into new content', content)
+        self.invalidate_cache()
+        self.update_from_response(self._location, response, content)
+
+    def put_request(self, stream=False):
+        """Returns the parameters for saving this instance back to its
+        resource with a ``PUT`` request, as for `get_request()`."""
         if getattr(self, '_location', None) is None:
             raise ValueError('Cannot save %r with no URL to PUT to' % self)
 
-        body = json.dumps(self.to_dict(), default=omit_nulls)
+        body = self.encode_body(stream=stream)
 
         headers = {}
         if hasattr(self, '_etag') and self._etag is not None:
             headers['if-match'] = self._etag
         headers['content-type'] = self.content_types[0]
 
-        request = self.get_request(method='PUT', body=body, headers=headers)
+        return self.get_request(method='PUT', body=body, headers=headers)
+
+    def encode_body(self, stream=False):
+        """Encodes the instance as JSON for the body of a ``PUT`` or ``POST``
+        request.
+
+        If `stream` is true, returns an iterator over chunks of the JSON
+        instead of the whole string. The chunks are produced as the instance's
+        fields are encoded, from `to_json_data()`, so instances referenced
+        from its `Object` fields (such as the entries of a large `ListObject`)
+        are encoded one at a time and no whole dictionary tree or JSON string
+        of the instance is built.
+
+        """
+        codec = self.get_json_codec()
+        if stream:
+            return codec.iterdumps(self.to_json_data(),
+                                   default=expand_objects)
+        return codec.dumps(self.to_dict(), default=omit_nulls)
+
+    @staticmethod
+    def join_content(content):
+        """Joins a response body returned as an iterable of chunks, as by
+        `StreamingUserAgent`, into one string."""
+        if content is None or isinstance(content, (bytes, text_type)):
+            return content
+        return b''.join(content)
+
+    def patch(self, http=None):
+        """Saves only the changed fields of a previously requested
+        `RemoteObject` back to its remote resource through an HTTP ``PATCH``
+        request.
+
+        The request body is a JSON merge patch (RFC 7396) of the changed
+        fields, as from `to_patch_dict()`. If the response has no content,
+        the instance's data is updated with the patch.
+
+        Optional `http` parameter is the user agent object to use. `http`
+        objects should be compatible with `httplib2.Http` objects.
+
+        """
+        changes = self.to_patch_dict()
+        request = self.patch_request(changes)
         if http is None:
             http = userAgent
         response, content = http.request(**request)
 
-        log.debug('Yay saved my obj, now turning %r into new content', content)
+        self.invalidate_cache()
+        self.update_from_patch_response(changes, response, content)
+
+    def patch_request(self, changes=None):
+        """Returns the parameters for saving this instance's changed fields
+        back to its resource with a ``PATCH`` request, as for
+        `get_request()`.
+
+        Optional parameter `changes` is the merge patch to send, by default
+        the instance's `to_patch_dict()`.
+
+        """
+        if getattr(self, '_location', None) is None:
+            raise ValueError('Cannot save %r with no URL to PATCH to' % self)
+        if changes is None:
+            changes = self.to_patch_dict()
+
+        body = self.get_json_codec().dumps(changes, default=omit_nulls)
+
+        headers = {}
+        if hasattr(self, '_etag') and self._etag is not None:
+            headers['if-match'] = self._etag
+        headers['content-type'] = self.patch_content_type
+
+        return self.get_request(method='PATCH', body=body, headers=headers)
+
+    def update_from_patch_response(self, changes, response, content):
+        """Updates this instance from the response to a ``PATCH`` request
+        sending the merge patch `changes`."""
         self.update_from_response(self._location, response, content)
+        if self.response_has_content.get(response.status):
+            return
+
+        # The server didn't send the new resource, so apply the patch to
+        # our copy of it ourselves.
+        api_data = self.api_data
+        for key, value in changes.items():
+            if value is None:
+                api_data.pop(key, None)
+            else:
+                api_data[key] = apply_merge_patch(api_data.get(key), value)
+        self.__dict__.pop('_changed', None)
 
     def delete(self, http=None):
         """Delete the remote resource represented by the `RemoteObject`
@@ -374,6 +1002,16 @@ class HttpObject(DataObject):
         objects should be compatible with `httplib2.Http` objects.
 
         """
+        request = self.delete_request()
+        if http is None:
+            http = userAgent
+        response, content = http.request(**request)
+
+        self.update_from_delete_response(response, content)
+
+    def delete_request(self):
+        """Returns the parameters for deleting this instance's resource with
+        a ``DELETE`` request, as for `get_request()`."""
         if getattr(self, '_location', None) is None:
             raise ValueError('Cannot delete %r with no URL to DELETE' % self)
 
@@ -381,11 +1019,12 @@ class HttpObject(DataObject):
         if hasattr(self, '_etag') and self._etag is not None:
             headers['if-match'] = self._etag
 
-        request = self.get_request(method='DELETE', headers=headers)
-        if http is None:
-            http = userAgent
-        response, content = http.request(**request)
+        return self.get_request(method='DELETE', headers=headers)
 
+    def update_from_delete_response(self, response, content):
+        """Disconnects this instance from its remote resource after a
+        successful ``DELETE`` response."""
+        self.invalidate_cache()
         self.raise_for_response(self._location, response, content)
 
         log.debug('Yay deleted the remote resource, now disconnecting %r from it', self)
@@ -27,6 +27,11 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
 
+from __future__ import absolute_import
+
+import json as stdlib_json
+
+import simplejson
 from simplejson import JSONDecoder
 from simplejson.decoder import BACKSLASH, STRINGCHUNK, DEFAULT_ENCODING
 try:
@@ -39,7 +44,9 @@ except ImportError:
     # https://github.com/simplejson/simplejson/commit/0d36c5cd16055d55e6eceaf252f072a9339e0746
     from simplejson.scanner import errmsg
 from simplejson.scanner import py_make_scanner
-from six import unichr, text_type
+from six import integer_types, string_types, text_type, unichr
+import codecs
+import re
 import sys
 
 # Truly heinous... we are going to the trouble of reproducing this
@@ -124,7 +131,436 @@ def forgiving_scanstring(s, end, encoding=None, strict=True, _b=BACKSLASH, _m=ST
 
 
 class ForgivingDecoder(JSONDecoder):
+
+    """A `JSONDecoder` that replaces invalid UTF-8 sequences in strings with
+    the Unicode replacement character.
+
+    As it uses simplejson's pure-Python scanner, this decoder is much slower
+    than `forgiving_loads()`, which remoteobjects now uses instead. It is
+    kept for compatibility.
+
+    """
+
     def __init__(self, *args, **kwargs):
         super(ForgivingDecoder, self).__init__(*args, **kwargs)
         self.parse_string = forgiving_scanstring
         self.scan_once = py_make_scanner(self)
+
+
+def repair_utf8(content):
+    """Decodes the byte string `content` as UTF-8, replacing any invalid
+    sequences in it with the Unicode replacement character.
+
+    Text strings are returned unchanged.
+
+    """
+    if isinstance(content, text_type):
+        return content
+    return content.decode('utf-8', 'replace')
+
+
+def forgiving_loads(content):
+    """Decodes JSON text, replacing any invalid UTF-8 sequences in it with
+    the Unicode replacement character.
+
+    The whole text is repaired with `repair_utf8()` before it's decoded, so
+    it can be decoded by simplejson's fast C scanner, instead of the
+    pure-Python `ForgivingDecoder`.
+
+    """
+    return simplejson.loads(repair_utf8(content))
+
+
+JSON_TYPES = (dict, list, tuple, float, bool, type(None)) + integer_types + string_types
+
+
+def has_objects(items):
+    """Returns whether any of `items` isn't a plain JSON value."""
+    for item in items:
+        if not isinstance(item, JSON_TYPES):
+            return True
+    return False
+
+
+def iterencode(obj, dumps, default=None):
+    """Yields the JSON text encoding `obj` in pieces.
+
+    Lists and tuples containing objects that aren't plain JSON values, and
+    dictionaries containing those objects or lists of them, are encoded an
+    item at a time. The objects are converted with the function `default`
+    only when they're reached, and the results encoded the same way.
+    Everything else is encoded whole with function `dumps`, which should
+    accept a `default` keyword parameter as `Codec.dumps()` does.
+
+    """
+    if isinstance(obj, (list, tuple)):
+        if not has_objects(obj):
+            yield dumps(obj, default=default)
+            return
+        yield '['
+        for i, item in enumerate(obj):
+            if i:
+                yield ', '
+            for piece in iterencode(item, dumps, default):
+                yield piece
+        yield ']'
+    elif isinstance(obj, dict):
+        values = obj.values()
+        walk = has_objects(values) or any(
+            isinstance(value, (list, tuple)) and has_objects(value)
+            for value in values)
+        if not walk or not all(isinstance(key, string_types) for key in obj):
+            yield dumps(obj, default=default)
+            return
+        yield '{'
+        for i, (key, value) in enumerate(obj.items()):
+            if i:
+                yield ', '
+            yield dumps(key)
+            yield ': '
+            for piece in iterencode(value, dumps, default):
+                yield piece
+        yield '}'
+    elif isinstance(obj, JSON_TYPES) or default is None:
+        yield dumps(obj, default=default)
+    else:
+        for piece in iterencode(default(obj), dumps, default):
+            yield piece
+
+
+def canonical_dumps(obj):
+    """Encodes `obj` as canonical JSON: with sorted keys, no optional
+    whitespace, and only ASCII characters, as a byte string.
+
+    Equal values always encode to the same bytes, so use this to hash or
+    compare JSON data.
+
+    """
+    return stdlib_json.dumps(obj, sort_keys=True, separators=(',', ':'),
+                             ensure_ascii=True).encode('ascii')
+
+
+def join_chunks(pieces, chunk_size=65536):
+    """Joins the text strings `pieces` into UTF-8 byte strings of about
+    `chunk_size` bytes, yielding them as they fill up."""
+    buf = []
+    size = 0
+    for piece in pieces:
+        if isinstance(piece, text_type):
+            piece = piece.encode('utf-8')
+        buf.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield b''.join(buf)
+            buf = []
+            size = 0
+    if buf:
+        yield b''.join(buf)
+
+
+class Codec(object):
+
+    """A JSON encoder and decoder.
+
+    Subclass `Codec` to use another JSON library, and add an instance of
+    your subclass to the registry with `register_codec()`.
+
+    """
+
+    name = None
+
+    def loads(self, content):
+        """Decodes the JSON text `content`, a byte or text string.
+
+        Byte strings should be UTF-8. If they contain invalid UTF-8, the
+        invalid sequences are replaced with the Unicode replacement
+        character, as by `forgiving_loads()`. Raises `ValueError` if the
+        text is not valid JSON.
+
+        Whether byte strings are decoded without first being copied into a
+        text string depends on the library: `OrjsonCodec` parses them
+        directly, while the `json` and `simplejson` libraries decode them to
+        text first.
+
+        """
+        raise NotImplementedError
+
+    def dumps(self, obj, default=None):
+        """Encodes `obj` as a JSON text string, calling function `default` to
+        convert any objects that can't otherwise be encoded."""
+        raise NotImplementedError
+
+    def iterdumps(self, obj, default=None, chunk_size=65536):
+        """Encodes `obj` as JSON text, as `dumps()` does, yielding it as
+        UTF-8 byte strings of about `chunk_size` bytes.
+
+        Objects that `default` converts are converted only as they're
+        reached, as by `iterencode()`, so a large structure of them is never
+        held in memory as a whole, in either converted or encoded form.
+
+        """
+        pieces = iterencode(obj, self.dumps, default=default)
+        return join_chunks(pieces, chunk_size)
+
+
+class SimplejsonCodec(Codec):
+
+    """A `Codec` using the `simplejson` library.
+
+    Byte strings are decoded to text before they're parsed, which simplejson
+    does internally.
+
+    """
+
+    name = 'simplejson'
+
+    def loads(self, content):
+        try:
+            return simplejson.loads(content)
+        except UnicodeDecodeError:
+            return forgiving_loads(content)
+
+    def dumps(self, obj, default=None):
+        return simplejson.dumps(obj, default=default)
+
+
+class StdlibCodec(Codec):
+
+    """A `Codec` using Python's built-in `json` module.
+
+    Byte strings are decoded to text before they're parsed, which the `json`
+    module does internally.
+
+    """
+
+    name = 'json'
+
+    def loads(self, content):
+        try:
+            return stdlib_json.loads(content)
+        except UnicodeDecodeError:
+            return forgiving_loads(content)
+
+    def dumps(self, obj, default=None):
+        return stdlib_json.dumps(obj, default=default)
+
+
+class OrjsonCodec(Codec):
+
+    """A `Codec` using the `orjson` library, if it is installed.
+
+    Unlike the other codecs, this one parses byte strings directly, with no
+    intermediate text string.
+
+    As `orjson` is stricter than the other libraries (rejecting lone
+    surrogates, for example), JSON text it can't decode is decoded again
+    with `forgiving_loads()`.
+
+    """
+
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self.orjson = orjson
+
+    def loads(self, content):
+        try:
+            return self.orjson.loads(content)
+        except self.orjson.JSONDecodeError:
+            return forgiving_loads(content)
+
+    def dumps(self, obj, default=None):
+        return self.orjson.dumps(obj, default=default).decode('utf-8')
+
+
+codecs_by_name = {}
+default_codec = None
+
+
+def register_codec(codec, default=False):
+    """Adds the `Codec` instance `codec` to the registry, making it the
+    default codec too if `default` is true."""
+    global default_codec
+    codecs_by_name[codec.name] = codec
+    if default or default_codec is None:
+        default_codec = codec
+
+
+def get_codec(name=None):
+    """Returns the registered `Codec` with the given name, or the default
+    codec if `name` is None.
+
+    If there is no codec by that name, raises `KeyError`.
+
+    """
+    if name is None:
+        return default_codec
+    return codecs_by_name[name]
+
+
+def set_default_codec(name):
+    """Makes the registered `Codec` with the given name the default codec,
+    such as ``'json'``, ``'simplejson'`` or ``'orjson'``."""
+    global default_codec
+    default_codec = get_codec(name)
+
+
+def loads(content):
+    """Decodes JSON text with the default codec."""
+    return default_codec.loads(content)
+
+
+def dumps(obj, default=None):
+    """Encodes an object as JSON text with the default codec."""
+    return default_codec.dumps(obj, default=default)
+
+
+register_codec(SimplejsonCodec())
+register_codec(StdlibCodec())
+try:
+    register_codec(OrjsonCodec())
+except ImportError:
+    pass
+
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class StreamBuffer(object):
+
+    """A buffer of JSON text read incrementally from an iterable of chunks.
+
+    Byte string chunks are decoded as UTF-8, replacing any invalid bytes as
+    `ForgivingDecoder` does. Only the text not yet consumed and the latest
+    chunk are kept in memory.
+
+    """
+
+    def __init__(self, chunks, decoder=None):
+        self.chunks = iter(chunks)
+        self.decoder = decoder or JSONDecoder()
+        self.utf8 = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self.text = u''
+        self.pos = 0
+        self.done = False
+
+    def read(self):
+        """Adds the next chunk to the buffer, returning False if there are no
+        more chunks."""
+        if self.done:
+            return False
+        try:
+            chunk = next(self.chunks)
+        except StopIteration:
+            self.done = True
+            chunk = self.utf8.decode(b'', True)
+        else:
+            if not isinstance(chunk, text_type):
+                chunk = self.utf8.decode(chunk)
+        self.text = self.text[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def read_more(self, size):
+        """Reads chunks until at least `size` more characters are buffered or
+        the chunks run out, returning False if there were none to read."""
+        wanted = len(self.text) - self.pos + max(size, 1)
+        read = False
+        while len(self.text) - self.pos < wanted and self.read():
+            read = True
+        return read
+
+    def peek(self):
+        """Skips whitespace and returns the next character, or an empty
+        string at the end of the text."""
+        while True:
+            self.pos = WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.read():
+                return ''
+
+    def expect(self, chars):
+        """Consumes the next character, which must be one of `chars`, and
+        returns it."""
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(errmsg("Expecting one of %r" % (chars,),
+                                    self.text, self.pos))
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Consumes and returns the next complete JSON value."""
+        self.peek()
+        while True:
+            # Reading at least as much again as we have buffered each time
+            # keeps decoding large values from taking quadratic time.
+            pending = len(self.text) - self.pos
+            try:
+                obj, end = self.decoder.raw_decode(self.text, self.pos)
+            except ValueError:
+                if not self.read_more(pending):
+                    raise
+                continue
+            # A number may have been cut short (as "1.5e3" can be read as
+            # "1.5"), so make sure a delimiter follows before using it.
+            after = WHITESPACE.match(self.text, end).end()
+            if (after == len(self.text) or self.text[after] not in ',:]}') \
+                    and self.read_more(pending):
+                continue
+            self.pos = end
+            return obj
+
+
+def _iter_array(stream):
+    if stream.peek() == ']':
+        stream.pos += 1
+        return
+    while True:
+        yield stream.value()
+        if stream.expect(',]') == ']':
+            return
+
+
+def iterdecode_array(chunks, key=None, others=None):
+    """Yields the items of a JSON array as they are decoded from `chunks`,
+    an iterable of byte or text strings.
+
+    If `key` is given, the JSON text should be an object, and the items of
+    its `key` member are yielded. The object's other members are decoded
+    whole, and if optional parameter `others` is a dictionary, saved in it.
+    Otherwise, the JSON text should be an array.
+
+    Unlike decoding the whole text, only one item is held in memory at a
+    time. `ValueError` is raised if the JSON text is invalid, when the
+    invalid part is reached.
+
+    """
+    stream = StreamBuffer(chunks)
+    if key is None:
+        stream.expect('[')
+        for item in _iter_array(stream):
+            yield item
+    else:
+        stream.expect('{')
+        if stream.peek() == '}':
+            stream.pos += 1
+        else:
+            while True:
+                name = stream.value()
+                stream.expect(':')
+                if name == key and stream.peek() == '[':
+                    stream.pos += 1
+                    for item in _iter_array(stream):
+                        yield item
+                else:
+                    value = stream.value()
+                    if others is not None:
+                        others[name] = value
+                if stream.expect(',}') == '}':
+                    break
+
+    if stream.peek():
+        raise ValueError(errmsg("Extra data", stream.text, stream.pos))
@@ -28,9 +28,12 @@
 # POSSIBILITY OF SUCH DAMAGE.
 
 import sys
-from six import with_metaclass
+from six import text_type, with_metaclass
 
 import remoteobjects.fields as fields
+import remoteobjects.http
+import remoteobjects.json
+import remoteobjects.promise
 from remoteobjects.promise import PromiseObject
 
 
@@ -208,6 +211,129 @@ class PageObject(with_metaclass(PageOf, SequenceProxy, PromiseObject)):
         else:
             return getitem(key)
 
+    def pages(self, page_size=100, prefetch=True):
+        """Yields the successive pages of the list resource as delivered
+        `PageObject` instances of up to `page_size` entries each.
+
+        Pages are requested with ``limit`` and ``offset`` filter parameters,
+        as when slicing the instance, and paging stops at the first page with
+        fewer than `page_size` entries, or none at all. Use a `page_size` no
+        larger than the most entries your target API will return in one page,
+        or paging will stop early. If the class has a ``total_results``
+        attribute, such as a field for the number of entries in the whole
+        list, paging also stops once a page reaches that many entries, saving
+        the request for an empty last page.
+
+        Unless `prefetch` is false, each next page is fetched on a background
+        thread while the caller works with the current one. As plain
+        `httplib2.Http` user agents can't be used from two threads at once,
+        background requests are not made with the instance's own user agent
+        if it's one of those, but with a clone of it, as by
+        `remoteobjects.http.threadsafe_user_agent()`. Clones share their
+        originals' credentials and settings, but not their connections or
+        what they've learned from authentication challenges. Give the
+        instance a `remoteobjects.http.UserAgentProvider` as its user agent
+        to control which user agents background requests use.
+
+        """
+        offset = 0
+        page = self[offset:offset + page_size]
+        wait = None
+        while True:
+            if wait is not None:
+                wait()
+            # A page with no list of entries is an empty last page.
+            entries = page.entries or ()
+            total = getattr(page, 'total_results', None)
+
+            next_page = None
+            if len(entries) >= page_size and (
+                    total is None or offset + len(entries) < total):
+                offset += page_size
+                next_page = self[offset:offset + page_size]
+                if prefetch:
+                    wait = remoteobjects.promise._deliver_in_background(next_page)
+
+            yield page
+
+            if next_page is None:
+                return
+            page = next_page
+
+    def iter_all(self, page_size=100, prefetch=True):
+        """Yields all the entries of the list resource, fetching them a page
+        at a time.
+
+        See `pages()` for how the pages are fetched.
+
+        """
+        for page in self.pages(page_size=page_size, prefetch=prefetch):
+            for entry in page.entries or ():
+                yield entry
+
+    def stream(self, http=None, others=None):
+        """Yields the entries of the list resource, decoding each one as it
+        arrives in the response.
+
+        Unlike delivering the instance, streaming never holds the whole
+        response in memory, so memory use is bounded by the size of one
+        entry instead of the size of the list. Entries are decoded as by the
+        class's ``entries`` field. The instance itself is not updated, but if
+        optional parameter `others` is a dictionary, the other members of the
+        response object (such as a total count) are saved in it.
+
+        Optional parameter `http` is the user agent to request the list with.
+        It should return the response body as an iterable of byte strings,
+        as `remoteobjects.http.StreamingUserAgent` does. Other user agents
+        compatible with `httplib2.Http` work too, but read the whole response
+        before any entries are decoded. By default, the user agent the
+        instance was created with is used, so requests keep its credentials;
+        only if there is none is `remoteobjects.http.streamingUserAgent`
+        used.
+
+        """
+        if http is None:
+            http = self._http
+        if http is None:
+            http = remoteobjects.http.streamingUserAgent
+        url = self._location
+        request = self.get_request(url=url)
+        response, content = http.request(**request)
+
+        if isinstance(content, (bytes, text_type)):
+            chunks = (content,)
+        else:
+            chunks = content
+            # Error responses are small, and may be needed whole for the
+            # exception message.
+            content = b''.join(chunks) if response.status >= 400 else None
+        self.raise_for_response(url, response, content)
+        if not self.response_has_content.get(response.status):
+            return
+
+        decode = type(self).entries.fld.decode
+        items = remoteobjects.json.iterdecode_array(
+            chunks, key=self.stream_key(), others=others)
+        for item in items:
+            yield decode(item)
+
+    def stream_key(self):
+        """Returns the name of the member of the response object containing
+        the entries, for `stream()`."""
+        return type(self).entries.api_name
+
+    def prefetch(self, name, max_workers=8):
+        """Delivers the objects linked from each of the instance's entries by
+        the `Link` named `name` concurrently.
+
+        Use this before reading a linked object from every entry, so the
+        entries' linked objects are fetched in parallel instead of one by
+        one. See `remoteobjects.promise.prefetch()`.
+
+        """
+        return remoteobjects.promise.prefetch(self.entries, name,
+                                              max_workers=max_workers)
+
 
 class ListOf(PageOf):
 
@@ -221,3 +347,10 @@ class ListObject(with_metaclass(ListOf, PageObject)):
 
     def to_dict(self):
         return super(ListObject, self).to_dict()['entries']
+
+    def to_json_data(self):
+        return super(ListObject, self).to_json_data()['entries']
+
+    def stream_key(self):
+        # The response is the list itself.
+        return None
@@ -27,7 +27,10 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
 
+import threading
+
 import httplib2
+from six.moves import copyreg, queue
 from six.moves.urllib.parse import parse_qs, urlencode, urlparse, urlunparse
 
 import remoteobjects.http
@@ -39,7 +42,86 @@ class PromiseError(Exception):
     pass
 
 
+class Delivered(object):
+
+    """A descriptor for the ``_delivered`` flag of promised instances.
+
+    Undelivered instances have a subclass of their class that contains the
+    hooks that deliver them when their data is used, as made by the class's
+    `undelivered_class()` method. Setting the flag moves the instance between
+    the two classes, so once an instance is delivered, those hooks cost
+    nothing.
+
+    """
+
+    def __get__(self, obj, cls):
+        if obj is None:
+            return self
+        return obj.__dict__.get('_delivered', True)
+
+    def __set__(self, obj, value):
+        obj.__dict__['_delivered'] = value
+        cls = type(obj)
+        promised_cls = cls.__dict__.get('_promised_cls')
+        if value:
+            if promised_cls is not None:
+                obj.__class__ = promised_cls
+        elif promised_cls is None:
+            obj.__class__ = cls.undelivered_class()
+
+
+def make_undelivered_class(cls, attrs):
+    """Returns the subclass of `cls` for its undelivered instances, making it
+    with the attributes in dictionary `attrs` the first time.
+
+    The subclass is made without calling the metaclass of `cls`, so it's not
+    registered as a `DataObject` class of its own. It has the same name as
+    `cls`, and no instance layout of its own, so instances can change
+    between the two classes.
+
+    """
+    try:
+        return cls.__dict__['_undelivered_cls']
+    except KeyError:
+        pass
+
+    attrs = dict(attrs)
+    attrs.update({
+        '__slots__': (),
+        '__module__': cls.__module__,
+        '__doc__': cls.__doc__,
+        '_promised_cls': cls,
+        '__reduce_ex__': _reduce_undelivered,
+    })
+    if hasattr(cls, '__qualname__'):
+        attrs['__qualname__'] = cls.__qualname__
+    undelivered_cls = type.__new__(type(cls), cls.__name__, (cls,), attrs)
+    type.__setattr__(cls, '_undelivered_cls', undelivered_cls)
+    return undelivered_cls
+
+
+def _reduce_undelivered(self, protocol):
+    # Pickle and copy undelivered instances as instances of their promised
+    # class. Restoring the state's ``_delivered`` flag restores the class.
+    cls = type(self)
+    reduced = object.__reduce_ex__(self, protocol)
+    func, args = reduced[:2]
+    if args and args[0] is cls:
+        args = (cls._promised_cls,) + tuple(args[1:])
+    if func is copyreg.__newobj__:
+        # Pickle refuses __newobj__ for a class other than the instance's.
+        func = _new_instance
+    return (func, args) + tuple(reduced[2:])
+
+
+def _new_instance(cls, *args):
+    return cls.__new__(cls, *args)
+
+
 class PromisedResponse(httplib2.Response):
+
+    _delivered = Delivered()
+
     def __init__(self, *args, **kwargs):
         self._delivered = True
         self._location = None
@@ -47,13 +129,25 @@ class PromisedResponse(httplib2.Response):
         self._method = None
         super(PromisedResponse, self).__init__(*args, **kwargs)
 
-    def __getattribute__(self, attr, *args):
-        if (attr not in ('deliver', 'get_request', 'update_from_response')) and (attr.find('_') != 0):
-            if not self._delivered:
+    @classmethod
+    def undelivered_class(cls):
+        """Returns the subclass of this class that undelivered instances
+        have, which delivers them when their public attributes are used."""
+        def __getattribute__(self, attr):
+            if attr[:1] != '_' and attr not in ('deliver', 'get_request',
+                                                'update_from_response'):
                 self.deliver()
-        return super(PromisedResponse, self).__getattribute__(attr, *args)
+            return cls.__getattribute__(self, attr)
 
-    def deliver(self):
+        return make_undelivered_class(cls, {
+            '__getattribute__': __getattribute__,
+        })
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._delivered = state.get('_delivered', True)
+
+    def deliver(self, http=None):
         """Attempts to fill the instance with the data it represents.
 
         If the instance has already been delivered or the instance has no URL
@@ -61,14 +155,18 @@ class PromisedResponse(httplib2.Response):
         exceptions from requesting and decoding a `RemoteObject` that might
         normally result from a `RemoteObject.get()` may also be thrown.
 
+        Optional parameter `http` is the user agent object to use for
+        fetching, instead of the one the instance was promised with.
+
         """
         if self._delivered:
             raise PromiseError('%s instance %r has already been delivered' % (type(self).__name__, self))
         if self._location is None:
             raise PromiseError('Instance %r has no URL from which to deliver' % (self,))
 
-        http = self._http
-        if self._http is None:
+        if http is None:
+            http = self._http
+        if http is None:
             http = remoteobjects.http.userAgent
 
         request = self.get_request()
@@ -120,28 +218,56 @@ class PromiseObject(remoteobjects.http.HttpObject):
 
     """
 
+    # Instances made without calling __init__(), such as those loaded from
+    # snapshots, are delivered with the default user agent.
+    _http = None
+
     def __init__(self, **kwargs):
         """Initializes a delivered, empty `PromiseObject`."""
         self._delivered = True
         self._http = None
         super(PromiseObject, self).__init__(**kwargs)
 
-    def _get_api_data(self):
-        if not self._delivered:
-            self.deliver()
-        return self.__dict__['api_data']
+    _delivered = Delivered()
+
+    @classmethod
+    def undelivered_class(cls):
+        """Returns the subclass of this class that undelivered instances
+        have, which delivers them when their data is used."""
+        def _get_api_data(self):
+            if not self._delivered:
+                self.deliver_on_demand()
+            return self.__dict__['api_data']
+
+        def _set_api_data(self, value):
+            self.__dict__['api_data'] = value
+
+        def _del_api_data(self):
+            del self.__dict__['api_data']
 
-    def _set_api_data(self, value):
-        self.__dict__['api_data'] = value
+        def __setattr__(self, name, value):
+            if name in self.fields:
+                self.deliver_on_demand()
+            cls.__setattr__(self, name, value)
 
-    def _del_api_data(self):
-        del self.__dict__['api_data']
+        def __delattr__(self, name):
+            if name in self.fields:
+                self.deliver_on_demand()
+            cls.__delattr__(self, name)
 
-    api_data = property(_get_api_data, _set_api_data, _del_api_data)
+        return make_undelivered_class(cls, {
+            'api_data': property(_get_api_data, _set_api_data, _del_api_data),
+            '__setattr__': __setattr__,
+            '__delattr__': __delattr__,
+        })
 
     @classmethod
     def statefields(cls):
-        return super(PromiseObject, cls).statefields() + ['_delivered']
+        return super(PromiseObject, cls).statefields() + ['_delivered', '_get_kwargs']
+
+    def __setstate__(self, state):
+        super(PromiseObject, self).__setstate__(state)
+        self._delivered = state.get('_delivered', True)
 
     @classmethod
     def get(cls, url, http=None, **kwargs):
@@ -178,17 +304,16 @@ class PromiseObject(remoteobjects.http.HttpObject):
         resp._method = 'OPTIONS'
         return resp
 
-    def __setattr__(self, name, value):
-        if name != '_delivered' and not self._delivered and name in self.fields:
-            self.deliver()
-        return super(PromiseObject, self).__setattr__(name, value)
+    def deliver_on_demand(self):
+        """Delivers the instance because its data is being used.
+
+        This implementation calls `deliver()`. Override this method to
+        customize what happens when an undelivered instance's data is used.
 
-    def __delattr__(self, name):
-        if name != '_delivered' and not self._delivered and name in self.fields:
-            self.deliver()
-        return super(PromiseObject, self).__delattr__(name)
+        """
+        self.deliver()
 
-    def deliver(self):
+    def deliver(self, http=None):
         """Attempts to fill the instance with the data it represents.
 
         If the instance has already been delivered or the instance has no URL
@@ -196,31 +321,75 @@ class PromiseObject(remoteobjects.http.HttpObject):
         exceptions from requesting and decoding a `RemoteObject` that might
         normally result from a `RemoteObject.get()` may also be thrown.
 
+        Optional parameter `http` is the user agent object to use for
+        fetching, instead of the one the instance was promised with.
+
         """
         if self._delivered:
             raise PromiseError('%s instance %r has already been delivered' % (type(self).__name__, self))
         if self._location is None:
             raise PromiseError('Instance %r has no URL from which to deliver' % (self,))
 
-        http = self._http
-        if self._http is None:
+        if not self._get_kwargs and self.update_from_cache(self._location):
+            return
+
+        if http is None:
+            http = self._http
+        if http is None:
             http = remoteobjects.http.userAgent
 
         request = self.get_request(**self._get_kwargs)
         response, content = http.request(**request)
         self.update_from_response(request['uri'], response, content)
+        if not self._get_kwargs:
+            self.store_in_cache(request['uri'], response)
+
+    def refresh(self, http=None):
+        """Updates the instance with the current state of its remote
+        resource, if it has changed.
+
+        If the instance has not been delivered yet, it is delivered instead.
+        Otherwise the resource is requested conditionally, as in
+        `HttpObject.refresh()`.
+
+        """
+        if not self._delivered:
+            self.deliver(http=http)
+            return True
+        if http is None:
+            http = self._http
+        return super(PromiseObject, self).refresh(http=http)
+
+    def post(self, obj, http=None, stream=False):
+        """Adds another `RemoteObject` to this remote resource, as in
+        `HttpObject.post()`, by default with the user agent the instance was
+        promised with."""
+        if http is None:
+            http = self._http
+        return super(PromiseObject, self).post(obj, http=http, stream=stream)
+
+    def put(self, http=None, stream=False):
+        """Saves the instance back to its remote resource, as in
+        `HttpObject.put()`, by default with the user agent the instance was
+        promised with."""
+        if http is None:
+            http = self._http
+        return super(PromiseObject, self).put(http=http, stream=stream)
 
     def update_from_dict(self, data):
         if not isinstance(data, dict):
             raise TypeError("Cannot update %r from non-dictionary data source %r"
                 % (self, data))
         # Clear any local instance field data
-        for k in self.fields.keys():
-            if k in self.__dict__:
-                del self.__dict__[k]
+        self._clear_local_values()
         # Update directly to avoid triggering delivery.
         self.__dict__['api_data'] = data
 
+    def update_from_instance(self, other):
+        """Makes this instance a copy of `other`, marking it delivered."""
+        super(PromiseObject, self).update_from_instance(other)
+        self._delivered = True
+
     def update_from_response(self, url, response, content):
         """Fills the `PromiseObject` instance with the data from the given
         HTTP response and if successful marks the instance delivered."""
@@ -250,3 +419,165 @@ class PromiseObject(remoteobjects.http.HttpObject):
         newurl = urlunparse(parts)
 
         return self.get(newurl, http=self._http)
+
+
+def _map_threaded(func, items, max_workers):
+    """Calls `func` with each of `items` on up to `max_workers` threads.
+
+    Returns a list of ``(succeeded, result)`` pairs in the same order as
+    `items`, where `result` is either the value `func` returned or the
+    exception it raised.
+
+    """
+    results = [None] * len(items)
+    work = queue.Queue()
+    for pair in enumerate(items):
+        work.put(pair)
+
+    def worker():
+        while True:
+            try:
+                i, item = work.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                results[i] = (True, func(item))
+            except Exception as exc:
+                results[i] = (False, exc)
+
+    threads = [threading.Thread(target=worker)
+               for _ in range(min(max_workers, len(items)))]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def unique_by_identity(items):
+    """Returns the distinct items of iterable `items`, compared by identity,
+    and the position of each of `items` in that list.
+
+    Use this to do work once for each of several unhashable objects, such as
+    `DataObject` instances, then give a result for every one asked for.
+
+    """
+    unique, positions, seen = [], [], {}
+    for item in items:
+        position = seen.get(id(item))
+        if position is None:
+            position = seen[id(item)] = len(unique)
+            unique.append(item)
+        positions.append(position)
+    return unique, positions
+
+
+def _deliver_in_background(promise):
+    """Starts delivering the undelivered `PromiseObject` instance `promise` on
+    a background thread.
+
+    As the promise's user agent may be in use on the caller's thread, the
+    promise is delivered with the user agent from
+    `remoteobjects.http.threadsafe_user_agent()` for it: the same one if
+    it's a `remoteobjects.http.UserAgentProvider`, or a clone of a plain
+    `httplib2.Http` instance with the same credentials and settings. Raises
+    `ValueError` if the promise's user agent can't be used that way.
+
+    Returns a function that waits for the delivery to finish, and returns
+    the delivered promise or raises the exception delivering it raised.
+
+    """
+    http = remoteobjects.http.threadsafe_user_agent(promise._http)
+    results = []
+
+    def deliver():
+        try:
+            promise.deliver(http=http)
+        except Exception as exc:
+            results.append(exc)
+
+    thread = threading.Thread(target=deliver)
+    thread.daemon = True
+    thread.start()
+
+    def wait():
+        thread.join()
+        if results:
+            raise results[0]
+        return promise
+
+    return wait
+
+
+def deliver_all(promises, max_workers=8):
+    """Delivers many undelivered `PromiseObject` instances concurrently.
+
+    Parameter `promises` is an iterable of `PromiseObject` instances
+    (including `PageObject` instances). Those that are not yet delivered are
+    delivered on a pool of up to `max_workers` threads, so the requests for
+    them are made in parallel instead of one after another.
+
+    Promises are delivered with their own user agents (the `http` parameter
+    of `PromiseObject.get()`), or with
+    `remoteobjects.http.get_threadsafe_user_agent()` if they have none. As
+    `httplib2.Http` instances can't be used from two threads at once, plain
+    user agents are replaced with per-thread clones of them, as by
+    `remoteobjects.http.threadsafe_user_agent()`, so their credentials and
+    other settings still apply.
+
+    Delivering one promise failing doesn't stop the others from being
+    delivered. Returns a list with, for each of `promises` in order, either
+    the delivered promise or, if delivering it failed, the exception raised
+    (such as the object class's `NotFound` exception). A list is returned
+    rather than a dictionary keyed by promise as `DataObject` instances
+    aren't hashable, and promises for the same URL are distinct. A promise
+    given more than once is delivered once.
+
+    Raises `ValueError` if `max_workers` is less than 1, or if a promise's
+    user agent can't be used from several threads.
+
+    """
+    if max_workers < 1:
+        raise ValueError('max_workers must be at least 1, not %r'
+                         % (max_workers,))
+    promises, positions = unique_by_identity(promises)
+    # Delivered promises are their own results.
+    results = list(promises)
+    pending = [i for i, promise in enumerate(promises)
+               if not promise._delivered]
+
+    # Find thread-safe user agents before starting, so unusable ones are
+    # reported up front and promises sharing one share its clones.
+    agents, agent_positions = unique_by_identity(
+        promises[i]._http for i in pending)
+    agents = [remoteobjects.http.threadsafe_user_agent(http)
+              for http in agents]
+    work = [(promises[i], agents[j]) for i, j in zip(pending, agent_positions)]
+
+    def deliver(args):
+        promise, http = args
+        promise.deliver(http=http)
+        return promise
+
+    for i, (_, result) in zip(pending,
+                              _map_threaded(deliver, work, max_workers)):
+        results[i] = result
+    return [results[i] for i in positions]
+
+
+def prefetch(objects, name, max_workers=8):
+    """Delivers the objects linked from each of `objects` by the `Link` named
+    `name` concurrently.
+
+    Linked objects that are `PromiseObject` instances are delivered as by
+    `deliver_all()`, and as `Link` attributes remember their linked objects,
+    reading the attribute afterward won't make another request. Returns the
+    list of results of `deliver_all()` for the linked `PromiseObject`
+    instances, in the order of `objects`.
+
+    """
+    targets = [getattr(obj, name) for obj in objects]
+    return deliver_all((target for target in targets
+                        if isinstance(target, PromiseObject)),
+                       max_workers=max_workers)
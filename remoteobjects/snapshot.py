@@ -0,0 +1,263 @@
+# Copyright (c) 2009-2010 Six Apart Ltd.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of Six Apart Ltd. nor the names of its contributors may
+#   be used to endorse or promote products derived from this software without
+#   specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Fast binary snapshots of `DataObject` instances.
+
+`dumps_snapshot()` encodes a `DataObject` instance, with the `DataObject`
+instances in its field values, to a byte string that `loads_snapshot()` turns
+back into equivalent instances. Snapshots are made with the `marshal` module,
+so they're much faster to make and load than pickles, and are meant for
+caching instances in the same program: like `marshal` data, they're not
+guaranteed to load in other Python versions. Snapshots are built for speed,
+not size: depending on the data, they may be larger than pickles (even
+protocol 2 ones, which, unlike `marshal` before Python 3.4, store each
+repeated value only once), so compress them if size matters more than speed.
+
+Each instance is stored as the index of its class in a table of the snapshot's
+class names, its API data, its decoded and assigned field values, and the
+rest of its `statefields()` (such as the URL, ETag, and delivery status of
+`HttpObject` and `PromiseObject` instances). Decoded values that can't have
+changed since they were decoded, such as numbers and timestamps, are left out,
+to be decoded again from the API data when they're used. An instance decoded
+from part of the API data of the instance referring to it (as in an `Object`
+field) doesn't store that data again, but shares it once loaded. Classes are
+found again by name with `remoteobjects.dataobject.find_by_name()`, so only
+classes registered under their own names can be snapshotted.
+
+"""
+
+import marshal
+
+from remoteobjects.dataobject import (ATOMIC_TYPES, IMMUTABLE_TYPES,
+                                      DataObject, find_by_name)
+from remoteobjects.fields import LazyDict, LazyList
+
+
+SNAPSHOT_VERSION = 2
+
+
+class NotNative(Exception):
+    """Raised for a field value that must be stored through its field's
+    `encode()` method."""
+    pass
+
+
+def raw_item(raw, key):
+    """Returns the item `key` of the API data `raw`, or `None` if there
+    isn't one."""
+    try:
+        return raw[key]
+    except (IndexError, KeyError, TypeError):
+        return None
+
+
+class SnapshotEncoder(object):
+
+    def __init__(self):
+        self.class_names = []
+        self.class_plans = {}
+        self.active = set()
+
+    def class_plan(self, cls):
+        """Returns the class ID of `cls` in the snapshot, the API names of its
+        fields by attribute name, and the names of its other state
+        attributes."""
+        try:
+            return self.class_plans[cls]
+        except KeyError:
+            pass
+        name = cls.__name__
+        try:
+            registered = find_by_name(name)
+        except KeyError:
+            registered = None
+        if registered is not cls:
+            raise ValueError('Cannot snapshot %s instances, as the class is '
+                             'not the one registered as %r' % (name, name))
+
+        api_names = dict((attrname, field.api_name)
+                         for attrname, field in cls.fields.items())
+        other_names = tuple(name for name in cls.statefields()
+                            if name not in api_names and name != 'api_data')
+        plan = (len(self.class_names), api_names, other_names)
+        self.class_plans[cls] = plan
+        self.class_names.append(name)
+        return plan
+
+    def encode_object(self, obj, raw=None):
+        """Returns the encoded form of `obj`.
+
+        If `obj` was decoded from the API data `raw` of the instance
+        referring to it, its API data is stored as `None`, to be found again
+        in that instance's API data, instead of a second time.
+
+        """
+        if id(obj) in self.active:
+            raise ValueError('Cannot snapshot %r, as it refers to itself'
+                             % (obj,))
+        self.active.add(id(obj))
+
+        # Undelivered promises are stored as their delivered class; their
+        # _delivered state puts them back.
+        cls = type(obj)
+        cls = cls.__dict__.get('_promised_cls') or cls
+        class_id, api_names, other_names = self.class_plan(cls)
+
+        instance_data = obj.__dict__
+        api_data = instance_data.get('api_data') or {}
+        extra = dict((name, instance_data[name]) for name in other_names
+                     if name in instance_data)
+        changed = extra.get('_changed', ())
+        if cls._field_slots:
+            local_values = obj._local_values()
+        else:
+            local_values = dict((k, instance_data[k]) for k in api_names
+                                if k in instance_data)
+
+        values, encoded = {}, {}
+        for attrname, value in local_values.items():
+            api_value = api_data.get(api_names[attrname], api_data)
+            if value is api_value or (api_value is not api_data
+                                      and attrname not in changed
+                                      and isinstance(value, IMMUTABLE_TYPES)):
+                # The value is still its API data, or was decoded from it and
+                # can't have changed, so the field can decode it again.
+                continue
+            if api_value is api_data:
+                api_value = None
+            try:
+                values[attrname] = self.encode_value(value, api_value)
+            except NotNative:
+                encoded[attrname] = cls.fields[attrname].encode(value)
+
+        self.active.discard(id(obj))
+        if api_data is raw:
+            api_data = None
+        return (class_id, api_data, values or None, encoded or None,
+                extra or None)
+
+    def encode_value(self, value, raw=None):
+        if isinstance(value, ATOMIC_TYPES):
+            return value
+        if isinstance(value, DataObject):
+            return self.encode_object(value, raw)
+        if isinstance(value, (list, LazyList)):
+            return [self.encode_value(item, raw_item(raw, i))
+                    for i, item in enumerate(value)]
+        if isinstance(value, (dict, LazyDict)):
+            return dict((key, self.encode_value(item, raw_item(raw, key)))
+                        for key, item in value.items())
+        raise NotNative()
+
+
+class SnapshotDecoder(object):
+
+    def __init__(self, class_names):
+        self.classes = [find_by_name(name) for name in class_names]
+
+    def decode_object(self, encoded_obj, raw=None):
+        class_id, api_data, values, encoded, extra = encoded_obj
+        cls = self.classes[class_id]
+        if api_data is None:
+            # The instance was decoded from the referring instance's data.
+            api_data = raw if raw is not None else {}
+
+        obj = cls.__new__(cls)
+        instance_data = obj.__dict__
+        if extra:
+            instance_data.update(extra)
+        instance_data['api_data'] = api_data
+
+        if encoded:
+            fields = cls.fields
+            values = values or {}
+            for attrname, value in encoded.items():
+                values[attrname] = fields[attrname].decode(value)
+        if values:
+            decode_value = self.decode_value
+            fields = cls.fields
+            for attrname, value in values.items():
+                if not isinstance(value, ATOMIC_TYPES):
+                    values[attrname] = decode_value(
+                        value, api_data.get(fields[attrname].api_name))
+            obj._set_local_values(values)
+
+        if not instance_data.get('_delivered', True):
+            # Set the flag properly, to make the instance undelivered.
+            obj._delivered = False
+        return obj
+
+    def decode_value(self, value, raw=None):
+        if isinstance(value, tuple):
+            return self.decode_object(value, raw)
+        if isinstance(value, list):
+            return [self.decode_value(item, raw_item(raw, i))
+                    for i, item in enumerate(value)]
+        if isinstance(value, dict):
+            return dict((key, self.decode_value(item, raw_item(raw, key)))
+                        for key, item in value.items())
+        return value
+
+
+def dumps_snapshot(obj):
+    """Returns a snapshot of the `DataObject` instance `obj` as a byte
+    string.
+
+    The `DataObject` instances in field values of `obj` (as in `Object` and
+    `List` fields) are included in the snapshot as instances too. Other
+    field values that aren't strings, numbers, lists, or dictionaries are
+    stored as their fields encode them, and decoded again when the snapshot
+    is loaded. An instance referenced more than once is stored each time,
+    and an instance that refers to itself can't be snapshotted.
+
+    Raises `ValueError` if the instances can't be snapshotted.
+
+    """
+    encoder = SnapshotEncoder()
+    root = encoder.encode_object(obj)
+    return marshal.dumps((SNAPSHOT_VERSION, tuple(encoder.class_names), root))
+
+
+def loads_snapshot(data):
+    """Returns the `DataObject` instance saved in the snapshot byte string
+    `data`.
+
+    Raises `ValueError` if `data` is not a snapshot this version of
+    remoteobjects can load, and `KeyError` if a class in it isn't defined.
+
+    """
+    try:
+        version, class_names, root = marshal.loads(data)
+    except (EOFError, TypeError, ValueError):
+        raise ValueError('Data is not a remoteobjects snapshot')
+    if version != SNAPSHOT_VERSION:
+        raise ValueError('Cannot load remoteobjects snapshot version %r'
+                         % (version,))
+    return SnapshotDecoder(class_names).decode_object(root)
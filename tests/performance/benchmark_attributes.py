@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2009-2010 Six Apart Ltd.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of Six Apart Ltd. nor the names of its contributors may
+#   be used to endorse or promote products derived from this software without
+#   specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+This will benchmark reading the fields of decoded remoteobjects, as when
+rendering them in a template. It will decode a `Twiddle` with as many `Zot`
+instances as you specify (via the -z flag), then read every field of every
+`Zot` as many times as you specify (via the -r flag). The process is run as
+many times as you specify (via the -n flag). The raw times to read the fields
+will be dumped to stdout.
+
+Pass --fast-reads to read the fields of `Zot` instances of a subclass declared
+with ``fast_reads = True`` instead, for comparison.
+"""
+from __future__ import print_function
+
+import optparse
+from six.moves import range
+import time
+
+from tests.performance.twiddle import Twiddle, Zot
+
+
+class FastZot(Zot):
+    fast_reads = True
+
+
+def make_data(num_zotz):
+    zotz = [{
+        'kind': 'tag:api.example.com,2009;Zot',
+        'size': 'large',
+        'born': '2009-01-01T00:00:00Z',
+    } for _ in range(num_zotz)]
+    return {
+        'kind': 'tag:api.example.com,2009;Twiddle',
+        'name': 'Twiddle Dee',
+        'zotz': zotz,
+    }
+
+
+def read_attributes(zotz, reads):
+    for _ in range(reads):
+        for zot in zotz:
+            zot.size
+            zot.born
+
+
+def test_reading(data, count, reads, fast_reads=False):
+    for _ in range(count):
+        zotz = Twiddle.from_dict(data).zotz
+        if fast_reads:
+            zotz = [FastZot.from_dict(zot.api_data) for zot in zotz]
+        # Decode the fields first, so only cached reads are timed.
+        read_attributes(zotz, 1)
+
+        t = time.time()
+        read_attributes(zotz, reads)
+        yield (time.time() - t)
+
+
+if __name__ == '__main__':
+    parser = optparse.OptionParser(
+        usage="%prog [options]",
+        description=("Test the performance of reading remoteobjects fields."))
+    parser.add_option("-n", action="store", type="int", default=100,
+                      dest="num_runs", help="Number of times to run the test.")
+    parser.add_option("-z", action="store", type="int", default=1000,
+                      dest="num_zotz", help="Number of objects to read per run.")
+    parser.add_option("-r", action="store", type="int", default=10,
+                      dest="num_reads", help="Number of times to read each field.")
+    parser.add_option("--fast-reads", action="store_true", default=False,
+                      help="Read fields of a class declared with fast_reads.")
+    options, args = parser.parse_args()
+
+    if args:
+        parser.error("Incorrect number of arguments")
+
+    data = make_data(options.num_zotz)
+    for t in test_reading(data, options.num_runs, options.num_reads,
+                          fast_reads=options.fast_reads):
+        print(t)
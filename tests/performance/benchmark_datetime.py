@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2009-2010 Six Apart Ltd.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of Six Apart Ltd. nor the names of its contributors may
+#   be used to endorse or promote products derived from this software without
+#   specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+"""
+This will benchmark decoding timestamp-heavy data. It will decode a `Twiddle`
+with as many `Zot` instances as you specify (via the -z flag), each with its own
+`born` timestamp, and read all their timestamps. The decode process is run as
+many times as you specify (via the -n flag). The raw times to decode the data
+will be dumped to stdout.
+
+Pass --dateutil to decode the timestamps with `dateutil.parser` alone, for
+comparison.
+"""
+from __future__ import print_function
+
+from datetime import datetime, timedelta
+import optparse
+from six.moves import range
+import time
+
+import mock
+
+from remoteobjects import fields
+from tests.performance.twiddle import Twiddle
+
+
+def make_data(num_zotz):
+    start = datetime(2009, 1, 1)
+    zotz = []
+    for i in range(num_zotz):
+        born = start + timedelta(seconds=i * 3607, microseconds=i * 1001)
+        if i % 2:
+            born = born.strftime('%Y-%m-%dT%H:%M:%SZ')
+        else:
+            born = born.strftime('%Y-%m-%dT%H:%M:%S.%f-07:00')
+        zotz.append({
+            'kind': 'tag:api.example.com,2009;Zot',
+            'size': 'large',
+            'born': born,
+        })
+    return {
+        'kind': 'tag:api.example.com,2009;Twiddle',
+        'name': 'Twiddle Dee',
+        'zotz': zotz,
+    }
+
+
+def skip_fast_path(value):
+    # Make Datetime.decode() fall back to dateutil for every timestamp.
+    return None
+
+
+def test_decoding(data, count):
+    for _ in range(count):
+        t = time.time()
+        twiddle = Twiddle.from_dict(data)
+        for zot in twiddle.zotz:
+            zot.born
+        yield (time.time() - t)
+
+
+if __name__ == '__main__':
+    parser = optparse.OptionParser(
+        usage="%prog [options]",
+        description=("Test the performance of decoding timestamps into remoteobjects."))
+    parser.add_option("-n", action="store", type="int", default=100,
+                      dest="num_runs", help="Number of times to run the test.")
+    parser.add_option("-z", action="store", type="int", default=1000,
+                      dest="num_zotz", help="Number of timestamps to decode per run.")
+    parser.add_option("--dateutil", action="store_true", default=False,
+                      help="Parse every timestamp with dateutil.")
+    options, args = parser.parse_args()
+
+    if args:
+        parser.error("Incorrect number of arguments")
+
+    data = make_data(options.num_zotz)
+    if options.dateutil:
+        patcher = mock.patch.object(fields, 'parse_timestamp', skip_fast_path)
+        patcher.start()
+
+    for t in test_decoding(data, options.num_runs):
+        print(t)
@@ -44,7 +44,7 @@ import time
 from tests import utils
 
 
-def test_decoding(object_class, json, count):
+def test_decoding(object_class, json, count, eager=False, encode=False):
     request = {
         'uri': 'http://example.com/ohhai',
         'headers': {'accept': 'application/json'},
@@ -61,6 +61,10 @@ def test_decoding(object_class, json, count):
         t = time.time()
         o = object_class.get('http://example.com/ohhai', http=h)
         o.deliver()
+        if eager:
+            o.decode_all()
+        if encode:
+            o.to_dict()
         yield (time.time() - t)
 
 
@@ -70,6 +74,10 @@ if __name__ == '__main__':
         description=("Test the performance of decoding JSON into remoteobjects."))
     parser.add_option("-n", action="store", type="int", default=100,
                       dest="num_runs", help="Number of times to run the test.")
+    parser.add_option("-e", "--eager", action="store_true", default=False,
+                      help="Decode all the object's fields after delivering it.")
+    parser.add_option("-t", "--to-dict", action="store_true", default=False,
+                      dest="encode", help="Encode the object back to a dictionary too.")
     options, args = parser.parse_args()
 
     if len(args) != 2:
@@ -94,5 +102,6 @@ if __name__ == '__main__':
     except AttributeError as e:
         parser.error(e.message)
 
-    for t in test_decoding(RemoteObject, json, options.num_runs):
+    for t in test_decoding(RemoteObject, json, options.num_runs,
+                           eager=options.eager, encode=options.encode):
         print(t)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2009-2010 Six Apart Ltd.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of Six Apart Ltd. nor the names of its contributors may
+#   be used to endorse or promote products derived from this software without
+#   specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+"""
+This will benchmark decoding JSON containing invalid UTF-8. It will decode a
+generated JSON document of about the size you specify (in megabytes, via the -s
+flag) that is clean, slightly dirty (one invalid byte), or very dirty (an
+invalid byte in every string), as many times as you specify (via the -n flag).
+The raw times to decode the document will be dumped to stdout.
+
+Pass --legacy to decode dirty documents with the old pure-Python
+`ForgivingDecoder`, for comparison.
+"""
+from __future__ import print_function
+
+import optparse
+from six.moves import range
+import time
+
+import simplejson
+
+from remoteobjects import json
+
+
+def make_content(size, dirt):
+    entry = b'{"name": "Entry %d", "body": "Some text for entry %d%s"}'
+    entries = []
+    length = 0
+    i = 0
+    while length < size * 1024 * 1024:
+        if dirt == 'very' or (dirt == 'slightly' and i == 0):
+            bad = b'caf\xe9'
+        else:
+            bad = b'cafe'
+        entries.append(entry % (i, i, bad))
+        length += len(entries[-1]) + 1
+        i += 1
+    return b'{"entries": [' + b','.join(entries) + b']}'
+
+
+def legacy_loads(content):
+    try:
+        return simplejson.loads(content)
+    except UnicodeDecodeError:
+        # On python 3, simplejson only accepts text for ForgivingDecoder.
+        content = json.repair_utf8(content)
+        return simplejson.loads(content, cls=json.ForgivingDecoder)
+
+
+def test_decoding(content, count, loads):
+    for _ in range(count):
+        t = time.time()
+        loads(content)
+        yield (time.time() - t)
+
+
+if __name__ == '__main__':
+    parser = optparse.OptionParser(
+        usage="%prog [options]",
+        description=("Test the performance of decoding JSON with invalid UTF-8."))
+    parser.add_option("-n", action="store", type="int", default=20,
+                      dest="num_runs", help="Number of times to run the test.")
+    parser.add_option("-s", action="store", type="int", default=5,
+                      dest="size", help="Size of the document in megabytes.")
+    parser.add_option("-d", "--dirt", action="store", default="slightly",
+                      choices=("clean", "slightly", "very"),
+                      help="How dirty the document is: clean, slightly or very.")
+    parser.add_option("--legacy", action="store_true", default=False,
+                      help="Decode with the old ForgivingDecoder.")
+    options, args = parser.parse_args()
+
+    if args:
+        parser.error("Incorrect number of arguments")
+
+    content = make_content(options.size, options.dirt)
+    if options.legacy:
+        loads = legacy_loads
+    else:
+        loads = json.get_codec('simplejson').loads
+
+    for t in test_decoding(content, options.num_runs, loads):
+        print(t)
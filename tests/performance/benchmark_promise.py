@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2009-2010 Six Apart Ltd.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of Six Apart Ltd. nor the names of its contributors may
+#   be used to endorse or promote products derived from this software without
+#   specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+This will benchmark the attribute access paths of delivered promises. Each
+benchmark makes as many attribute reads or writes as you specify (via the -a
+flag) on a delivered `PromiseObject` or `PromisedResponse`. The benchmarks are
+run as many times as you specify (via the -n flag). The raw times of each run
+of the benchmark you choose as the first argument will be dumped to stdout;
+with no argument, the minimum time of every benchmark is printed instead.
+"""
+from __future__ import print_function
+
+import optparse
+from six.moves import range
+import time
+
+from remoteobjects import fields, promise
+from tests import utils
+
+
+class Toy(promise.PromiseObject):
+    name = fields.Field()
+    size = fields.Field()
+
+
+def delivered_toy():
+    url = 'http://example.com/toy'
+    request = dict(uri=url, headers={'accept': 'application/json'})
+    h = utils.mock_http(request, '{"name": "Woody", "size": 12}')
+    toy = Toy.get(url, http=h)
+    toy.deliver()
+    return toy
+
+
+def delivered_response():
+    return promise.PromisedResponse({'status': '200', 'allow': 'GET, DELETE'})
+
+
+def object_field_writes(count):
+    toy = delivered_toy()
+    t = time.time()
+    for _ in range(count):
+        toy.name = 'Buzz'
+    return time.time() - t
+
+
+def object_internal_writes(count):
+    toy = delivered_toy()
+    t = time.time()
+    for _ in range(count):
+        toy._etag = 'xyz'
+    return time.time() - t
+
+
+def object_field_reads(count):
+    toy = delivered_toy()
+    t = time.time()
+    for _ in range(count):
+        toy.name
+    return time.time() - t
+
+
+def response_reads(count):
+    resp = delivered_response()
+    t = time.time()
+    for _ in range(count):
+        resp.status
+    return time.time() - t
+
+
+def response_method_calls(count):
+    resp = delivered_response()
+    t = time.time()
+    for _ in range(count):
+        resp.found()
+    return time.time() - t
+
+
+benchmarks = {
+    'object_field_writes': object_field_writes,
+    'object_internal_writes': object_internal_writes,
+    'object_field_reads': object_field_reads,
+    'response_reads': response_reads,
+    'response_method_calls': response_method_calls,
+}
+
+
+if __name__ == '__main__':
+    parser = optparse.OptionParser(
+        usage="%prog [options] [benchmark]",
+        description=("Test the performance of using delivered promises. "
+                     "Benchmarks: %s" % ', '.join(sorted(benchmarks))))
+    parser.add_option("-n", action="store", type="int", default=100,
+                      dest="num_runs", help="Number of times to run the test.")
+    parser.add_option("-a", action="store", type="int", default=10000,
+                      dest="num_accesses", help="Number of attribute accesses per run.")
+    options, args = parser.parse_args()
+
+    if len(args) > 1:
+        parser.error("Incorrect number of arguments")
+    if args and args[0] not in benchmarks:
+        parser.error("Unknown benchmark: %r" % args[0])
+
+    if args:
+        for _ in range(options.num_runs):
+            print(benchmarks[args[0]](options.num_accesses))
+    else:
+        for name in sorted(benchmarks):
+            times = [benchmarks[name](options.num_accesses)
+                     for _ in range(options.num_runs)]
+            print('%s\t%f' % (name, min(times)))
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2009-2010 Six Apart Ltd.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of Six Apart Ltd. nor the names of its contributors may
+#   be used to endorse or promote products derived from this software without
+#   specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+This will benchmark saving and loading remoteobjects as cached data. It will
+decode the JSON data you specify as the first argument into the remoteobject
+subclass you specify as the second argument, then time saving the object to a
+string and loading it back with each of remoteobjects snapshots, pickle, and
+JSON (through `to_dict()` and `from_dict()`). Each is run as many times as you
+specify (via the -n flag). The minimum times to save and load the object and
+the size of the saved data are dumped to stdout.
+"""
+from __future__ import print_function
+
+import optparse
+import pickle
+from six.moves import range
+import time
+
+from remoteobjects import json
+from remoteobjects.snapshot import dumps_snapshot, loads_snapshot
+from tests import utils
+
+
+def pickle_dumps(obj):
+    return pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+
+
+def json_dumps(obj):
+    return json.dumps(obj.to_dict())
+
+
+def json_loader(cls):
+    def json_loads(data):
+        return cls.from_dict(json.loads(data))
+    return json_loads
+
+
+def load_object(object_class, content):
+    request = {
+        'uri': 'http://example.com/ohhai',
+        'headers': {'accept': 'application/json'},
+    }
+    h = utils.mock_http(request, content)
+    o = object_class.get('http://example.com/ohhai', http=h)
+    o.deliver()
+    o.decode_all()
+    return o
+
+
+def test_format(obj, dumps, loads, count):
+    dump_times, load_times = [], []
+    for _ in range(count):
+        t = time.time()
+        data = dumps(obj)
+        dump_times.append(time.time() - t)
+
+        t = time.time()
+        loads(data)
+        load_times.append(time.time() - t)
+    return min(dump_times), min(load_times), len(data)
+
+
+if __name__ == '__main__':
+    parser = optparse.OptionParser(
+        usage="%prog [options] json_file remoteobject_class",
+        description=("Test the performance of saving and loading remoteobjects."))
+    parser.add_option("-n", action="store", type="int", default=100,
+                      dest="num_runs", help="Number of times to run the test.")
+    options, args = parser.parse_args()
+
+    if len(args) != 2:
+        parser.error("Incorrect number of arguments")
+
+    try:
+        with open(args[0]) as fd:
+            content = fd.read()
+    except Exception:
+        parser.error("Unable to read file: '%s'" % args[0])
+
+    module_name, _, class_name = args[1].rpartition('.')
+    try:
+        module = __import__(module_name, fromlist=[class_name])
+        RemoteObject = getattr(module, class_name)
+    except (ImportError, AttributeError) as e:
+        parser.error(str(e))
+
+    obj = load_object(RemoteObject, content)
+    formats = (
+        ('snapshot', dumps_snapshot, loads_snapshot),
+        ('pickle', pickle_dumps, pickle.loads),
+        ('json', json_dumps, json_loader(RemoteObject)),
+    )
+    print('format\tdumps\tloads\tbytes')
+    for name, dumps, loads in formats:
+        dump_time, load_time, size = test_format(obj, dumps, loads,
+                                                 options.num_runs)
+        print('%s\t%f\t%f\t%d' % (name, dump_time, load_time, size))
@@ -0,0 +1,365 @@
+# Copyright (c) 2009-2010 Six Apart Ltd.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of Six Apart Ltd. nor the names of its contributors may
+#   be used to endorse or promote products derived from this software without
+#   specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import unittest
+
+import httplib2
+import mock
+from six import PY2
+
+from remoteobjects import fields, promise
+from tests import utils
+
+if not PY2:
+    import asyncio
+    from remoteobjects import asynchttp
+
+
+class SyncUserAgent(object):
+
+    """An asynchronous user agent that makes requests with a blocking user
+    agent without leaving the event loop."""
+
+    def __init__(self, http):
+        self.http = http
+
+    def request(self, **kwargs):
+        return asyncio.sleep(0, result=self.http.request(**kwargs))
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+@unittest.skipIf(PY2, 'asynchttp requires python 3')
+class TestAsyncHttpObjects(unittest.TestCase):
+
+    def setUp(self):
+        class BasicMost(asynchttp.AsyncHttpObject):
+            name  = fields.Field()
+            value = fields.Field()
+        self.BasicMost = BasicMost
+
+    def test_get(self):
+        request = {
+            'uri': 'http://example.com/ohhai',
+            'headers': {'accept': 'application/json', 'x-test': 'boo'},
+        }
+        content = """{"name": "Fred", "value": 7}"""
+        h = utils.mock_http(request, content)
+
+        b = run(self.BasicMost.get('http://example.com/ohhai',
+            http=SyncUserAgent(h), headers={"x-test": "boo"}))
+        self.assertIsInstance(b, self.BasicMost)
+        self.assertEqual(b.name, 'Fred')
+        self.assertEqual(b.value, 7)
+        self.assertEqual(b._etag, '7')
+        h.request.assert_called_once_with(**request)
+
+    def test_executor_user_agent(self):
+        request = {
+            'uri': 'http://example.com/ohhai',
+            'headers': {'accept': 'application/json'},
+        }
+        content = """{"name": "Fred", "value": 7}"""
+        h = utils.mock_http(request, content)
+
+        b = run(self.BasicMost.get('http://example.com/ohhai',
+            http=asynchttp.ExecutorUserAgent(h)))
+        self.assertEqual(b.name, 'Fred')
+        h.request.assert_called_once_with(**request)
+
+    def test_not_found(self):
+        request = {
+            'uri': 'http://example.com/bwuh',
+            'headers': {'accept': 'application/json'},
+        }
+        h = utils.mock_http(request, dict(status=404))
+        self.assertRaises(self.BasicMost.NotFound, run,
+            self.BasicMost.get('http://example.com/bwuh', http=SyncUserAgent(h)))
+
+    def test_put(self):
+        b = self.BasicMost.from_dict({'name': 'Molly', 'value': 80})
+        b._location = 'http://example.com/bwuh'
+        b._etag = '7'
+
+        headers = {
+            'accept':       'application/json',
+            'content-type': 'application/json',
+            'if-match':     '7',
+        }
+        content = """{"name": "Molly", "value": 80}"""
+        request = dict(uri='http://example.com/bwuh', method='PUT', headers=headers, body=content)
+        h = utils.mock_http(request, dict(content=content, etag='xyz'))
+        run(b.put(http=SyncUserAgent(h)))
+        h.request.assert_called_once_with(**request)
+        self.assertEqual(b._etag, 'xyz')
+
+    def test_patch(self):
+        b = self.BasicMost.from_dict({'name': 'Molly', 'value': 80})
+        b._location = 'http://example.com/bwuh'
+        b.value = 81
+
+        headers = {
+            'accept':       'application/json',
+            'content-type': 'application/merge-patch+json',
+        }
+        request = dict(uri='http://example.com/bwuh', method='PATCH',
+                       headers=headers, body='{"value": 81}')
+        h = utils.mock_http(request, dict(content='', status=204))
+        run(b.patch(http=SyncUserAgent(h)))
+        h.request.assert_called_once_with(**request)
+        self.assertEqual(b.api_data, {'name': 'Molly', 'value': 81})
+
+    def test_post(self):
+        c = self.BasicMost()
+        c._location = 'http://example.com/asfdasf'
+        b = self.BasicMost(name='Fred Friendly', value=True)
+
+        headers = {
+            'accept': 'application/json',
+            'content-type': 'application/json',
+        }
+        content = """{"name": "Fred Friendly", "value": true}"""
+        request = dict(uri='http://example.com/asfdasf', method='POST',
+                       body=content, headers=headers)
+        response = dict(content=content, status=201, etag='xyz',
+                        location='http://example.com/fred')
+        h = utils.mock_http(request, response)
+        run(c.post(b, http=SyncUserAgent(h)))
+        h.request.assert_called_once_with(**request)
+        self.assertEqual(b._location, 'http://example.com/fred')
+
+    def test_delete(self):
+        b = self.BasicMost(name='Molly', value=80)
+        b._location = 'http://example.com/bwuh'
+        b._etag = 'asfdasf'
+
+        headers = {
+            'accept':   'application/json',
+            'if-match': 'asfdasf',
+        }
+        request = dict(uri='http://example.com/bwuh', method='DELETE', headers=headers)
+        h = utils.mock_http(request, dict(status=204))
+        run(b.delete(http=SyncUserAgent(h)))
+        h.request.assert_called_once_with(**request)
+        self.assertTrue(b._location is None)
+
+    def test_refresh(self):
+        b = self.BasicMost.from_dict({'name': 'Molly', 'value': 80})
+        b._location = 'http://example.com/bwuh'
+        b._etag = '7'
+        api_data = b.api_data
+
+        headers = {'accept': 'application/json', 'if-none-match': '7'}
+        request = dict(uri='http://example.com/bwuh', headers=headers)
+        h = utils.mock_http(request, dict(status=304))
+        self.assertFalse(run(b.refresh(http=SyncUserAgent(h))))
+        h.request.assert_called_once_with(**request)
+        self.assertTrue(b.api_data is api_data)
+
+    def test_head(self):
+        b = self.BasicMost()
+        b._location = 'http://example.com/bwuh'
+        h = utils.mock_http('http://example.com/bwuh', dict(status=200, allow='GET'))
+        resp = run(b.head(http=SyncUserAgent(h)))
+        h.request.assert_called_once_with(uri='http://example.com/bwuh', method='HEAD')
+        self.assertEqual(resp['allow'], 'GET')
+
+
+@unittest.skipIf(PY2, 'asynchttp requires python 3')
+class TestCoalescingUserAgent(unittest.TestCase):
+
+    def test_coalesce(self):
+
+        class BasicMost(asynchttp.AsyncHttpObject):
+            name = fields.Field()
+
+        url = 'http://example.com/ohhai'
+        h = utils.mock_http(url, '{"name": "Fred"}')
+        coalescer = asynchttp.CoalescingUserAgent(SyncUserAgent(h))
+
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            results = loop.run_until_complete(asyncio.gather(
+                *[BasicMost.get(url, http=coalescer) for _ in range(5)]))
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+        h.request.assert_called_once_with(
+            uri=url, headers={'accept': 'application/json'})
+        self.assertEqual(len(results), 5)
+        self.assertEqual(len(set(id(b) for b in results)), 5)
+        for b in results:
+            self.assertEqual(b.name, 'Fred')
+        self.assertEqual(coalescer.calls, {})
+
+
+class FakeClientSession(object):
+
+    """A stand-in for `aiohttp.ClientSession` that records its use."""
+
+    def __init__(self, any_loop=False):
+        # Real sessions can only be used from the loop they were made in.
+        self.loop = None if any_loop else asyncio.get_event_loop()
+        self.closed = False
+        self.requests = []
+
+    def request(self, method, uri, data=None, headers=None):
+        if self.loop is not None:
+            assert asyncio.get_event_loop() is self.loop
+        self.requests.append((method, uri))
+        resp = mock.Mock(status=200, reason='OK',
+                         headers={'Content-Type': 'application/json'})
+        resp.read.side_effect = lambda: asyncio.sleep(0, result=b'{}')
+        context = mock.MagicMock()
+        context.__aenter__.return_value = resp
+        return context
+
+    def close(self):
+        self.closed = True
+        return asyncio.sleep(0)
+
+
+@unittest.skipIf(PY2, 'asynchttp requires python 3')
+class TestAiohttpUserAgent(unittest.TestCase):
+
+    def setUp(self):
+        fake_aiohttp = mock.Mock(ClientSession=FakeClientSession)
+        patcher = mock.patch.object(asynchttp, 'aiohttp', fake_aiohttp)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def use(self, http):
+        """Makes two requests with `http` in a new event loop, then closes
+        it, returning the session it made requests with."""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(http.request(uri='http://example.com/'))
+            session = http.get_session()
+            response, content = loop.run_until_complete(
+                http.request(uri='http://example.com/'))
+            self.assertEqual(response.status, 200)
+            self.assertEqual(content, b'{}')
+            self.assertTrue(http.get_session() is session)
+            loop.run_until_complete(http.close())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+        return session
+
+    def test_sessions(self):
+        # Each event loop gets a session of its own, closed by close().
+        http = asynchttp.AiohttpUserAgent()
+        first = self.use(http)
+        second = self.use(http)
+        self.assertFalse(first is second)
+        self.assertTrue(first.closed)
+        self.assertTrue(second.closed)
+        self.assertEqual(len(first.requests), 2)
+
+        # Given sessions are used everywhere, and left open.
+        session = FakeClientSession(any_loop=True)
+        http = asynchttp.AiohttpUserAgent(session)
+        self.assertTrue(self.use(http) is session)
+        self.assertFalse(session.closed)
+
+    def test_context_manager(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            http = asynchttp.AiohttpUserAgent()
+            self.assertTrue(loop.run_until_complete(http.__aenter__()) is http)
+            loop.run_until_complete(http.request(uri='http://example.com/'))
+            session = http.get_session()
+            loop.run_until_complete(http.__aexit__(None, None, None))
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+        self.assertTrue(session.closed)
+
+
+@unittest.skipIf(PY2, 'asynchttp requires python 3')
+class TestAsyncPromiseObjects(unittest.TestCase):
+
+    def test_deliver(self):
+
+        class Tiny(asynchttp.AsyncPromiseObject):
+            name = fields.Field()
+
+        url = 'http://example.com/whahay'
+        request = dict(uri=url, headers={"accept": "application/json"})
+        h = utils.mock_http(request, """{"name": "Mollifred"}""")
+
+        t = Tiny.get(url, http=SyncUserAgent(h))
+        self.assertFalse(t._delivered)
+        self.assertRaises(promise.PromiseError, lambda: t.name)
+        self.assertEqual([], h.method_calls)
+
+        run(t.deliver())
+        self.assertTrue(t._delivered)
+        self.assertEqual(t.name, 'Mollifred')
+        h.request.assert_called_once_with(**request)
+
+    def test_deliver_all(self):
+
+        class Toy(promise.PromiseObject):
+            name = fields.Field()
+
+        headers = {"accept": "application/json"}
+        toys = [Toy.get('http://example.com/toy/%d' % i,
+                        http=mock.NonCallableMock(spec_set=httplib2.Http))
+                for i in range(3)]
+
+        def request(uri, headers):
+            if uri.endswith('/2'):
+                return httplib2.Response({'status': 404}), ''
+            return utils.mock_http(uri, '{"name": "%s"}' % uri).request()
+        h = mock.Mock(spec_set=httplib2.Http)
+        h.request.side_effect = request
+
+        results = run(asynchttp.deliver_all(toys + [toys[0]],
+                                            http=SyncUserAgent(h)))
+        self.assertEqual(h.request.call_count, 3)
+        self.assertEqual(len(results), 4)
+        self.assertTrue(results[0] is toys[0])
+        self.assertTrue(results[3] is toys[0])
+        self.assertEqual(toys[1].name, 'http://example.com/toy/1')
+        self.assertIsInstance(results[2], Toy.NotFound)
+        # The promises' own synchronous user agents weren't used.
+        for toy in toys:
+            self.assertEqual([], toy._http.method_calls)
+        h.request.assert_any_call(uri='http://example.com/toy/0', headers=headers)
@@ -0,0 +1,226 @@
+# Copyright (c) 2009-2010 Six Apart Ltd.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of Six Apart Ltd. nor the names of its contributors may
+#   be used to endorse or promote products derived from this software without
+#   specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import unittest
+
+import httplib2
+
+from remoteobjects import cache, fields, http, promise
+from tests import utils
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def response(**headers):
+    headers.setdefault('status', 200)
+    return httplib2.Response(headers)
+
+
+class TestObjectCache(unittest.TestCase):
+
+    def test_lru(self):
+        c = cache.ObjectCache(maxsize=2)
+        c.store('http://example.com/a', 'a', response())
+        c.store('http://example.com/b', 'b', response())
+        self.assertEqual(c.get('http://example.com/a'), 'a')
+        c.store('http://example.com/c', 'c', response())
+
+        self.assertEqual(len(c), 2)
+        self.assertEqual(c.get('http://example.com/a'), 'a')
+        self.assertTrue(c.get('http://example.com/b') is None)
+        self.assertEqual(c.get('http://example.com/c'), 'c')
+
+    def test_ttl(self):
+        clock = Clock()
+        c = cache.ObjectCache(ttl=60, clock=clock)
+        c.store('http://example.com/a', 'a', response())
+        c.store('http://example.com/b', 'b', response(**{'cache-control': 'public, max-age=10'}))
+        c.store('http://example.com/c', 'c', response(**{'cache-control': 'max-age=600'}))
+
+        clock.now += 30
+        self.assertEqual(c.get('http://example.com/a'), 'a')
+        self.assertTrue(c.get('http://example.com/b') is None)
+        self.assertEqual(c.get('http://example.com/c'), 'c')
+
+        clock.now += 30
+        self.assertTrue(c.get('http://example.com/a') is None)
+        self.assertTrue(c.get('http://example.com/c') is None)
+
+        c = cache.ObjectCache(ttl=None, clock=clock)
+        c.store('http://example.com/a', 'a', response())
+        c.store('http://example.com/b', 'b', response(**{'cache-control': 'max-age=10'}))
+        clock.now += 3600
+        self.assertEqual(c.get('http://example.com/a'), 'a')
+        self.assertTrue(c.get('http://example.com/b') is None)
+
+    def test_uncacheable(self):
+        c = cache.ObjectCache()
+        c.store('http://example.com/a', 'a', response(**{'cache-control': 'no-store'}))
+        c.store('http://example.com/b', 'b', response(**{'cache-control': 'no-cache'}))
+        c.store('http://example.com/c', 'c', response(**{'cache-control': 'max-age=0'}))
+        c.store('http://example.com/d', 'd', response(status=201))
+        self.assertEqual(len(c), 0)
+
+    def test_canonical_url(self):
+        c = cache.ObjectCache()
+        c.store('HTTP://Example.COM', 'a', response())
+        self.assertEqual(c.get('http://example.com/#top'), 'a')
+        c.invalidate('http://EXAMPLE.com/')
+        self.assertEqual(len(c), 0)
+
+
+class TestCachedObjects(unittest.TestCase):
+
+    cls = http.HttpObject
+
+    def setUp(self):
+        class BasicMost(self.cls):
+            name  = fields.Field()
+            value = fields.Field()
+            child = fields.Field()
+        BasicMost.cache = cache.ObjectCache()
+        self.BasicMost = BasicMost
+
+    def fetch(self, url, http):
+        b = self.BasicMost.get(url, http=http)
+        # Make sure promises are delivered.
+        self.assertEqual(b.value, 7)
+        return b
+
+    def test_get(self):
+        url = 'http://example.com/ohhai'
+        h = utils.mock_http(url, """{"name": "Fred", "value": 7}""")
+
+        b = self.fetch(url, h)
+        self.assertEqual(b.name, 'Fred')
+        c = self.fetch(url, h)
+        self.assertEqual(h.request.call_count, 1)
+
+        self.assertFalse(b is c)
+        self.assertEqual(c.name, 'Fred')
+        self.assertEqual(c._location, url)
+        self.assertEqual(c._etag, '7')
+
+        # Copies are independent, including of the instance first fetched.
+        c.name = 'Ted'
+        del c.value
+        b.name = 'Jed'
+        self.assertEqual(b.value, 7)
+        self.assertEqual(self.fetch(url, h).name, 'Fred')
+
+        # Requests with other parameters aren't cached.
+        self.BasicMost.get(url, http=h, headers={'x-test': 'boo'}).name
+        self.assertEqual(h.request.call_count, 2)
+
+    def test_nested_copies(self):
+        url = 'http://example.com/ohhai'
+        h = utils.mock_http(url, """{"name": "Fred", "value": 7,
+                                     "child": {"a": 1, "b": 2}}""")
+        b = self.fetch(url, h)
+        c = self.fetch(url, h)
+        self.assertEqual(h.request.call_count, 1)
+
+        # Values nested in copies are independent too.
+        b.child['a'] = 999
+        del c.child['b']
+        self.assertEqual(self.fetch(url, h).child, {'a': 1, 'b': 2})
+        self.assertEqual(b.child, {'a': 999, 'b': 2})
+        self.assertEqual(c.child, {'a': 1})
+
+    def test_invalidation(self):
+        url = 'http://example.com/ohhai'
+        h = utils.mock_http(url, """{"name": "Fred", "value": 7}""")
+        b = self.fetch(url, h)
+
+        b.name = 'Ted'
+        put_http = utils.mock_http(url, dict(content="", status=204))
+        b.put(http=put_http)
+        self.fetch(url, h)
+        self.assertEqual(h.request.call_count, 2)
+
+        delete_http = utils.mock_http(url, dict(status=204))
+        b.delete(http=delete_http)
+        self.fetch(url, h)
+        self.assertEqual(h.request.call_count, 3)
+
+        # Posting to a collection evicts it.
+        new = self.BasicMost(name='Jed', value=7)
+        post_http = utils.mock_http(url, dict(content="", status=202))
+        b = self.fetch(url, h)
+        b.post(new, http=post_http)
+        self.fetch(url, h)
+        self.assertEqual(h.request.call_count, 4)
+
+    def test_refresh_not_modified(self):
+        url = 'http://example.com/ohhai'
+        clock = Clock()
+        self.BasicMost.cache = cache.ObjectCache(ttl=60, clock=clock)
+        h = utils.mock_http(url, """{"name": "Fred", "value": 7}""")
+        b = self.fetch(url, h)
+
+        # Refreshing an instance with unsaved changes renews the cached copy,
+        # but doesn't replace it.
+        b.name = 'Ted'
+        clock.now += 50
+        not_modified = utils.mock_http(url, dict(status=304))
+        self.assertFalse(b.refresh(http=not_modified))
+        self.assertEqual(b.name, 'Ted')
+        clock.now += 50
+        self.assertEqual(self.fetch(url, h).name, 'Fred')
+        self.assertEqual(h.request.call_count, 1)
+
+        # Without a cached copy, the changed instance isn't cached at all.
+        self.BasicMost.cache.clear()
+        self.assertFalse(b.refresh(http=not_modified))
+        self.assertEqual(len(self.BasicMost.cache), 0)
+        self.assertEqual(self.fetch(url, h).name, 'Fred')
+        self.assertEqual(h.request.call_count, 2)
+
+
+class TestCachedPromiseObjects(TestCachedObjects):
+
+    cls = promise.PromiseObject
+
+    def test_promise_delivered_from_cache(self):
+        url = 'http://example.com/ohhai'
+        h = utils.mock_http(url, """{"name": "Fred", "value": 7}""")
+        self.fetch(url, h)
+
+        p = self.BasicMost.get(url, http=h)
+        self.assertFalse(p._delivered)
+        self.assertEqual(p.name, 'Fred')
+        self.assertTrue(p._delivered)
+        self.assertEqual(h.request.call_count, 1)
@@ -317,6 +317,96 @@ class TestDataObjects(unittest.TestCase):
         self.assertEqual(t.attributes, None)
 
 
+    def test_lazy_list(self):
+
+        class Thing(self.cls):
+            name = fields.Field()
+
+        class Collection(self.cls):
+            things = fields.List(fields.Object(Thing), lazy=True)
+            when = fields.List(fields.Datetime(), lazy=True)
+
+        data = {
+            'things': [{'name': 'thing %d' % i} for i in range(10)],
+            'when': ['2008-12-31T04:00:01Z'],
+        }
+        c = Collection.from_dict(data)
+        with mock.patch.object(Thing, 'from_dict',
+                               wraps=Thing.from_dict) as from_dict:
+            self.assertIsInstance(c.things, fields.LazyList)
+            self.assertEqual(len(c.things), 10)
+            self.assertEqual(from_dict.call_count, 0)
+
+            # Only the items used are decoded, once.
+            self.assertEqual(c.things[3].name, 'thing 3')
+            self.assertEqual(c.things[-1].name, 'thing 9')
+            self.assertTrue(c.things[3] is c.things[3])
+            self.assertEqual(from_dict.call_count, 2)
+
+            self.assertEqual([t.name for t in c.things[2:5]],
+                             ['thing 2', 'thing 3', 'thing 4'])
+            self.assertEqual(from_dict.call_count, 4)
+
+            # Undecoded items are encoded as they were.
+            c.things[3].name = 'changed'
+            self.assertEqual(c.to_dict()['things'][3], {'name': 'changed'})
+            self.assertEqual(c.to_dict()['things'][0], {'name': 'thing 0'})
+            self.assertEqual(from_dict.call_count, 4)
+
+        self.assertEqual([t.name for t in c.things][:4],
+                         ['thing 0', 'thing 1', 'thing 2', 'changed'])
+        self.assertEqual(c.when, [datetime(2008, 12, 31, 4, 0, 1,
+                                           tzinfo=fields.Datetime.utc)])
+        self.assertEqual(c.to_dict()['when'], ['2008-12-31T04:00:01Z'])
+
+        # Changing the list works as with a regular list.
+        c.things.append(Thing(name='new'))
+        del c.things[0]
+        self.assertEqual(len(c.things), 10)
+        self.assertEqual(c.things[-1].name, 'new')
+        self.assertEqual(c.to_dict()['things'][0], {'name': 'thing 1'})
+        self.assertEqual(len(data['things']), 10)
+
+        c = Collection.from_dict(data)
+        self.assertEqual(c.things + [], list(c.things))
+        self.assertEqual(pickle.loads(pickle.dumps(c.when)), c.when)
+        self.assertEqual(c, Collection.from_dict(data))
+        c.decode_all()
+        self.assertTrue(c.things._raw is None)
+
+    def test_lazy_dict(self):
+
+        class Thing(self.cls):
+            name = fields.Field()
+
+        class Collection(self.cls):
+            things = fields.Dict(fields.Object(Thing), lazy=True)
+
+        data = {'things': dict(('t%d' % i, {'name': 'thing %d' % i})
+                               for i in range(10))}
+        c = Collection.from_dict(data)
+        with mock.patch.object(Thing, 'from_dict',
+                               wraps=Thing.from_dict) as from_dict:
+            self.assertIsInstance(c.things, fields.LazyDict)
+            self.assertEqual(len(c.things), 10)
+            self.assertTrue('t3' in c.things)
+            self.assertFalse('t10' in c.things)
+            self.assertEqual(c.things['t3'].name, 'thing 3')
+            self.assertEqual(c.things.get('t4').name, 'thing 4')
+            self.assertRaises(KeyError, lambda: c.things['t10'])
+            self.assertEqual(from_dict.call_count, 2)
+
+            c.things['t3'].name = 'changed'
+            self.assertEqual(c.to_dict()['things']['t3'], {'name': 'changed'})
+            self.assertEqual(c.to_dict()['things']['t5'], {'name': 'thing 5'})
+            self.assertEqual(from_dict.call_count, 2)
+
+        del c.things['t0']
+        self.assertEqual(sorted(c.things), ['t%d' % i for i in range(1, 10)])
+        self.assertEqual(len(data['things']), 10)
+        self.assertEqual(Collection.from_dict(data).things,
+                         Collection.from_dict(data).things)
+
     def test_self_reference(self):
 
         class Reflexive(self.cls):
@@ -358,8 +448,11 @@ class TestDataObjects(unittest.TestCase):
         self.assertIsInstance(r.related, Related)  # not extra_dataobject.Related
         self.assertIsInstance(r.other,   extra_dataobject.OtherRelated)  # not NotRelated
 
-    def set_up_pickling_class(self):
+    def set_up_pickling_class(self, compact=False):
+        is_compact = compact
+
         class BasicMost(self.cls):
+            compact = is_compact
             name  = fields.Field()
             value = fields.Field()
 
@@ -396,6 +489,65 @@ class TestDataObjects(unittest.TestCase):
         self.assertEqual(cloned_obj.api_data, obj.api_data,
             "unpickled instance kept original's api_data")
 
+    def test_pickling_compact(self):
+
+        BasicMost = self.set_up_pickling_class(compact=True)
+
+        obj = BasicMost.from_dict({'name': 'fred', 'value': 7})
+        obj.name = 'barney'
+
+        cloned_obj = pickle.loads(pickle.dumps(obj, 2))
+        self.assertEqual(cloned_obj.name, 'barney')
+        self.assertEqual(cloned_obj.value, 7)
+        self.assertEqual(cloned_obj.api_data, obj.api_data)
+        self.assertTrue('name' not in cloned_obj.__dict__)
+
+    def test_compact(self):
+
+        class Toy(self.cls):
+            compact = True
+            name = fields.Field()
+            made = fields.Datetime()
+            kind = fields.Constant('toy')
+            size = fields.Field(default=lambda obj: 'large')
+
+        class Subtoy(Toy):
+            color = fields.Field(api_name='colour')
+
+        self.assertTrue(Subtoy.compact)
+        self.assertTrue(isinstance(Toy.name, fields.Field))
+        self.assertEqual(sorted(Subtoy._field_slots.keys()),
+                         ['color', 'made', 'name', 'size'])
+
+        t = Subtoy.from_dict({'name': 'Woody', 'colour': 'brown',
+                              'made': '1995-11-22T00:00:00Z'})
+        self.assertEqual(t.name, 'Woody')
+        self.assertEqual(t.color, 'brown')
+        self.assertEqual(t.size, 'large')
+        self.assertEqual(t.kind, 'toy')
+        self.assertEqual(t.made,
+                         datetime(1995, 11, 22, tzinfo=fields.Datetime.utc))
+        t.decode_all()
+        for attrname in Subtoy.fields:
+            self.assertTrue(attrname not in t.__dict__)
+
+        t.name = 'Buzz'
+        del t.color
+        self.assertEqual(t.to_dict(), {
+            'name': 'Buzz',
+            'made': '1995-11-22T00:00:00Z',
+            'kind': 'toy',
+            'size': 'large',
+        })
+
+        # Updating throws away the decoded values.
+        t.update_from_dict({'name': 'Rex'})
+        self.assertEqual(t.name, 'Rex')
+        self.assertTrue(t.made is None)
+
+        self.assertEqual(Subtoy(name='Rex'), Subtoy.from_dict({'name': 'Rex'}))
+        self.assertEqual(Subtoy(name='Rex').name, 'Rex')
+
     def test_field_override(self):
 
         class Parent(dataobject.DataObject):
@@ -476,6 +628,365 @@ class TestDataObjects(unittest.TestCase):
         self.assertEqual(d['itsAlwaysSomething'], 7)
         self.assertEqual(d['itsUsuallySomething'], 'CHEEZBURGH')
 
+    def test_decode_all(self):
+
+        class Toy(self.cls):
+            name = fields.Field()
+            made = fields.Datetime()
+            kind = fields.Constant('toy')
+            size = fields.Field(default=lambda obj: 'large')
+            color = fields.Field(api_name='colour', default='red')
+
+        t = Toy.from_dict({'name': 'Woody', 'made': '1995-11-22T00:00:00Z',
+                           'kind': 'toy', 'extra': {'a': 1}})
+        t.decode_all()
+        for attrname in ('name', 'made', 'size', 'color'):
+            self.assertTrue(attrname in t.__dict__)
+        self.assertEqual(t.__dict__['name'], 'Woody')
+        self.assertEqual(t.__dict__['made'],
+                         datetime(1995, 11, 22, tzinfo=fields.Datetime.utc))
+        self.assertEqual(t.__dict__['size'], 'large')
+        self.assertEqual(t.__dict__['color'], 'red')
+        self.assertEqual(t.kind, 'toy')
+
+        # Decoding everything doesn't overwrite changes.
+        t = Toy.from_dict({'name': 'Woody'})
+        t.name = 'Buzz'
+        t.decode_all()
+        self.assertEqual(t.name, 'Buzz')
+
+        self.assertEqual(Toy.from_dict({
+            'name': 'Woody',
+            'made': '1995-11-22T00:00:00Z',
+            'extra': {'a': 1},
+            'gone': None,
+        }).to_dict(), {
+            'name': 'Woody',
+            'made': '1995-11-22T00:00:00Z',
+            'kind': 'toy',
+            'size': 'large',
+            'colour': 'red',
+            'extra': {'a': 1},
+        })
+
+    def test_decode_all_release(self):
+
+        class Part(self.cls):
+            name = fields.Field()
+
+        class Toy(self.cls):
+            name = fields.Field()
+            made = fields.Datetime()
+            kind = fields.Constant('toy')
+            parts = fields.List(fields.Object(Part), lazy=True)
+
+        data = {
+            'name': 'Woody',
+            'made': '1995-11-22T00:00:00Z',
+            'kind': 'toy',
+            'parts': [{'name': 'hat', 'color': 'brown'}],
+            'extra': {'a': 1},
+        }
+        t = Toy.from_dict(data)
+        t.decode_all(release=True)
+
+        # Only the data with no decoded field is kept, in a new dictionary.
+        self.assertEqual(t.api_data, {'kind': 'toy', 'extra': {'a': 1}})
+        self.assertEqual(t.parts[0].api_data, {'color': 'brown'})
+        self.assertEqual(len(data), 5)
+        self.assertEqual(data['parts'][0], {'name': 'hat', 'color': 'brown'})
+
+        self.assertEqual(t.name, 'Woody')
+        self.assertEqual(t.made,
+                         datetime(1995, 11, 22, tzinfo=fields.Datetime.utc))
+        self.assertEqual(t.to_dict(), data)
+        self.assertEqual(t.changed_fields(), set())
+
+        t.name = 'Buzz'
+        self.assertEqual(t.changed_fields(), set(['name']))
+        self.assertEqual(t.to_dict()['name'], 'Buzz')
+
+        # Updating the instance from new data starts over.
+        t.update_from_dict(dict(data, name='Jessie'))
+        self.assertEqual(t.changed_fields(), set())
+        self.assertEqual(t.api_data['name'], 'Jessie')
+        t.made = None
+        self.assertEqual(t.changed_fields(), set(['made']))
+
+    def test_cached_reads(self):
+
+        class Toy(self.cls):
+            fast_reads = True
+            name = fields.Field()
+            made = fields.Datetime()
+            kind = fields.Constant('toy')
+
+        self.assertIsInstance(Toy.__dict__['name'], dataobject.FieldReader)
+        self.assertIsInstance(Toy.__dict__['kind'], fields.Constant)
+        self.assertTrue(Toy.name is Toy.fields['name'])
+
+        # Other classes keep their fields, and assign attributes natively.
+        class SlowToy(self.cls):
+            name = fields.Field()
+
+        self.assertTrue(SlowToy.__dict__['name'] is SlowToy.fields['name'])
+        self.assertTrue(SlowToy.__setattr__ is self.cls.__setattr__)
+
+        # Subclasses read fast too, including fields they inherit.
+        class FastToy(SlowToy):
+            fast_reads = True
+            size = fields.Field()
+
+        class Subtoy(FastToy):
+            color = fields.Field()
+
+        for attrname in ('name', 'size', 'color'):
+            self.assertIsInstance(Subtoy.__dict__[attrname],
+                                  dataobject.FieldReader)
+        s = Subtoy.from_dict({'name': 'Rex', 'color': 'green'})
+        self.assertEqual(s.name, 'Rex')
+        s.name = 'T. Rex'
+        self.assertEqual(s.changed_fields(), set(['name']))
+
+        t = Toy.from_dict({'name': 'Woody', 'made': '1995-11-22T00:00:00Z'})
+        with mock.patch.object(fields.Datetime, 'decode',
+                               return_value=datetime(1995, 11, 22)) as decode:
+            self.assertEqual(t.made, datetime(1995, 11, 22))
+            self.assertEqual(t.made, datetime(1995, 11, 22))
+        # The value was decoded once, then read from the instance.
+        self.assertEqual(decode.call_count, 1)
+        self.assertEqual(t.__dict__['made'], datetime(1995, 11, 22))
+
+        # Assignment and deletion still go through the field.
+        t.name = 'Buzz'
+        self.assertEqual(t.name, 'Buzz')
+        self.assertEqual(t.changed_fields(), set(['name']))
+        del t.made
+        self.assertEqual(t.made, None)
+        self.assertFalse('made' in t.api_data)
+        self.assertEqual(t.changed_fields(), set(['name', 'made']))
+        del t.made
+        self.assertRaises(AttributeError, delattr, t, 'nonfield')
+
+        # Attribute hooks inherited from other classes still run.
+        class LoggedToy(self.cls):
+            name = fields.Field()
+
+            def __setattr__(self, name, value):
+                self.__dict__.setdefault('log', []).append(name)
+                super(LoggedToy, self).__setattr__(name, value)
+
+            def __delattr__(self, name):
+                self.__dict__.setdefault('log', []).append('-' + name)
+                super(LoggedToy, self).__delattr__(name)
+
+        class FastLoggedToy(LoggedToy):
+            fast_reads = True
+
+        # Subclasses of fast classes may add hooks of their own, too.
+        class LoggedFastToy(FastToy):
+            def __setattr__(self, name, value):
+                self.__dict__.setdefault('log', []).append(name)
+                super(LoggedFastToy, self).__setattr__(name, value)
+
+            def __delattr__(self, name):
+                self.__dict__.setdefault('log', []).append('-' + name)
+                super(LoggedFastToy, self).__delattr__(name)
+
+        for cls in (FastLoggedToy, LoggedFastToy):
+            t = cls.from_dict({'name': 'Woody'})
+            t.__dict__['log'] = []
+            t.color = 'brown'
+            t.name = 'Buzz'
+            del t.color
+            del t.name
+            self.assertEqual(t.log, ['color', 'name', '-color', '-name'])
+            self.assertEqual(t.changed_fields(), set(['name']))
+            self.assertEqual(t.name, None)
+
+    def test_equality(self):
+
+        class Part(self.cls):
+            name = fields.Field()
+
+        class Toy(self.cls):
+            name = fields.Field()
+            made = fields.Datetime()
+            part = fields.Object(Part)
+
+        data = {'name': 'Woody', 'made': '1995-11-22T00:00:00Z',
+                'part': {'name': 'hat'}}
+        a, b = Toy.from_dict(data), Toy.from_dict(dict(data))
+        with mock.patch.object(fields.Datetime, 'decode') as decode:
+            self.assertEqual(a, b)
+            self.assertFalse(a != b)
+        # Unchanged instances were compared by their API data alone.
+        self.assertEqual(decode.call_count, 0)
+        self.assertFalse('part' in a.__dict__)
+
+        # Fields whose data differs are compared by their decoded values.
+        c = Toy.from_dict(dict(data, made='1995-11-21T20:00:00-04:00',
+                               extra=True))
+        self.assertEqual(a, c)
+        self.assertNotEqual(a, Toy.from_dict(dict(data, name='Buzz')))
+
+        # Decoding fields doesn't change the result...
+        self.assertEqual(a.made, b.made)
+        self.assertEqual(a, b)
+        # ...but changing decoded values does.
+        a.part.name = 'boot'
+        self.assertNotEqual(a, b)
+        b.part.name = 'boot'
+        self.assertEqual(a, b)
+        a.name = 'Buzz'
+        self.assertNotEqual(a, b)
+        self.assertNotEqual(b, a)
+
+        a = Toy.from_dict(data)
+        a.decode_all(release=True)
+        self.assertEqual(a, Toy.from_dict(data))
+        self.assertNotEqual(a, Toy.from_dict(dict(data, made=None)))
+
+    def test_fingerprint(self):
+
+        class Part(self.cls):
+            name = fields.Field()
+
+        class Toy(self.cls):
+            name = fields.Field()
+            made = fields.Datetime()
+            part = fields.Object(Part)
+
+        data = {'name': 'Woody', 'made': '1995-11-22T00:00:00Z',
+                'part': {'name': 'hat'}}
+        t = Toy.from_dict(data)
+        fingerprint = t.fingerprint()
+        self.assertEqual(len(fingerprint), 40)
+        self.assertEqual(Toy.from_dict(dict(data)).fingerprint(), fingerprint)
+        self.assertNotEqual(Toy.from_dict(dict(data, x=1)).fingerprint(),
+                            fingerprint)
+
+        # The fingerprint is remembered while the instance is unchanged.
+        self.assertFalse('part' in t.__dict__)
+        with mock.patch.object(Toy, '_encode_with') as encode_with:
+            self.assertEqual(t.fingerprint(), fingerprint)
+            self.assertEqual(t.made.year, 1995)
+            self.assertEqual(t.fingerprint(), fingerprint)
+        self.assertEqual(encode_with.call_count, 0)
+
+        t.name = 'Buzz'
+        self.assertNotEqual(t.fingerprint(), fingerprint)
+        t.update_from_dict(data)
+        self.assertEqual(t.fingerprint(), fingerprint)
+
+        # It's remembered after decoded objects are read, too.
+        self.assertEqual(t.part.name, 'hat')
+        with mock.patch.object(Toy, '_encode_with') as encode_with:
+            self.assertEqual(t.fingerprint(), fingerprint)
+        self.assertEqual(encode_with.call_count, 0)
+
+        # Changes in place count once the field is assigned again.
+        t.part.name = 'boot'
+        self.assertEqual(t.fingerprint(), fingerprint)
+        t.part = t.part
+        self.assertNotEqual(t.fingerprint(), fingerprint)
+        t.part.name = 'hat'
+        t.mark_changed('part')
+        self.assertEqual(t.fingerprint(), fingerprint)
+
+    def test_changed_fields(self):
+
+        class Toy(self.cls):
+            name = fields.Field()
+            made = fields.Datetime()
+            kind = fields.Constant('toy')
+            tags = fields.List(fields.Field())
+
+        t = Toy.from_dict({'name': 'Woody', 'made': '1995-11-22T00:00:00Z',
+                           'kind': 'toy', 'tags': ['cowboy']})
+        self.assertEqual(t.changed_fields(), set())
+        self.assertEqual(t.to_patch_dict(), {})
+
+        # Reading fields doesn't change them.
+        t.decode_all()
+        self.assertEqual(t.changed_fields(), set())
+
+        t.name = 'Buzz'
+        del t.made
+        t.tags.append('sheriff')
+        self.assertEqual(t.changed_fields(), set(['name', 'made', 'tags']))
+        self.assertEqual(t.to_patch_dict(), {
+            'name': 'Buzz',
+            'made': None,
+            'tags': ['cowboy', 'sheriff'],
+        })
+
+        t.update_from_dict({'name': 'Rex'})
+        self.assertEqual(t.changed_fields(), set())
+
+    def test_changed_nested_fields(self):
+
+        class Inner(self.cls):
+            a = fields.Field()
+            b = fields.Field()
+
+        class Outer(self.cls):
+            inner = fields.Object(Inner)
+
+        data = {'inner': {'a': 1, 'b': 2, 'c': 3}}
+        o = Outer.from_dict(data)
+        del o.inner.b
+        self.assertEqual(o.changed_fields(), set(['inner']))
+        self.assertEqual(o.to_patch_dict(), {'inner': {'b': None}})
+        # The original data wasn't changed.
+        self.assertEqual(data, {'inner': {'a': 1, 'b': 2, 'c': 3}})
+
+        o = Outer.from_dict(data)
+        o.inner.b = None
+        o.inner.a = 4
+        self.assertEqual(o.to_patch_dict(), {'inner': {'a': 4, 'b': None}})
+
+        # Replaced objects remove the members they don't have.
+        o = Outer.from_dict(data)
+        o.inner = Inner(a=1)
+        self.assertEqual(o.to_patch_dict(), {'inner': {'b': None, 'c': None}})
+
+    def test_to_dict_passthrough(self):
+
+        class Toy(self.cls):
+            name = fields.Field()
+            tags = fields.List(fields.Field())
+            made = fields.Datetime()
+
+        self.assertEqual([plan[4] for plan in Toy._encode_plan],
+                         [False, True, True])
+
+        t = Toy.from_dict({'name': 'Woody', 'tags': ['a', {'b': 1}],
+                           'made': '1995-11-22T00:00:00.5-05:00'})
+        d = t.to_dict()
+        # Undecoded fields are copied without decoding them.
+        self.assertTrue('tags' not in t.__dict__)
+        self.assertEqual(d['tags'], ['a', {'b': 1}])
+        self.assertFalse(d['tags'] is t.api_data['tags'])
+        self.assertFalse(d['tags'][1] is t.api_data['tags'][1])
+        # Fields that don't pass values through are still encoded.
+        self.assertEqual(d['made'], '1995-11-22T05:00:00Z')
+
+    def test_compile_plans(self):
+
+        class Toy(self.cls):
+            name = fields.Field()
+
+        self.assertEqual([plan[0] for plan in Toy._encode_plan], ['name'])
+
+        class Subtoy(Toy):
+            size = fields.Field(api_name='bigness')
+
+        self.assertEqual([plan[:2] for plan in Subtoy._encode_plan],
+                         [('name', 'name'), ('size', 'bigness')])
+        self.assertEqual(Subtoy._field_api_names,
+                         frozenset(['name', 'bigness']))
+
     def test_field_constant(self):
 
         noninconstant = 'liono'
@@ -500,6 +1011,63 @@ class TestDataObjects(unittest.TestCase):
         # Just to make sure
         self.assertEqual(x.alwaysTheSame, noninconstant)
 
+    def test_subclass_with_constant_field(self):
+
+        class Event(self.cls):
+            kind = fields.Field()
+
+        class Post(Event):
+            kind = fields.Constant('post')
+
+        class Photo(Post):
+            kind = fields.Constant('photo')
+
+        class Reply(Post):
+            kind = fields.Constant(['post', 'reply'])
+
+        self.assertTrue(Event.subclass_with_constant_field('kind', 'post') is Post)
+        self.assertTrue(Event.subclass_with_constant_field('kind', 'photo') is Photo)
+        self.assertTrue(Post.subclass_with_constant_field('kind', 'photo') is Photo)
+        self.assertTrue(Event.subclass_with_constant_field(
+            'kind', ['post', 'reply']) is Reply)
+        self.assertRaises(ValueError, Photo.subclass_with_constant_field,
+                          'kind', 'post')
+        self.assertRaises(ValueError, Event.subclass_with_constant_field,
+                          'kind', 'video')
+
+    def test_field_object_polymorphic(self):
+
+        class Event(self.cls):
+            kind = fields.Field()
+            name = fields.Field()
+
+        class Post(Event):
+            kind = fields.Constant('post', api_name='objectType')
+
+        class Photo(Event):
+            kind = fields.Constant('photo', api_name='objectType')
+            size = fields.Field()
+
+        class Stream(self.cls):
+            events = fields.List(fields.Object(Event, polymorphic=True))
+            plain = fields.List(fields.Object(Event))
+
+        s = Stream.from_dict({
+            'events': [
+                {'objectType': 'post', 'name': 'hi'},
+                {'objectType': 'photo', 'name': 'me', 'size': 3},
+                {'objectType': 'video', 'name': 'nope'},
+                {'name': 'no kind'},
+            ],
+            'plain': [{'objectType': 'post', 'name': 'hi'}],
+        })
+        self.assertEqual([type(e) for e in s.events],
+                         [Post, Photo, Event, Event])
+        self.assertEqual(s.events[1].size, 3)
+        self.assertEqual(s.events[0].to_dict(),
+                         {'objectType': 'post', 'name': 'hi'})
+        self.assertEqual([type(e) for e in s.plain], [Event])
+
     def test_field_link(self):
 
         class Frob(dataobject.DataObject):
@@ -523,6 +1091,33 @@ class TestDataObjects(unittest.TestCase):
         # The string class name should be converted to the class
         self.assertEqual(Foo.__dict__["link"].cls, Bar)
 
+    def test_forwards_object_cached(self):
+        class Owner(dataobject.DataObject):
+            pet = fields.Object('Pet')
+
+        class Pet(dataobject.DataObject):
+            name = fields.Field()
+
+        field = Owner.fields['pet']
+        o = Owner.from_dict({'pet': {'name': 'Rex'}})
+        self.assertIsInstance(o.pet, Pet)
+        self.assertTrue(field.__dict__['resolved_cls'] is Pet)
+
+        # The leafmost class declared with the name still wins.
+        OldPet = Pet
+
+        class Pet(OldPet):
+            tricks = fields.List(fields.Field())
+
+        self.assertTrue(field.cls is Pet)
+        o = Owner.from_dict({'pet': {'name': 'Rex', 'tricks': ['sit']}})
+        self.assertIsInstance(o.pet, Pet)
+        self.assertEqual(o.pet.tricks, ['sit'])
+
+        # Setting the class directly replaces the cached one.
+        field.cls = OldPet
+        self.assertTrue(field.cls is OldPet)
+
     def test_field_datetime(self):
 
         class Timely(dataobject.DataObject):
@@ -578,6 +1173,36 @@ class TestDataObjects(unittest.TestCase):
         self.assertIsInstance(t, Timely, 'Datetime with missing data decoded properly')
         self.assertTrue(t.when is None, 'Datetime with missing data decoded to None timestamp')
 
+    def test_field_datetime_formats(self):
+
+        class Timely(dataobject.DataObject):
+            when = fields.Datetime()
+
+        utc = fields.Datetime.utc
+        for value, expected in (
+            ('2008-12-31T04:00:01Z', datetime(2008, 12, 31, 4, 0, 1, tzinfo=utc)),
+            ('2008-12-31T04:00:01.25Z', datetime(2008, 12, 31, 4, 0, 1, 250000, tzinfo=utc)),
+            ('2008-12-31T04:00:01-05:30', datetime(2008, 12, 31, 9, 30, 1, tzinfo=utc)),
+            ('2009-01-01T00:30:01+0100', datetime(2008, 12, 31, 23, 30, 1, tzinfo=utc)),
+            # Unusual formats are left to dateutil.
+            ('2008-12-31 04:00:01Z', datetime(2008, 12, 31, 4, 0, 1, tzinfo=utc)),
+            ('2008-12-31T04:00:01.1234567Z', datetime(2008, 12, 31, 4, 0, 1, 123456, tzinfo=utc)),
+            ('2008-12-31T04:00:01+05:60', datetime(2008, 12, 30, 22, 0, 1, tzinfo=utc)),
+        ):
+            when = Timely.from_dict({'when': value}).when
+            self.assertEqual(when, expected, value)
+            self.assertTrue(when.tzinfo is utc, value)
+
+        for value in ('2008-02-30T00:00:00Z', 'tomorrow', 7,
+                      '2008-12-31T04:00:01+24:00', '2008-12-31T04:00:01-99:99'):
+            t = Timely.from_dict({'when': value})
+            self.assertRaises(TypeError, lambda: t.when)
+
+        # Only ASCII digits and offsets in range take the fast path.
+        for value in (u'2008-12-31T04:00:0\u0661Z', '2008-12-31T04:00:01+05:60',
+                      '2008-12-31T04:00:01+24:00'):
+            self.assertTrue(fields.parse_timestamp(value) is None, value)
+
 
 if __name__ == '__main__':
     utils.log()
@@ -0,0 +1,170 @@
+# Copyright (c) 2009-2010 Six Apart Ltd.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of Six Apart Ltd. nor the names of its contributors may
+#   be used to endorse or promote products derived from this software without
+#   specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import unittest
+
+import mock
+
+from remoteobjects import dataobject, fields, promise
+from remoteobjects.diff import Diff, diff
+from tests import utils
+
+
+class DiffPart(dataobject.DataObject):
+    name = fields.Field()
+    size = fields.Field()
+
+
+class DiffToy(dataobject.DataObject):
+    name = fields.Field()
+    made = fields.Datetime()
+    kind = fields.Constant('toy')
+    spare = fields.Object(DiffPart)
+    tags = fields.List(fields.Field())
+
+
+class DiffCompactToy(dataobject.DataObject):
+    compact = True
+    name = fields.Field()
+    made = fields.Datetime()
+
+
+class DiffPromisedToy(promise.PromiseObject):
+    name = fields.Field()
+
+
+class TestDiff(unittest.TestCase):
+
+    data = {
+        'name': 'Woody',
+        'made': '1995-11-22T00:00:00Z',
+        'kind': 'toy',
+        'spare': {'name': 'hat', 'size': 3},
+        'tags': ['cowboy'],
+        'unknown': {'x': 1},
+    }
+
+    def test_same(self):
+        old = DiffToy.from_dict(self.data)
+        new = DiffToy.from_dict(dict(self.data, unknown=None))
+        with mock.patch.object(fields.Field, 'decode') as decode:
+            changes = diff(old, new)
+        self.assertEqual(changes, {})
+        self.assertIsInstance(changes, Diff)
+        self.assertTrue(changes.cls is DiffToy)
+        self.assertEqual(changes.to_patch_dict(), {})
+        # No field was decoded, as all their data was the same.
+        self.assertEqual(decode.call_count, 0)
+        self.assertEqual(old._local_values(), {})
+
+        # Data that decodes to the same value isn't a change.
+        new = DiffToy.from_dict(dict(self.data,
+                                     made='1995-11-21T20:00:00-04:00'))
+        self.assertEqual(diff(old, new), {})
+
+    def test_changes(self):
+        old = DiffToy.from_dict(self.data)
+        new = DiffToy.from_dict(dict(self.data, name='Buzz', made=None,
+                                     spare={'name': 'helmet', 'size': 3}))
+        changes = diff(old, new)
+        self.assertEqual(sorted(changes.keys()), ['made', 'name', 'spare'])
+        self.assertEqual(changes['name'].old, 'Woody')
+        self.assertEqual(changes['name'].new, 'Buzz')
+        self.assertTrue(changes['name'].nested is None)
+        self.assertTrue(changes['made'].new is None)
+        # Only the fields with different data were decoded.
+        self.assertEqual(sorted(old._local_values().keys()),
+                         ['made', 'name', 'spare'])
+
+        # Changed instances are compared field by field too.
+        nested = changes['spare'].nested
+        self.assertEqual(list(nested.keys()), ['name'])
+        self.assertTrue(nested.cls is DiffPart)
+        self.assertEqual(nested['name'].new, 'helmet')
+
+        self.assertEqual(changes.to_patch_dict(), {
+            'name': 'Buzz',
+            'made': None,
+            'spare': {'name': 'helmet'},
+        })
+
+    def test_local_changes(self):
+        old = DiffToy.from_dict(self.data)
+        new = DiffToy.from_dict(self.data)
+
+        # Assigned and changed values are compared, not the API data.
+        new.tags = ['cowboy', 'sheriff']
+        new.spare.size = 4
+        changes = diff(old, new)
+        self.assertEqual(sorted(changes.keys()), ['spare', 'tags'])
+        self.assertEqual(changes.to_patch_dict(), {
+            'spare': {'size': 4},
+            'tags': ['cowboy', 'sheriff'],
+        })
+
+        new.spare = None
+        self.assertEqual(diff(old, new).to_patch_dict(), {
+            'spare': None,
+            'tags': ['cowboy', 'sheriff'],
+        })
+        self.assertEqual(diff(new, old).to_patch_dict(), {
+            'spare': {'name': 'hat', 'size': 3},
+            'tags': ['cowboy'],
+        })
+
+        new = DiffToy.from_dict(self.data)
+        new.decode_all(release=True)
+        self.assertEqual(diff(old, new), {})
+
+    def test_compact(self):
+        old = DiffCompactToy.from_dict(self.data)
+        new = DiffCompactToy.from_dict(self.data)
+        self.assertEqual(diff(old, new), {})
+        new.name = 'Buzz'
+        self.assertEqual(diff(old, new).to_patch_dict(), {'name': 'Buzz'})
+
+    def test_wrong_class(self):
+        self.assertRaises(TypeError, diff, DiffToy(), DiffPart())
+
+    def test_promised(self):
+        old = DiffPromisedToy.get('http://example.com/woody')
+        new = DiffPromisedToy.from_dict({'name': 'Buzz'})
+        with mock.patch.object(DiffPromisedToy, 'deliver') as deliver:
+            def delivered():
+                old.update_from_dict({'name': 'Woody'})
+                old._delivered = True
+            deliver.side_effect = delivered
+            changes = diff(old, new)
+        self.assertEqual(deliver.call_count, 1)
+        self.assertEqual(changes.to_patch_dict(), {'name': 'Buzz'})
+
+
+if __name__ == '__main__':
+    utils.log()
+    unittest.main()
@@ -27,9 +27,15 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
 
+import threading
+import time
 import unittest
 
-from remoteobjects import fields, http
+import httplib2
+import mock
+from six.moves.BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+
+from remoteobjects import fields, http, json
 from six import PY2
 from tests import test_dataobject
 from tests import utils
@@ -117,6 +123,42 @@ class TestHttpObjects(unittest.TestCase):
 
         h.request.assert_called_once_with(**request)
 
+    def test_json_codecs(self):
+
+        request = {
+            'uri': 'http://example.com/ohhai',
+            'headers': {'accept': 'application/json'},
+        }
+
+        for name in sorted(json.codecs_by_name):
+
+            class BasicMost(self.cls):
+                json_codec = name
+                name_ = fields.Field(api_name='name')
+                value = fields.Field()
+
+            self.assertEqual(BasicMost.get_json_codec().name, name)
+
+            content = u'{"name": "100 \u20AC", "value": 7}'.encode('utf-8')
+            h = utils.mock_http(request, content)
+            b = BasicMost.get('http://example.com/ohhai', http=h)
+            self.assertEqual(b.name_, u"100 \u20AC", name)
+            self.assertEqual(b.value, 7, name)
+
+            content = b'{"name": "Fred\xf1", "value": 7}'
+            h = utils.mock_http(request, content)
+            b = BasicMost.get('http://example.com/ohhai', http=h)
+            self.assertEqual(b.name_, u"Fred\ufffd", name)
+
+            encoded = BasicMost.get_json_codec().dumps(
+                {'name': u'100 \u20AC', 'value': None}, default=http.omit_nulls)
+            self.assertEqual(json.loads(encoded),
+                             {'name': u'100 \u20AC', 'value': None}, name)
+
+            h = utils.mock_http(request, b'{"name": ')
+            self.assertRaises(ValueError, lambda: BasicMost.get(
+                'http://example.com/ohhai', http=h).name_)
+
     def test_post(self):
 
         class BasicMost(self.cls):
@@ -186,6 +228,52 @@ class TestHttpObjects(unittest.TestCase):
 
         self.assertEqual(b._etag, 'xyz')
 
+    def test_put_stream(self):
+
+        class Entry(self.cls):
+            name = fields.Field()
+
+        class Feed(self.cls):
+            title   = fields.Field()
+            entries = fields.List(fields.Object(Entry))
+
+        request = {
+            'uri': 'http://example.com/feed',
+            'headers': {'accept': 'application/json'},
+        }
+        content = """{"title": "Feed", "entries": [{"name": "one"}]}"""
+        h = utils.mock_http(request, content)
+        f = Feed.get('http://example.com/feed', http=h)
+        f.entries = [Entry(name='entry %d' % i) for i in range(5000)]
+
+        bodies = []
+
+        def request(**kwargs):
+            bodies.append(list(kwargs['body']))
+            response = httplib2.Response({
+                'status': 200,
+                'etag': 'xyz',
+                'content-type': 'application/json',
+                'content-location': 'http://example.com/feed',
+            })
+            return response, iter([b'{"title": "Saved", ', b'"entries": []}'])
+
+        h = mock.Mock(spec_set=['request'])
+        h.request.side_effect = request
+        f.put(http=h, stream=True)
+
+        # The body was sent in several chunks, encoding the entries.
+        chunks = bodies[0]
+        self.assertTrue(len(chunks) > 1)
+        data = json.loads(b''.join(chunks))
+        self.assertEqual(data['title'], 'Feed')
+        self.assertEqual(len(data['entries']), 5000)
+        self.assertEqual(data['entries'][1234], {'name': 'entry 1234'})
+
+        # The chunked response was read whole.
+        self.assertEqual(f.title, 'Saved')
+        self.assertEqual(f.entries, [])
+
     def test_put_no_content(self):
         """
         Don't try to update from a no-content response.
@@ -219,6 +307,103 @@ class TestHttpObjects(unittest.TestCase):
 
         self.assertEqual(b.name, 'Molly')
 
+    def test_patch(self):
+
+        class BasicMost(self.cls):
+            name  = fields.Field()
+            value = fields.Field()
+            tags  = fields.List(fields.Field())
+
+        request = {
+            'uri': 'http://example.com/bwuh',
+            'headers': {'accept': 'application/json'},
+        }
+        content = """{"name": "Molly", "value": 80, "tags": ["a"]}"""
+        h = utils.mock_http(request, content)
+        b = BasicMost.get('http://example.com/bwuh', http=h)
+        self.assertEqual(b.name, 'Molly')
+
+        b.value = 81
+        del b.tags
+        headers = {
+            'accept':       'application/json',
+            'content-type': 'application/merge-patch+json',
+            'if-match':     '7',
+        }
+        request = dict(uri='http://example.com/bwuh', method='PATCH',
+                       headers=headers, body='{"tags": null, "value": 81}')
+        response = dict(content='{"name": "Molly", "value": 81}', etag='8')
+        h = utils.mock_http(request, response)
+        b.patch(http=h)
+        h.request.assert_called_once_with(**request)
+
+        self.assertEqual(b._etag, '8')
+        self.assertEqual(b.value, 81)
+        self.assertEqual(b.to_patch_dict(), {})
+
+    def test_patch_no_content(self):
+
+        class BasicMost(self.cls):
+            name  = fields.Field()
+            value = fields.Field()
+
+        request = {
+            'uri': 'http://example.com/bwuh',
+            'headers': {'accept': 'application/json'},
+        }
+        content = """{"name": "Molly", "value": 80}"""
+        h = utils.mock_http(request, content)
+        b = BasicMost.get('http://example.com/bwuh', http=h)
+        b.name = 'Polly'
+
+        headers = {
+            'accept':       'application/json',
+            'content-type': 'application/merge-patch+json',
+            'if-match':     '7',
+        }
+        request = dict(uri='http://example.com/bwuh', method='PATCH',
+                       headers=headers, body='{"name": "Polly"}')
+        h = utils.mock_http(request, dict(content="", status=204))
+        b.patch(http=h)
+        h.request.assert_called_once_with(**request)
+
+        self.assertEqual(b.name, 'Polly')
+        self.assertEqual(b.api_data, {'name': 'Polly', 'value': 80})
+        self.assertEqual(b.changed_fields(), set())
+
+    def test_patch_nested(self):
+
+        class Inner(self.cls):
+            a = fields.Field()
+            b = fields.Field()
+
+        class Outer(self.cls):
+            inner = fields.Object(Inner)
+
+        request = {
+            'uri': 'http://example.com/bwuh',
+            'headers': {'accept': 'application/json'},
+        }
+        content = """{"inner": {"a": 1, "b": 2}}"""
+        h = utils.mock_http(request, content)
+        o = Outer.get('http://example.com/bwuh', http=h)
+        del o.inner.b
+
+        headers = {
+            'accept':       'application/json',
+            'content-type': 'application/merge-patch+json',
+            'if-match':     '7',
+        }
+        request = dict(uri='http://example.com/bwuh', method='PATCH',
+                       headers=headers, body='{"inner": {"b": null}}')
+        h = utils.mock_http(request, dict(content="", status=204))
+        o.patch(http=h)
+        h.request.assert_called_once_with(**request)
+
+        self.assertEqual(o.api_data, {'inner': {'a': 1}})
+        self.assertEqual(o.changed_fields(), set())
+        self.assertEqual(o.to_patch_dict(), {})
+
     def test_put_failure(self):
 
         class BasicMost(self.cls):
@@ -251,6 +436,50 @@ class TestHttpObjects(unittest.TestCase):
         self.assertRaises(BasicMost.PreconditionFailed, lambda: b.put(http=h))
         h.request.assert_called_once_with(**request)
 
+    def test_refresh(self):
+
+        class BasicMost(self.cls):
+            name  = fields.Field()
+            value = fields.Field(api_name='values')
+            items = fields.List(fields.Field())
+
+        url = 'http://example.com/bwuh'
+        request = {
+            'uri': url,
+            'headers': {'accept': 'application/json'},
+        }
+        content = """{"name": "Molly", "values": 80, "items": [1, 2]}"""
+        last_modified = 'Sat, 17 Oct 2026 12:00:00 GMT'
+        h = utils.mock_http(request, dict(content=content, **{'last-modified': last_modified}))
+        b = BasicMost.get(url, http=h)
+        items = b.items
+        api_data = b.api_data
+        h.request.assert_called_once_with(**request)
+        self.assertEqual(b._last_modified, last_modified)
+
+        headers = {
+            'accept':            'application/json',
+            'if-none-match':     '7',  # default etag
+            'if-modified-since': last_modified,
+        }
+        request = dict(uri=url, headers=headers)
+        h = utils.mock_http(request, dict(status=304, etag='7'))
+        self.assertFalse(b.refresh(http=h))
+        h.request.assert_called_once_with(**request)
+        self.assertTrue(b.api_data is api_data)
+        self.assertTrue(b.items is items)
+        self.assertEqual(b._location, url)
+
+        content = """{"name": "Molly", "values": 81, "items": [3]}"""
+        h = utils.mock_http(request, dict(content=content, etag='8'))
+        self.assertTrue(b.refresh(http=h))
+        h.request.assert_called_once_with(**request)
+        self.assertEqual(b.value, 81)
+        self.assertEqual(b.items, [3])
+        self.assertEqual(b._etag, '8')
+
+        self.assertRaises(ValueError, lambda: BasicMost().refresh())
+
     def test_delete(self):
 
         class BasicMost(self.cls):
@@ -362,6 +591,313 @@ class TestHttpObjects(unittest.TestCase):
         http.request.assert_called_once_with(**request)
 
 
+class TestJsonCodecs(unittest.TestCase):
+
+    def test_registry(self):
+        self.assertEqual(json.get_codec().name, 'simplejson')
+        self.assertTrue(json.get_codec('json') is json.codecs_by_name['json'])
+        self.assertRaises(KeyError, json.get_codec, 'nonesuch')
+
+        try:
+            json.set_default_codec('json')
+            self.assertEqual(json.get_codec().name, 'json')
+            self.assertEqual(json.loads(b'[1, "a"]'), [1, "a"])
+            self.assertEqual(http.HttpObject.get_json_codec().name, 'json')
+        finally:
+            json.set_default_codec('simplejson')
+
+    def test_iterdumps(self):
+
+        class Thing(object):
+            def __init__(self, i):
+                self.i = i
+
+        def default(obj):
+            return {'i': obj.i, 'more': [Thing(None)] if obj.i else []}
+
+        data = {'things': [Thing(i) for i in range(3)], 'count': 3}
+        expected = {'things': [{'i': i, 'more': [{'i': None, 'more': []}]}
+                               for i in range(1, 3)], 'count': 3}
+        expected['things'].insert(0, {'i': 0, 'more': []})
+        for name in sorted(json.codecs_by_name):
+            codec = json.get_codec(name)
+            chunks = list(codec.iterdumps(data, default=default, chunk_size=10))
+            self.assertTrue(len(chunks) > 1)
+            self.assertTrue(all(isinstance(chunk, bytes) for chunk in chunks))
+            self.assertEqual(json.loads(b''.join(chunks)), expected)
+
+    def test_forgiving_loads(self):
+        content = b'{"name": "caf\xe9", "value": ["\xff", "ok"]}'
+        self.assertEqual(json.forgiving_loads(content),
+                         {"name": u"caf\ufffd", "value": [u"\ufffd", u"ok"]})
+        self.assertEqual(json.repair_utf8(u"caf\xe9"), u"caf\xe9")
+        self.assertRaises(ValueError, json.forgiving_loads, b'{"name": \xe9}')
+
+
+class TestUserAgentProviders(unittest.TestCase):
+
+    def make_factory(self):
+        made = []
+
+        def factory():
+            h = utils.mock_http('http://example.com/', '{}')
+            made.append(h)
+            return h
+        return factory, made
+
+    def test_thread_local(self):
+        factory, made = self.make_factory()
+        provider = http.ThreadLocalUserAgent(factory)
+
+        provider.request(uri='http://example.com/')
+        provider.request(uri='http://example.com/')
+        self.assertEqual(len(made), 1)
+        self.assertEqual(made[0].request.call_count, 2)
+
+        seen = []
+
+        def other_thread():
+            seen.append(provider.get_user_agent())
+            provider.request(uri='http://example.com/')
+        t = threading.Thread(target=other_thread)
+        t.start()
+        t.join()
+        self.assertEqual(len(made), 2)
+        self.assertTrue(seen[0] is made[1])
+        self.assertTrue(provider.get_user_agent() is made[0])
+
+    def test_thread_local_fork(self):
+        factory, made = self.make_factory()
+        provider = http.ThreadLocalUserAgent(factory)
+        self.assertTrue(provider.get_user_agent() is made[0])
+
+        with mock.patch('os.getpid', return_value=provider.pid + 1):
+            self.assertTrue(provider.get_user_agent() is made[1])
+        self.assertEqual(len(made), 2)
+
+    def test_pool(self):
+        factory, made = self.make_factory()
+        provider = http.PooledUserAgent(factory, size=2, timeout=0.01)
+
+        with provider.borrow() as first:
+            with provider.borrow() as second:
+                self.assertFalse(first is second)
+                try:
+                    with provider.borrow():
+                        pass
+                except http.PooledUserAgent.Exhausted:
+                    pass
+                else:
+                    self.fail('Borrowed more user agents than the pool holds')
+        self.assertEqual(len(made), 2)
+
+        # User agents are reused once returned.
+        for _ in range(5):
+            provider.request(uri='http://example.com/')
+        self.assertEqual(len(made), 2)
+        self.assertEqual(sum(h.request.call_count for h in made), 5)
+
+        # A forked child makes its own.
+        with mock.patch('os.getpid', return_value=provider.pid + 1):
+            provider.request(uri='http://example.com/')
+        self.assertEqual(len(made), 3)
+
+    def test_pool_factory_error(self):
+        factory, made = self.make_factory()
+        failing = [True]
+
+        def flaky_factory():
+            if failing:
+                failing.pop()
+                raise ValueError('no user agent for you')
+            return factory()
+        provider = http.PooledUserAgent(flaky_factory, size=1, timeout=0.01)
+
+        # The pool doesn't lose the slot the failed user agent was for.
+        self.assertRaises(ValueError, provider.request, uri='http://example.com/')
+        provider.request(uri='http://example.com/')
+        self.assertEqual(len(made), 1)
+
+    def test_default_user_agent(self):
+
+        class BasicMost(http.HttpObject):
+            name = fields.Field()
+
+        factory, made = self.make_factory()
+        with mock.patch('remoteobjects.http.userAgent', http.PooledUserAgent(factory)):
+            b = BasicMost.get('http://example.com/')
+            self.assertTrue(http.get_threadsafe_user_agent() is http.userAgent)
+        self.assertEqual(len(made), 1)
+        made[0].request.assert_called_once_with(
+            uri='http://example.com/', headers={'accept': 'application/json'})
+        self.assertIsInstance(b, BasicMost)
+
+        self.assertIsInstance(http.userAgent, http.ThreadLocalUserAgent)
+        self.assertTrue(http.get_threadsafe_user_agent() is http.userAgent)
+
+        # A plain user agent assigned as the default is used through clones.
+        h = httplib2.Http()
+        h.add_credentials('user', 'pass')
+        with mock.patch('remoteobjects.http.userAgent', h):
+            provider = http.get_threadsafe_user_agent()
+            self.assertIsInstance(provider, http.ThreadLocalUserAgent)
+            self.assertTrue(http.get_threadsafe_user_agent() is provider)
+            clone = provider.get_user_agent()
+        self.assertFalse(clone is h)
+        self.assertTrue(clone.credentials is h.credentials)
+
+
+class TestCoalescingUserAgent(unittest.TestCase):
+
+    def test_coalesce(self):
+
+        class BasicMost(http.HttpObject):
+            name = fields.Field()
+
+        url = 'http://example.com/ohhai'
+        h = utils.mock_http(url, '{"name": "Fred"}')
+        response = h.request.return_value
+        release = threading.Event()
+
+        def request(**kwargs):
+            release.wait()
+            return response
+        h.request.side_effect = request
+        coalescer = http.CoalescingUserAgent(h)
+
+        results = []
+
+        def get():
+            results.append(BasicMost.get(url, http=coalescer))
+        threads = [threading.Thread(target=get) for _ in range(5)]
+        for t in threads:
+            t.start()
+        time.sleep(0.1)
+        release.set()
+        for t in threads:
+            t.join()
+
+        h.request.assert_called_once_with(
+            uri=url, headers={'accept': 'application/json'})
+        self.assertEqual(len(results), 5)
+        self.assertEqual(len(set(id(b) for b in results)), 5)
+        for b in results:
+            self.assertEqual(b.name, 'Fred')
+        self.assertEqual(coalescer.calls, {})
+
+        # Later requests make new requests.
+        BasicMost.get(url, http=coalescer)
+        self.assertEqual(h.request.call_count, 2)
+
+    def test_error(self):
+        h = utils.mock_http('http://example.com/', '{}')
+        h.request.side_effect = IOError('oops')
+        coalescer = http.CoalescingUserAgent(h)
+        self.assertRaises(IOError, lambda: coalescer.request(uri='http://example.com/'))
+        self.assertEqual(coalescer.calls, {})
+
+    def test_keys(self):
+        key = http.coalescing_key
+        self.assertEqual(key('http://example.com/', headers={'Accept': 'a'}),
+                         key('http://example.com/', 'GET', headers={'accept': 'a'}))
+        self.assertNotEqual(key('http://example.com/', headers={'accept': 'a'}),
+                            key('http://example.com/', headers={'accept': 'b'}))
+        self.assertNotEqual(key('http://example.com/', headers={'accept': 'a'}),
+                            key('http://example.com/', method='HEAD', headers={'accept': 'a'}))
+        self.assertEqual(key('http://example.com/', headers={'accept': 'a', 'x-id': '1'}, key_headers=('accept',)),
+                         key('http://example.com/', headers={'accept': 'a', 'x-id': '2'}, key_headers=('accept',)))
+        self.assertTrue(key('http://example.com/', method='PUT') is None)
+        self.assertTrue(key('http://example.com/', body='{}') is None)
+
+        # Uncoalesced requests pass straight through.
+        h = utils.mock_http('http://example.com/', '{}')
+        coalescer = http.CoalescingUserAgent(h)
+        coalescer.request(uri='http://example.com/', method='PUT', body='{}')
+        h.request.assert_called_once_with(uri='http://example.com/', method='PUT', body='{}')
+
+
+class TestStreamingUserAgent(unittest.TestCase):
+
+    def test_request(self):
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = b'[' + b','.join([b'"entry"'] * 1000) + b']'
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('X-Accept', self.headers.get('accept'))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(('127.0.0.1', 0), Handler)
+        thread = threading.Thread(target=server.handle_request)
+        thread.daemon = True
+        thread.start()
+        try:
+            url = 'http://127.0.0.1:%d/foo' % server.server_address[1]
+            h = http.StreamingUserAgent(timeout=5, chunk_size=100)
+            response, content = h.request(
+                uri=url, headers={'accept': 'application/json'})
+            self.assertEqual(response.status, 200)
+            self.assertEqual(response['content-type'], 'application/json')
+            self.assertEqual(response['x-accept'], 'application/json')
+
+            chunks = list(content)
+            self.assertTrue(len(chunks) > 1)
+            self.assertTrue(all(len(chunk) <= 100 for chunk in chunks))
+            self.assertEqual(b''.join(chunks),
+                             b'[' + b','.join([b'"entry"'] * 1000) + b']')
+        finally:
+            thread.join(5)
+            server.server_close()
+
+    def test_chunked_body(self):
+        received = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_PUT(self):
+                received.append(self.headers.get('transfer-encoding'))
+                body = b''
+                while True:
+                    size = int(self.rfile.readline().strip(), 16)
+                    body += self.rfile.read(size + 2)[:size]
+                    if not size:
+                        break
+                received.append(body)
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(('127.0.0.1', 0), Handler)
+        thread = threading.Thread(target=server.handle_request)
+        thread.daemon = True
+        thread.start()
+        try:
+            url = 'http://127.0.0.1:%d/foo' % server.server_address[1]
+            h = http.StreamingUserAgent(timeout=5)
+            body = (('"chunk %d",' % i).encode('ascii') for i in range(100))
+            response, content = h.request(uri=url, method='PUT', body=body)
+            self.assertEqual(response.status, 204)
+            self.assertEqual(b''.join(content), b'')
+        finally:
+            thread.join(5)
+            server.server_close()
+
+        self.assertEqual(received[0], 'chunked')
+        self.assertEqual(received[1], b''.join(('"chunk %d",' % i).encode('ascii')
+                                              for i in range(100)))
+
+    def test_bad_scheme(self):
+        h = http.StreamingUserAgent()
+        self.assertRaises(ValueError, h.request, uri='ftp://example.com/')
+
+
 if __name__ == '__main__':
     utils.log()
     unittest.main()
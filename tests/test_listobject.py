@@ -27,12 +27,16 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
 
+import threading
+import time
 import unittest
 
 import httplib2
 import mock
+import simplejson as json
+from six.moves.urllib.parse import urlparse, parse_qs
 
-from remoteobjects import fields, listobject, promise
+from remoteobjects import fields, http, listobject, promise
 from tests import utils
 
 
@@ -85,6 +89,208 @@ class TestPageObjects(unittest.TestCase):
 
         h.request.assert_called_once_with(**request)
 
+    def mock_paged_http(self, total):
+
+        def request(uri, headers):
+            query = parse_qs(urlparse(uri).query)
+            offset = int(query['offset'][0])
+            limit = int(query['limit'][0])
+            entries = list(range(total))[offset:offset + limit]
+            response = httplib2.Response({
+                'status': 200,
+                'content-type': 'application/json',
+                'content-location': uri,
+            })
+            return response, json.dumps({'entries': entries, 'total': total})
+
+        h = mock.Mock(spec_set=httplib2.Http)
+        h.request.side_effect = request
+        return h
+
+    def test_iter_all(self):
+
+        class Toybox(self.cls):
+            pass
+
+        h = self.mock_paged_http(25)
+        b = Toybox.get('http://example.com/foo', http=h)
+        self.assertEqual(list(b.iter_all(page_size=10, prefetch=False)),
+                         list(range(25)))
+        self.assertEqual(h.request.call_count, 3)
+
+        # A full last page means one more request for an empty page.
+        h = self.mock_paged_http(20)
+        b = Toybox.get('http://example.com/foo', http=h)
+        pages = list(b.pages(page_size=10, prefetch=False))
+        self.assertEqual([len(page.entries) for page in pages], [10, 10, 0])
+        self.assertEqual([page._location for page in pages], [
+            'http://example.com/foo?limit=10&offset=0',
+            'http://example.com/foo?limit=10&offset=10',
+            'http://example.com/foo?limit=10&offset=20',
+        ])
+        self.assertEqual(h.request.call_count, 3)
+
+        # A page reaching the total number of entries is the last.
+        class CountedToybox(self.cls):
+            total_results = fields.Field(api_name='total')
+
+        for prefetch in (False, True):
+            h = self.mock_paged_http(20)
+            b = CountedToybox.get('http://example.com/foo',
+                                  http=http.ThreadLocalUserAgent(factory=lambda: h))
+            pages = list(b.pages(page_size=10, prefetch=prefetch))
+            self.assertEqual([len(page.entries) for page in pages], [10, 10])
+            self.assertEqual(h.request.call_count, 2)
+
+    def test_pages_prefetch(self):
+
+        class Toybox(self.cls):
+            pass
+
+        h = self.mock_paged_http(25)
+        b = Toybox.get('http://example.com/foo',
+                       http=http.ThreadLocalUserAgent(factory=lambda: h))
+        pages = b.pages(page_size=10)
+
+        page = next(pages)
+        self.assertEqual(page.entries, list(range(10)))
+
+        # The second page is fetched while we're still on the first.
+        deadline = time.time() + 5
+        while h.request.call_count < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(h.request.call_count, 2)
+
+        page = next(pages)
+        self.assertEqual(page.entries, list(range(10, 20)))
+        page = next(pages)
+        self.assertEqual(page.entries, list(range(20, 25)))
+        self.assertRaises(StopIteration, next, pages)
+        self.assertEqual(h.request.call_count, 3)
+
+        # Plain user agents aren't shared with the background thread, which
+        # uses clones of them instead.
+        h = self.mock_paged_http(25)
+        background = self.mock_paged_http(25)
+        b = Toybox.get('http://example.com/foo', http=h)
+        with mock.patch('remoteobjects.http.clone_user_agent',
+                        return_value=background) as clone:
+            self.assertEqual(list(b.iter_all(page_size=10)), list(range(25)))
+        self.assertEqual(h.request.call_count, 1)
+        self.assertEqual(background.request.call_count, 2)
+        self.assertEqual(clone.call_args_list, [mock.call(h)] * 2)
+
+    def test_pages_without_entries(self):
+
+        class Toybox(self.cls):
+            pass
+
+        url = 'http://example.com/foo?limit=10&offset=0'
+        h = utils.mock_http(url, '{"total": 0}')
+        b = Toybox.get('http://example.com/foo', http=h)
+        pages = list(b.pages(page_size=10))
+        self.assertEqual(len(pages), 1)
+        self.assertEqual(list(b.iter_all(page_size=10)), [])
+
+    def test_stream(self):
+
+        class Toy(promise.PromiseObject):
+            name = fields.Field()
+
+        class Toybox(self.cls):
+            entries = fields.List(fields.Object(Toy))
+
+        url = 'http://example.com/toys'
+        request = dict(uri=url, headers={"accept": "application/json"})
+        content = ('{"total": 3, "entries": [{"name": "Woody"}, '
+                   '{"name": "Buzz"}, {"name": "Rex"}], "more": false}')
+        content = content.encode('utf-8')
+
+        # Entries come out the same however the response is cut up.
+        for size in (1, 7, len(content)):
+            chunks = [content[i:i + size]
+                      for i in range(0, len(content), size)]
+            h = utils.mock_http(request, content)
+            h.request.return_value = (h.request.return_value[0], iter(chunks))
+
+            b = Toybox.get(url)
+            others = {}
+            toys = b.stream(http=h, others=others)
+            self.assertEqual([], h.method_calls)
+
+            toys = list(toys)
+            h.request.assert_called_once_with(**request)
+            self.assertTrue(all(isinstance(toy, Toy) for toy in toys))
+            self.assertEqual([toy.name for toy in toys],
+                             ['Woody', 'Buzz', 'Rex'])
+            self.assertEqual(others, {'total': 3, 'more': False})
+            self.assertFalse(b._delivered)
+
+        # Without a user agent to stream with, the instance's own is used.
+        h = utils.mock_http(request, content)
+        b = Toybox.get(url, http=h)
+        self.assertEqual([toy.name for toy in b.stream()],
+                         ['Woody', 'Buzz', 'Rex'])
+        h.request.assert_called_once_with(**request)
+
+    def test_stream_not_found(self):
+
+        class Toybox(self.cls):
+            pass
+
+        url = 'http://example.com/toys'
+        request = dict(uri=url, headers={"accept": "application/json"})
+        h = utils.mock_http(request, dict(status=404))
+        h.request.return_value = (h.request.return_value[0], iter([b'nope']))
+
+        b = Toybox.get(url)
+        self.assertRaises(Toybox.NotFound, list, b.stream(http=h))
+
+    def test_prefetch(self):
+
+        class Owner(promise.PromiseObject):
+            name = fields.Field()
+
+        class Toy(promise.PromiseObject):
+            owner = fields.Link(Owner)
+
+        class Toybox(self.cls):
+            entries = fields.List(fields.Object(Toy))
+
+        urls = []
+        lock = threading.Lock()
+
+        def request(uri, headers):
+            with lock:
+                urls.append(uri)
+            response = httplib2.Response({
+                'status': 200,
+                'content-type': 'application/json',
+                'content-location': uri,
+            })
+            return response, '{"name": "%s"}' % uri
+
+        h = mock.Mock(spec_set=httplib2.Http)
+        h.request.side_effect = request
+
+        b = Toybox.from_dict({'entries': [{}, {}, {}]})
+        for i, toy in enumerate(b.entries):
+            toy._location = 'http://example.com/toy/%d/' % i
+
+        with mock.patch('remoteobjects.http.get_threadsafe_user_agent',
+                        return_value=h):
+            results = b.prefetch('owner', max_workers=2)
+
+        expected = ['http://example.com/toy/%d/owner' % i for i in range(3)]
+        self.assertEqual(sorted(urls), expected)
+        self.assertEqual([owner._location for owner in results], expected)
+
+        # The linked objects were delivered, so reading them is free.
+        for toy, url, owner in zip(b.entries, expected, results):
+            self.assertTrue(toy.owner is owner)
+            self.assertEqual(toy.owner.name, url)
+        self.assertEqual(h.request.call_count, 3)
+
 
 class TestPageOf(unittest.TestCase):
 
@@ -112,6 +318,21 @@ class TestPageOf(unittest.TestCase):
         self.assertEqual(actual, expected)
 
 
+    def test_lazy_entries(self):
+        class MyObj(promise.PromiseObject):
+            myfield = fields.Field()
+
+        class MyObjPage(listobject.PageObject):
+            entries = fields.List(fields.Object(MyObj), lazy=True)
+
+        data = {"entries": [{"myfield": "val %d" % i} for i in range(5)]}
+        page = MyObjPage.from_dict(data)
+        self.assertEqual(len(page), 5)
+        self.assertEqual(page[1].myfield, "val 1")
+        self.assertEqual([e.myfield for e in page][-1], "val 4")
+        self.assertEqual(page.to_dict(), data)
+
+
 class TestListOf(unittest.TestCase):
 
     def test_basemodule(self):
@@ -136,3 +357,18 @@ class TestListOf(unittest.TestCase):
         self.assertEqual("myval", actual.entries[0].myfield)
         self.assertIsInstance(actual, listobject.ListObject)
         self.assertEqual(actual, expected)
+
+    def test_stream(self):
+        class MyObj(promise.PromiseObject):
+            myfield = fields.Field()
+        MyObjList = listobject.ListOf(MyObj)
+
+        url = 'http://example.com/myobjs'
+        request = dict(uri=url, headers={"accept": "application/json"})
+        h = utils.mock_http(request, '')
+        h.request.return_value = (h.request.return_value[0],
+                                  iter([b'[{"myfield": "a"}, {"myf',
+                                        b'ield": "b"}]']))
+
+        objs = list(MyObjList.get(url).stream(http=h))
+        self.assertEqual(["a", "b"], [obj.myfield for obj in objs])
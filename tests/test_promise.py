@@ -27,16 +27,22 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
 
+import copy
+import pickle
 import unittest
 
 import httplib2
 import mock
 
-from remoteobjects import fields, promise
+from remoteobjects import fields, http, promise
 from tests import test_dataobject, test_http
 from tests import utils
 
 
+class PicklableToy(promise.PromiseObject):
+    name = fields.Field()
+
+
 class TestDataObjects(test_dataobject.TestDataObjects):
 
     cls = promise.PromiseObject
@@ -125,6 +131,25 @@ class TestPromiseObjects(unittest.TestCase):
         self.assertIsInstance(b, Toy)
         self.assertEqual(b._location, 'http://example.com/bwuh/toybox')
 
+    def test_link_memoized(self):
+
+        class Toy(self.cls):
+            name = fields.Field()
+
+        class Room(self.cls):
+            toybox = fields.Link(Toy)
+
+        r = Room.get('http://example.com/bwuh/')
+        b = r.toybox
+        self.assertTrue(r.toybox is b)
+
+        # A new URL means a new linked object.
+        r._location = 'http://example.com/blah/'
+        c = r.toybox
+        self.assertFalse(c is b)
+        self.assertEqual(c._location, 'http://example.com/blah/toybox')
+        self.assertTrue(r.toybox is c)
+
     def test_set_before_delivery(self):
 
         class Toy(self.cls):
@@ -153,3 +178,202 @@ class TestPromiseObjects(unittest.TestCase):
         t.update_from_dict({"names": ["local update"]})
 
         self.assertEqual(t.foo, None)
+
+    def test_compact_delivery(self):
+
+        class Toy(self.cls):
+            compact = True
+            name = fields.Field()
+            foo = fields.Field()
+
+        url = 'http://example.com/whahay'
+        request = dict(uri=url, headers={"accept": "application/json"})
+        content = '{"name": "Mollifred", "foo": "something"}'
+
+        # Reading a field delivers the instance.
+        h = utils.mock_http(request, content)
+        t = Toy.get(url, http=h)
+        self.assertEqual(t.name, 'Mollifred')
+        h.request.assert_called_once_with(**request)
+
+        # So does setting one, before the value is set.
+        h = utils.mock_http(request, content)
+        t = Toy.get(url, http=h)
+        t.foo = 'local change'
+        h.request.assert_called_once_with(**request)
+        self.assertEqual(t.foo, 'local change')
+        self.assertEqual(t.to_dict(),
+                         {'name': 'Mollifred', 'foo': 'local change'})
+
+    def test_undelivered_class(self):
+
+        class Toy(self.cls):
+            name = fields.Field()
+
+        url = 'http://example.com/whahay'
+        request = dict(uri=url, headers={"accept": "application/json"})
+        h = utils.mock_http(request, '{"name": "Mollifred"}')
+        t = Toy.get(url, http=h)
+
+        # Undelivered instances have a subclass with the delivery hooks.
+        self.assertFalse(type(t) is Toy)
+        self.assertTrue(type(t) is Toy.undelivered_class())
+        self.assertIsInstance(t, Toy)
+        self.assertEqual(type(t).__name__, 'Toy')
+        self.assertFalse(t.__dict__.get('api_data'))
+
+        self.assertEqual(t.name, 'Mollifred')
+        self.assertTrue(type(t) is Toy)
+        self.assertTrue('api_data' not in Toy.__dict__)
+
+        # Other subclasses get their own.
+        class Subtoy(Toy):
+            pass
+        self.assertFalse(Subtoy.undelivered_class() is Toy.undelivered_class())
+        self.assertTrue(issubclass(Subtoy.undelivered_class(), Subtoy))
+
+    def test_pickle_undelivered(self):
+        url = 'http://example.com/whahay'
+        t = PicklableToy.get(url)
+
+        for clone in (pickle.loads(pickle.dumps(t)),
+                      pickle.loads(pickle.dumps(t, 2)),
+                      copy.copy(t)):
+            self.assertTrue(type(clone) is PicklableToy.undelivered_class())
+            self.assertFalse(clone._delivered)
+            self.assertEqual(clone._location, url)
+
+            request = dict(uri=url, headers={"accept": "application/json"})
+            clone._http = utils.mock_http(request, '{"name": "Mollifred"}')
+            self.assertEqual(clone.name, 'Mollifred')
+            self.assertTrue(type(clone) is PicklableToy)
+
+    def test_promised_response(self):
+
+        class Toy(self.cls):
+            name = fields.Field()
+
+        url = 'http://example.com/whahay'
+        request = dict(uri=url, headers={}, method='HEAD')
+        h = utils.mock_http(request, dict(status=200, allow='GET, DELETE'))
+        resp = Toy.get(url).head(http=h)
+        self.assertFalse(type(resp) is promise.PromisedResponse)
+        self.assertEqual([], h.method_calls)
+
+        self.assertTrue(resp.can_delete())
+        h.request.assert_called_once_with(**request)
+        self.assertTrue(type(resp) is promise.PromisedResponse)
+        self.assertEqual(resp.status, 200)
+
+    def test_refresh_undelivered(self):
+
+        class Toy(self.cls):
+            name = fields.Field()
+
+        url = 'http://example.com/whahay'
+        request = dict(uri=url, headers={"accept": "application/json"})
+        h = utils.mock_http(request, """{"name": "Mollifred"}""")
+        t = Toy.get(url, http=h)
+
+        # Undelivered instances are delivered unconditionally.
+        self.assertTrue(t.refresh())
+        h.request.assert_called_once_with(**request)
+        self.assertEqual(t.name, 'Mollifred')
+
+    def test_save_with_promised_user_agent(self):
+
+        class Toy(self.cls):
+            name = fields.Field()
+
+        url = 'http://example.com/whahay'
+        h = utils.mock_http(url, """{"name": "Mollifred"}""")
+        t = Toy.get(url, http=h)
+        t.name = 'Molly'
+
+        # Streamed or not, saving uses the user agent the promise was made
+        # with, not the credential-less defaults.
+        for stream in (False, True):
+            h.request.reset_mock()
+            t.put(stream=stream)
+            self.assertEqual(h.request.call_args[1]['method'], 'PUT')
+
+            h.request.reset_mock()
+            t.post(Toy(name='Buzz'), stream=stream)
+            self.assertEqual(h.request.call_args[1]['method'], 'POST')
+
+    def test_deliver_all(self):
+
+        class Toy(self.cls):
+            name = fields.Field()
+
+        def provider(h):
+            return http.ThreadLocalUserAgent(factory=lambda: h)
+
+        headers = {"accept": "application/json"}
+        toys, mocks = [], []
+        for i in range(5):
+            url = 'http://example.com/toy/%d' % i
+            request = dict(uri=url, headers=headers)
+            h = utils.mock_http(request, '{"name": "Toy %d"}' % i)
+            mocks.append(h)
+            toys.append(Toy.get(url, http=provider(h)))
+
+        url = 'http://example.com/toy/missing'
+        request = dict(uri=url, headers=headers)
+        h = utils.mock_http(request, dict(status=404))
+        missing = Toy.get(url, http=provider(h))
+
+        # Promises given twice, or for the same URL, get results of their own.
+        same_url = Toy.get(toys[0]._location, http=provider(utils.mock_http(
+            dict(uri=toys[0]._location, headers=headers), '{"name": "Toy"}')))
+        results = promise.deliver_all(toys + [missing, toys[1], same_url],
+                                      max_workers=3)
+
+        self.assertEqual(len(results), 8)
+        for i, toy in enumerate(toys):
+            self.assertTrue(toy._delivered)
+            self.assertTrue(results[i] is toy)
+            self.assertEqual(toy.name, 'Toy %d' % i)
+            mocks[i].request.assert_called_once_with(
+                uri=toy._location, headers=headers)
+        self.assertIsInstance(results[5], Toy.NotFound)
+        self.assertFalse(missing._delivered)
+        self.assertTrue(results[6] is toys[1])
+        self.assertTrue(results[7] is same_url)
+        self.assertEqual(same_url.name, 'Toy')
+
+        # Delivered instances are left alone.
+        results = promise.deliver_all(toys)
+        self.assertTrue(results[0] is toys[0])
+        for toy, h in zip(toys, mocks):
+            h.request.assert_called_once_with(
+                uri=toy._location, headers=headers)
+
+        self.assertRaises(ValueError, promise.deliver_all, toys, max_workers=0)
+
+    def test_deliver_all_user_agents(self):
+
+        class Toy(self.cls):
+            name = fields.Field()
+
+        # Promises sharing a plain user agent are delivered with clones of it.
+        h = httplib2.Http()
+        h.add_credentials('user', 'pass')
+        toys = [Toy.get('http://example.com/toy/%d' % i, http=h)
+                for i in range(4)]
+        response = httplib2.Response({'status': 200,
+                                      'content-type': 'application/json'})
+        with mock.patch.object(httplib2.Http, 'request', autospec=True,
+                               return_value=(response, '{"name": "Toy"}')) as request:
+            promise.deliver_all(toys, max_workers=2)
+        self.assertEqual(request.call_count, 4)
+        for call in request.call_args_list:
+            clone = call[0][0]
+            self.assertFalse(clone is h)
+            self.assertTrue(clone.credentials is h.credentials)
+        for toy in toys:
+            self.assertEqual(toy.name, 'Toy')
+
+        # Other user agents aren't known to be safe to share.
+        toy = Toy.get('http://example.com/toy/0', http=object())
+        self.assertRaises(ValueError, promise.deliver_all, [toy])
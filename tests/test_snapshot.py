@@ -0,0 +1,174 @@
+# Copyright (c) 2009-2010 Six Apart Ltd.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of Six Apart Ltd. nor the names of its contributors may
+#   be used to endorse or promote products derived from this software without
+#   specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+from datetime import datetime
+import unittest
+
+import mock
+
+from remoteobjects import fields, http, listobject, promise
+from remoteobjects.snapshot import (SnapshotEncoder, dumps_snapshot,
+                                    loads_snapshot)
+from tests import utils
+
+
+class SnapshotPart(promise.PromiseObject):
+    name = fields.Field()
+
+
+class SnapshotToy(promise.PromiseObject):
+    name = fields.Field()
+    made = fields.Datetime()
+    kind = fields.Constant('toy')
+    parts = fields.List(fields.Object(SnapshotPart))
+    spare = fields.Object(SnapshotPart)
+    tags = fields.Dict(fields.Field())
+
+
+class SnapshotCompactToy(promise.PromiseObject):
+    compact = True
+    name = fields.Field()
+    made = fields.Datetime()
+
+
+PageOfSnapshotToy = listobject.PageOf(SnapshotToy)
+
+
+class TestSnapshots(unittest.TestCase):
+
+    data = {
+        'name': 'Woody',
+        'made': '1995-11-22T00:00:00Z',
+        'kind': 'toy',
+        'parts': [{'name': 'hat'}, {'name': 'boots', 'extra': [1, 2]}],
+        'spare': {'name': 'badge'},
+        'tags': {'a': 'cowboy'},
+        'unknown': {'x': 1},
+    }
+
+    def test_roundtrip(self):
+        t = SnapshotToy.from_dict(self.data)
+        t._location = 'http://example.com/woody'
+        t._etag = 'xyz'
+        t.parts[1].name = 'spurs'
+        t.made
+
+        snapshot = dumps_snapshot(t)
+        self.assertIsInstance(snapshot, bytes)
+        loaded = loads_snapshot(snapshot)
+
+        self.assertTrue(type(loaded) is SnapshotToy)
+        self.assertEqual(loaded, t)
+        self.assertEqual(loaded.to_dict(), t.to_dict())
+        self.assertEqual(loaded._location, 'http://example.com/woody')
+        self.assertEqual(loaded._etag, 'xyz')
+        self.assertTrue(loaded._delivered)
+        self.assertEqual(loaded.made, datetime(1995, 11, 22,
+                                               tzinfo=fields.Datetime.utc))
+        self.assertTrue(type(loaded.parts[0]) is SnapshotPart)
+        self.assertEqual(loaded.parts[1].name, 'spurs')
+        self.assertEqual(loaded.parts[1].changed_fields(), set(['name']))
+        self.assertEqual(loaded.api_data['unknown'], {'x': 1})
+        self.assertFalse(loaded.api_data is t.api_data)
+
+        # Instances decoded from the API data of the instance referring to
+        # them are stored without it, and share it again when loaded.
+        values = SnapshotEncoder().encode_object(t)[2]
+        self.assertTrue(values['spare'][1] is None)
+        self.assertTrue(all(part[1] is None for part in values['parts']))
+        self.assertTrue(loaded.spare.api_data is loaded.api_data['spare'])
+        self.assertTrue(loaded.parts[1].api_data
+                        is loaded.api_data['parts'][1])
+        self.assertEqual(loaded.parts[1].api_data['extra'], [1, 2])
+
+    def test_changed_and_released(self):
+        t = SnapshotToy.from_dict(self.data)
+        t.name = 'Buzz'
+        t.tags = None
+        self.assertEqual(loads_snapshot(dumps_snapshot(t)).changed_fields(),
+                         set(['name', 'tags']))
+
+        t = SnapshotToy.from_dict(self.data)
+        t.decode_all(release=True)
+        loaded = loads_snapshot(dumps_snapshot(t))
+        self.assertEqual(loaded.api_data, {'kind': 'toy', 'unknown': {'x': 1}})
+        self.assertEqual(loaded.to_dict(), self.data)
+        self.assertEqual(loaded.changed_fields(), set())
+
+        t = SnapshotCompactToy.from_dict({'name': 'Rex', 'made': '1995-11-22T00:00:00Z'})
+        t.made
+        t.name = 'T. Rex'
+        loaded = loads_snapshot(dumps_snapshot(t))
+        self.assertEqual(loaded.name, 'T. Rex')
+        self.assertEqual(loaded.made, t.made)
+        self.assertTrue('name' not in loaded.__dict__)
+
+    def test_undelivered(self):
+        url = 'http://example.com/woody'
+        t = SnapshotToy.get(url)
+        loaded = loads_snapshot(dumps_snapshot(t))
+        self.assertFalse(loaded._delivered)
+        self.assertTrue(type(loaded) is SnapshotToy.undelivered_class())
+
+        request = dict(uri=url, headers={'accept': 'application/json'})
+        h = utils.mock_http(request, '{"name": "Woody"}')
+        with mock.patch.object(http, 'userAgent', h):
+            self.assertEqual(loaded.name, 'Woody')
+        self.assertEqual(h.request.call_count, 1)
+        self.assertTrue(type(loaded) is SnapshotToy)
+
+    def test_page(self):
+        page = PageOfSnapshotToy.from_dict({'entries': [self.data, self.data],
+                                    'total': 2})
+        page.entries
+        loaded = loads_snapshot(dumps_snapshot(page))
+        self.assertTrue(type(loaded) is PageOfSnapshotToy)
+        self.assertEqual(len(loaded), 2)
+        self.assertTrue(type(loaded[1]) is SnapshotToy)
+        self.assertEqual(loaded.to_dict(), page.to_dict())
+
+    def test_errors(self):
+
+        class Redefined(promise.PromiseObject):
+            name = fields.Field()
+
+        self.assertEqual(loads_snapshot(dumps_snapshot(Redefined(name='x'))).name, 'x')
+
+        # Only the class registered by a name can be snapshotted.
+        Old = Redefined
+
+        class Redefined(promise.PromiseObject):
+            pass
+        self.assertRaises(ValueError, dumps_snapshot, Old(name='x'))
+
+        t = SnapshotPart.from_dict({'name': 'hat'})
+        t.name = t
+        self.assertRaises(ValueError, dumps_snapshot, t)
+
+        self.assertRaises(ValueError, loads_snapshot, b'nope')